@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test de charge de POST /api/capture sur le serveur API local.
+
+Démarre le serveur en mode 'single' (HTTPServer historique) puis 'threaded'
+(ThreadingHTTPServer + keep-alive) et mesure le débit de captures acceptées.
+Le traitement des jobs (GitHub, scraping, Mistral) est remplacé par une attente
+de --job-ms millisecondes : seul le chemin HTTP est mesuré.
+
+Usage:
+    python3 benchmarks/bench_api_load.py [--clients 8] [--requests 200] [--upload-delay-ms 5]
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import contextlib
+import socket
+import argparse
+import threading
+import statistics
+import http.client
+from pathlib import Path
+
+# Clés factices : aucun appel réseau n'est effectué pendant le test
+os.environ.setdefault("MISTRAL_API_KEY", "bench")
+os.environ.setdefault("GITHUB_TOKEN", "bench")
+sys.path.append(str(Path(__file__).parent.parent.absolute() / "scripts"))
+import veille_api_server
+from veille_api_server import CaptureJobQueue, make_server, shutdown_server
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def client(port, count, upload_delay, latencies, errors):
+    """Envoie `count` captures sur une connexion réutilisée quand le serveur le permet."""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    for i in range(count):
+        body = json.dumps({"url": f"https://example.com/article/{i}", "description": "", "tags": []}).encode()
+        start = time.perf_counter()
+        try:
+            conn.putrequest("POST", "/api/capture")
+            conn.putheader("Content-Type", "application/json")
+            conn.putheader("Content-Length", str(len(body)))
+            conn.endheaders()
+            # Client lent (réseau, extension) : le corps arrive après les en-têtes
+            if upload_delay:
+                time.sleep(upload_delay)
+            conn.send(body)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 202:
+                errors.append(response.status)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(str(e))
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+def run_mode(mode, args):
+    job_delay = args.job_ms / 1000
+
+    class BenchQueue(CaptureJobQueue):
+        def _run(self, job):
+            time.sleep(job_delay)
+            self._update(job['id'], status='done')
+
+    port = free_port()
+    latencies, errors = [], []
+    per_client = args.requests // args.clients
+
+    # Les logs par requête du serveur fausseraient la mesure
+    with contextlib.redirect_stdout(io.StringIO()):
+        httpd = make_server("127.0.0.1", port, mode=mode, max_threads=args.threads, jobs=BenchQueue(args.workers))
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+
+        clients = [
+            threading.Thread(target=client, args=(port, per_client, args.upload_delay_ms / 1000, latencies, errors))
+            for _ in range(args.clients)
+        ]
+        start = time.perf_counter()
+        for thread in clients:
+            thread.start()
+        for thread in clients:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        httpd.shutdown()
+        shutdown_server(httpd)
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0
+    print(f"  {mode:<10} {len(latencies) / elapsed:9.1f} req/s   "
+          f"p50 {statistics.median(latencies) * 1000 if latencies else 0:7.1f} ms   "
+          f"p95 {p95 * 1000:7.1f} ms   erreurs {len(errors)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=8, help="clients concurrents")
+    parser.add_argument("--requests", type=int, default=200, help="nombre total de captures")
+    parser.add_argument("--upload-delay-ms", type=float, default=5, help="délai entre en-têtes et corps (client lent)")
+    parser.add_argument("--job-ms", type=float, default=50, help="durée simulée d'un traitement en arrière-plan")
+    parser.add_argument("--workers", type=int, default=2, help="workers de la file de captures")
+    parser.add_argument("--threads", type=int, default=veille_api_server.SERVER_THREADS, help="connexions max (mode threaded)")
+    parser.add_argument("--modes", default="single,threaded", help="modes à comparer")
+    args = parser.parse_args()
+
+    print(f"🔥 {args.requests} captures, {args.clients} clients, client lent {args.upload_delay_ms} ms\n")
+    for mode in args.modes.split(","):
+        run_mode(mode.strip(), args)
+
+
+if __name__ == "__main__":
+    main()
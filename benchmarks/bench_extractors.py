@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Comparaison des backends d'extraction (veille_extract) sur des pages HTML enregistrées.
+
+Pour chaque backend disponible : pages/s, pic mémoire (RSS, chaque backend tourne dans son
+propre processus), tokens extraits (ce qui part vers Mistral) et, si un fichier `<page>.txt`
+contenant le texte attendu accompagne `<page>.html`, précision / rappel au niveau des mots.
+
+Par défaut, les pages enregistrées de benchmarks/corpus/. Avec --synthetic (ou si le dossier est
+vide), des articles synthétiques entourés de boilerplate (menus, barre latérale, articles liés,
+commentaires, bannière cookies) sont générés avec leur texte attendu (benchmarks/html_corpus.py).
+
+Usage:
+    python3 benchmarks/bench_extractors.py [--corpus benchmarks/corpus] [--backends stream,readability]
+    python3 benchmarks/bench_extractors.py --synthetic [--generate 50]
+"""
+
+import re
+import sys
+import json
+import time
+import resource
+import argparse
+import tempfile
+import subprocess
+from collections import Counter
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.absolute() / "scripts"))
+from veille_extract import EXTRACTORS, available_extractors
+from veille_budget import estimate_tokens
+from html_corpus import CORPUS_DIR, corpus_files, write_synthetic
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def word_scores(extracted, expected):
+    """Précision / rappel des mots extraits par rapport au texte attendu."""
+    got = Counter(w.lower() for w in _WORD_RE.findall(extracted))
+    want = Counter(w.lower() for w in _WORD_RE.findall(expected))
+    common = sum((got & want).values())
+    precision = common / sum(got.values()) if got else 0.0
+    recall = common / sum(want.values()) if want else 0.0
+    return precision, recall
+
+
+def run_backend(backend, corpus, max_chars, repeat):
+    """Exécuté dans un processus dédié : mesure un backend et imprime le résultat en JSON."""
+    factory, _ = EXTRACTORS[backend]
+    pages = [(p.read_bytes(), p.with_suffix(".txt")) for p in corpus_files(corpus)]
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        results = []
+        for data, _ in pages:
+            extractor = factory(max_chars=max_chars)
+            extractor.feed(data)
+            results.append(extractor.close()[0])
+    elapsed = (time.perf_counter() - start) / repeat
+
+    tokens = sum(estimate_tokens(text) for text in results)
+    scored = [word_scores(text, expected.read_text(encoding="utf-8"))
+              for text, (_, expected) in zip(results, pages) if expected.exists()]
+    print(json.dumps({
+        "pages": len(pages),
+        "pages_per_s": len(pages) / elapsed if elapsed else 0,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline,
+        "tokens": tokens,
+        "precision": sum(p for p, _ in scored) / len(scored) if scored else None,
+        "recall": sum(r for _, r in scored) / len(scored) if scored else None,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=Path, default=CORPUS_DIR, help="dossier de pages .html")
+    parser.add_argument("--synthetic", action="store_true", help="articles synthétiques au lieu du corpus")
+    parser.add_argument("--generate", type=int, default=50, help="nombre d'articles synthétiques")
+    parser.add_argument("--backends", default=",".join(available_extractors()), help="backends à comparer")
+    parser.add_argument("--max-chars", type=int, default=1_000_000, help="troncature du texte (défaut : aucune)")
+    parser.add_argument("--repeat", type=int, default=3, help="passes par backend")
+    parser.add_argument("--run", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_backend(args.run, args.corpus, args.max_chars, args.repeat)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = args.corpus
+        if args.synthetic or not corpus_files(corpus):
+            print(f"📂 Génération de {args.generate} articles synthétiques")
+            corpus = Path(tmp)
+            write_synthetic(corpus, args.generate)
+        else:
+            print(f"📂 {len(corpus_files(corpus))} page(s) de {corpus}")
+
+        print(f"{'backend':<12} {'pages/s':>9} {'RSS max':>10} {'tokens':>9} {'précision':>10} {'rappel':>8}")
+        for backend in args.backends.split(","):
+            backend = backend.strip()
+            if backend not in available_extractors():
+                print(f"{backend:<12} indisponible (module manquant)")
+                continue
+            proc = subprocess.run(
+                [sys.executable, __file__, "--run", backend, "--corpus", str(corpus),
+                 "--max-chars", str(args.max_chars), "--repeat", str(args.repeat)],
+                capture_output=True, text=True,
+            )
+            if proc.returncode != 0:
+                print(f"{backend:<12} échec : {proc.stderr.strip().splitlines()[-1:]}")
+                continue
+            r = json.loads(proc.stdout.strip().splitlines()[-1])
+            quality = (f"{r['precision']:>10.2f} {r['recall']:>8.2f}" if r["precision"] is not None
+                       else f"{'-':>10} {'-':>8}")
+            print(f"{backend:<12} {r['pages_per_s']:>9.1f} {r['peak_rss_kb'] / 1024:>8.1f}Mo {r['tokens']:>9} {quality}")
+
+
+if __name__ == "__main__":
+    main()
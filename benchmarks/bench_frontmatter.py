@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark de la lecture des frontmatters sur un corpus synthétique de fiches.
+
+Compare :
+  - l'ancienne lecture (f.read() + split('---') + yaml.safe_load)
+  - la lecture en flux du frontmatter seul (SafeLoader pur Python)
+  - la lecture en flux du frontmatter seul (CSafeLoader, si libyaml est disponible)
+  - le rafraîchissement du manifeste (froid, à chaud, puis après un checkout qui change les dates)
+
+Usage:
+    python3 benchmarks/bench_frontmatter.py [--fiches 10000] [--body-kb 4]
+"""
+
+import sys
+import time
+import random
+import argparse
+import tempfile
+from pathlib import Path
+
+import yaml
+
+sys.path.append(str(Path(__file__).parent.parent.absolute() / "scripts"))
+import veille_index
+from veille_index import FicheManifest, read_frontmatter
+
+TAGS = ["IA", "DevOps", "Kubernetes", "Rust", "Python", "Sécurité", "Cloud", "Data", "LLM", "Réseau"]
+CATEGORIES = ["DevOps", "IA & Data", "Développement", "Architecture", "Business", "Cybersécurité", "Infrastructure"]
+
+
+def generate_corpus(root, count, body_kb):
+    """Génère `count` fiches réparties par mois sous root/fiches."""
+    rng = random.Random(42)
+    paragraph = ("Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 20).strip() + "\n\n"
+    body = paragraph * max(1, (body_kb * 1024) // len(paragraph))
+    for i in range(count):
+        year = 2020 + (i % 6)
+        month = (i % 12) + 1
+        directory = root / "fiches" / str(year) / f"{month:02d}"
+        directory.mkdir(parents=True, exist_ok=True)
+        frontmatter = {
+            "title": f"Article de veille numéro {i}",
+            "tags": rng.sample(TAGS, 4),
+            "category": rng.choice(CATEGORIES),
+            "date": f"{year}-{month:02d}-{(i % 28) + 1:02d}",
+            "source": f"https://example.com/articles/{i}",
+            "issue": f"#{i}",
+        }
+        content = f"---\n{yaml.dump(frontmatter, allow_unicode=True)}---\n\n# Article {i}\n\n## Résumé\n\n{body}"
+        (directory / f"{(i % 28) + 1:02d}-article-{i}.md").write_text(content, encoding="utf-8")
+
+
+def legacy_read(file_path):
+    """Ancienne implémentation : lecture complète puis découpage."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    if content.startswith('---'):
+        parts = content.split('---', 2)
+        if len(parts) >= 3:
+            return yaml.safe_load(parts[1])
+    return None
+
+
+def timed(label, func, paths):
+    start = time.perf_counter()
+    for path in paths:
+        func(path)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<45} {elapsed:8.3f} s  ({len(paths) / elapsed:9.0f} fiches/s)")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fiches", type=int, default=10000, help="nombre de fiches synthétiques")
+    parser.add_argument("--body-kb", type=int, default=4, help="taille approximative du corps (Ko)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="veille-bench-") as tmp:
+        root = Path(tmp)
+        print(f"🏗️  Génération de {args.fiches} fiches (~{args.body_kb} Ko)...")
+        generate_corpus(root, args.fiches, args.body_kb)
+        paths = sorted((root / "fiches").rglob("*.md"))
+
+        print(f"\n⏱️  Lecture des frontmatters ({len(paths)} fiches) :")
+        timed("read() + split + safe_load (ancien)", legacy_read, paths)
+
+        pure_loader = yaml.SafeLoader
+        veille_index.YAML_LOADER = pure_loader
+        timed("flux frontmatter + SafeLoader", read_frontmatter, paths)
+
+        if hasattr(yaml, "CSafeLoader"):
+            veille_index.YAML_LOADER = yaml.CSafeLoader
+            timed("flux frontmatter + CSafeLoader", read_frontmatter, paths)
+        else:
+            print("  (libyaml indisponible : CSafeLoader ignoré)")
+
+        print("\n⏱️  Manifeste :")
+        manifest = FicheManifest(path=root / "manifest.json", docs_dir=root, fiches_dir=root / "fiches")
+        for label in ("froid (tout re-parser)", "à chaud (stat uniquement)", "après checkout (empreintes)"):
+            if label.startswith("après checkout"):
+                # Comme actions/checkout : contenus identiques, dates toutes modifiées
+                for path in paths:
+                    path.touch()
+            start = time.perf_counter()
+            entries, parsed = manifest.refresh()
+            elapsed = time.perf_counter() - start
+            print(f"  {label:<45} {elapsed:8.3f} s  ({parsed} re-parsée(s) / {len(entries)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Benchmark de bout en bout, hors ligne : le pipeline tourne contre des services factices
+(benchmarks/fake_services.py : API GitHub, API Mistral avec latence configurable, pages
+d'articles : corpus benchmarks/corpus/ puis pages synthétiques) branchés via GITHUB_API_URL
+et MISTRAL_ENDPOINT.
+
+Deux scénarios, pour chaque taille de backlog :
+  - pipeline : N issues ouvertes, un run de process_veille.main()
+  - capture  : N POST /api/capture sur le serveur API local, jusqu'à la fin des jobs
+
+Chaque scénario tourne dans un sous-processus, sur une copie de scripts/ dans un dossier
+temporaire (docs/ et .cache/ vides : aucun fichier du dépôt n'est modifié). Résultats :
+issues/minute, latence p50/p95 par issue (mesures de veille_metrics ou durée des jobs),
+pic de mémoire (RSS) et requêtes reçues par les services factices.
+
+Avec --save, les résultats sont enregistrés en JSON ; avec --baseline, ils sont comparés à
+un enregistrement précédent (code de sortie 1 si le débit baisse ou si le p95 augmente de
+plus de --tolerance).
+
+Usage:
+    python3 benchmarks/bench_pipeline.py [--sizes 20,100] [--scenarios pipeline,capture]
+    python3 benchmarks/bench_pipeline.py --mistral-ms 1500 --site-ms 300 --save bench.json
+    python3 benchmarks/bench_pipeline.py --baseline bench.json --tolerance 0.15
+"""
+
+import os
+import sys
+import json
+import math
+import shutil
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+from fake_services import FakeGitHub, FakeMistral, CorpusServer
+from html_corpus import CORPUS_DIR, corpus_files
+
+PROJECT_ROOT = Path(__file__).parent.parent.absolute()
+
+# Quotas Mistral relevés pour mesurer le code et non la limite du compte (--real-quotas pour les garder)
+BENCH_QUOTAS = {"VEILLE_MISTRAL_RPM": "100000", "VEILLE_MISTRAL_TPM": "100000000"}
+
+# Exécuté dans le sous-processus (racine : copie temporaire du projet)
+PIPELINE_DRIVER = """
+import sys, json, resource
+sys.path.insert(0, "scripts")
+import process_veille
+from veille_metrics import METRICS
+process_veille.main()
+data = METRICS.snapshot()
+print("BENCH_RESULT " + json.dumps({
+    "seconds": data["seconds"],
+    "statuses": data["statuses"],
+    "latencies": sorted(entry["seconds"] for entry in data["issues"].values()),
+    "stages": {name: stage["seconds"] for name, stage in data["stages"].items()},
+    "maxrss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+}))
+"""
+
+CAPTURE_DRIVER = """
+import sys, json, time, resource, threading, http.client
+sys.path.insert(0, "scripts")
+import veille_api_server as api
+
+urls, clients, workers = json.loads(sys.argv[1])
+jobs = api.CaptureJobQueue(workers)
+httpd = api.make_server("127.0.0.1", 0, mode="threaded", jobs=jobs)
+port = httpd.server_address[1]
+threading.Thread(target=httpd.serve_forever, daemon=True).start()
+
+def client(part):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    for url in part:
+        conn.request("POST", "/api/capture", json.dumps({"url": url, "description": "", "tags": []}),
+                     {"Content-Type": "application/json"})
+        conn.getresponse().read()
+    conn.close()
+
+start = time.perf_counter()
+threads = [threading.Thread(target=client, args=(urls[i::clients],)) for i in range(clients)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+jobs.drain(timeout=3600)
+elapsed = time.perf_counter() - start
+httpd.shutdown()
+api.shutdown_server(httpd)
+
+statuses = {}
+for job in jobs.jobs.values():
+    status = "duplicate" if job.get("duplicate_of") else job["status"]
+    statuses[status] = statuses.get(status, 0) + 1
+print("BENCH_RESULT " + json.dumps({
+    "seconds": elapsed,
+    "statuses": statuses,
+    "latencies": sorted(job["updated_at"] - job["created_at"] for job in jobs.jobs.values()),
+    "maxrss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+}))
+"""
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(q * len(values)) - 1)]
+
+
+def prepare_project(root):
+    """Copie de scripts/ avec docs/ vide : le pipeline n'écrit que dans `root`."""
+    shutil.copytree(PROJECT_ROOT / "scripts", root / "scripts", ignore=shutil.ignore_patterns("__pycache__"))
+    (root / "docs" / "fiches").mkdir(parents=True)
+
+
+def run_driver(root, driver, services, args, extra_args=()):
+    github, mistral, _ = services
+    env = dict(os.environ)
+    env.update({
+        "GITHUB_API_URL": github.url,
+        "MISTRAL_ENDPOINT": mistral.url,
+        "GITHUB_TOKEN": "bench",
+        "MISTRAL_API_KEY": "bench",
+        "GITHUB_USER": "bench",
+        "REPO_NAME": "veille",
+        "VEILLE_CACHE_DIR": str(root / ".cache"),
+        "VEILLE_METRICS_JSON": str(root / ".cache" / "metrics.json"),
+        "PYTHONUNBUFFERED": "1",
+    })
+    if not args.real_quotas:
+        for key, value in BENCH_QUOTAS.items():
+            env.setdefault(key, value)
+
+    result = subprocess.run([sys.executable, "-c", driver, *extra_args], cwd=root, env=env,
+                            capture_output=True, text=True)
+    if args.verbose or result.returncode != 0:
+        sys.stdout.write(result.stdout[-20000:])
+        sys.stderr.write(result.stderr[-20000:])
+    for line in reversed(result.stdout.splitlines()):
+        if line.startswith("BENCH_RESULT "):
+            return json.loads(line[len("BENCH_RESULT "):])
+    raise RuntimeError(f"pas de résultat (code {result.returncode})")
+
+
+def run_scenario(scenario, size, args):
+    github = FakeGitHub(args.github_ms).start()
+    mistral = FakeMistral(args.mistral_ms, error_rate=args.mistral_errors).start()
+    corpus = CorpusServer(args.corpus, args.site_ms).start()
+    services = (github, mistral, corpus)
+    try:
+        with tempfile.TemporaryDirectory(prefix="veille-bench-") as tmp:
+            root = Path(tmp)
+            prepare_project(root)
+            urls = [corpus.article_url(i) for i in range(size)]
+            if scenario == "pipeline":
+                for url in urls:
+                    github.add_issue(url)
+                result = run_driver(root, PIPELINE_DRIVER, services, args)
+            else:
+                payload = json.dumps([urls, args.clients, args.capture_workers])
+                result = run_driver(root, CAPTURE_DRIVER, services, args, [payload])
+    finally:
+        for service in services:
+            service.stop()
+
+    latencies = result["latencies"]
+    # ru_maxrss : Ko sous Linux, octets sous macOS
+    rss = result["maxrss"] / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return {
+        "scenario": scenario,
+        "size": size,
+        "seconds": round(result["seconds"], 3),
+        "issues_per_min": round(size / result["seconds"] * 60, 2) if result["seconds"] else 0.0,
+        "p50": round(percentile(latencies, 0.5), 3),
+        "p95": round(percentile(latencies, 0.95), 3),
+        "rss_mb": round(rss, 1),
+        "statuses": result["statuses"],
+        "stages": result.get("stages", {}),
+        "github": dict(github.stats),
+        "mistral": dict(mistral.stats),
+    }
+
+
+def print_result(r):
+    statuses = ", ".join(f"{k} {v}" for k, v in sorted(r["statuses"].items()))
+    print(f"  {r['scenario']:<9}{r['size']:>6} {r['seconds']:8.1f}s {r['issues_per_min']:9.1f}/min "
+          f"{r['p50']:8.2f}s {r['p95']:8.2f}s {r['rss_mb']:8.1f} Mo   {statuses}")
+    print(f"  {'':<15}GitHub {r['github'].get('requests', 0)} req "
+          f"(graphql {r['github'].get('graphql', 0)}, créées {r['github'].get('created', 0)}), "
+          f"Mistral {r['mistral'].get('requests', 0)} req (max {r['mistral'].get('max_in_flight', 0)} simultanées)")
+    if r["stages"]:
+        slowest = sorted(r["stages"].items(), key=lambda kv: -kv[1])[:4]
+        print(f"  {'':<15}étapes : " + ", ".join(f"{name} {seconds:.1f}s" for name, seconds in slowest))
+
+
+def compare(results, baseline_path, tolerance):
+    """Compare au fichier de référence. Retourne le nombre de régressions."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {(r["scenario"], r["size"]): r for r in json.load(f)["results"]}
+    regressions = 0
+    print(f"\n📏 Comparaison avec {baseline_path} (tolérance {tolerance:.0%})")
+    for r in results:
+        ref = baseline.get((r["scenario"], r["size"]))
+        if not ref:
+            print(f"  {r['scenario']:<9}{r['size']:>6}   pas de référence")
+            continue
+        throughput = r["issues_per_min"] / ref["issues_per_min"] - 1 if ref["issues_per_min"] else 0.0
+        p95 = r["p95"] / ref["p95"] - 1 if ref["p95"] else 0.0
+        failed = throughput < -tolerance or p95 > tolerance
+        regressions += failed
+        print(f"  {r['scenario']:<9}{r['size']:>6}   débit {throughput:+7.1%}   p95 {p95:+7.1%}   "
+              f"{'❌ régression' if failed else '✅'}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="20,100", help="tailles de backlog (issues)")
+    parser.add_argument("--scenarios", default="pipeline,capture", help="pipeline, capture")
+    parser.add_argument("--corpus", type=Path, default=CORPUS_DIR,
+                        help="dossier de pages .html, complétées par des pages synthétiques")
+    parser.add_argument("--synthetic", action="store_true", help="pages synthétiques uniquement")
+    parser.add_argument("--github-ms", type=float, default=50, help="latence de l'API GitHub factice")
+    parser.add_argument("--mistral-ms", type=float, default=800, help="latence de l'API Mistral factice")
+    parser.add_argument("--mistral-errors", type=float, default=0.0, help="proportion de réponses 503 Mistral")
+    parser.add_argument("--site-ms", type=float, default=100, help="latence des pages d'articles")
+    parser.add_argument("--clients", type=int, default=4, help="clients concurrents (capture)")
+    parser.add_argument("--capture-workers", type=int, default=2, help="workers de la file de captures")
+    parser.add_argument("--real-quotas", action="store_true", help="garder les quotas Mistral configurés")
+    parser.add_argument("--save", type=Path, help="enregistre les résultats (JSON)")
+    parser.add_argument("--baseline", type=Path, help="résultats de référence à comparer")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="écart toléré avant régression")
+    parser.add_argument("--verbose", action="store_true", help="affiche la sortie des runs")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    scenarios = [scenario.strip() for scenario in args.scenarios.split(",")]
+    if args.synthetic:
+        args.corpus = None
+    files = corpus_files(args.corpus) if args.corpus else []
+    corpus = f"{len(files)} page(s) de {args.corpus} + synthétiques" if files else "synthétique"
+    print(f"🔥 Latences : GitHub {args.github_ms:.0f} ms, Mistral {args.mistral_ms:.0f} ms, "
+          f"sites {args.site_ms:.0f} ms ; corpus {corpus}\n")
+    print(f"  {'scénario':<9}{'issues':>6} {'durée':>9} {'débit':>13} {'p50':>9} {'p95':>9} {'RSS':>11}")
+
+    results = []
+    for size in sizes:
+        for scenario in scenarios:
+            result = run_scenario(scenario, size, args)
+            results.append(result)
+            print_result(result)
+
+    if args.save:
+        args.save.write_text(json.dumps({"args": {k: str(v) for k, v in vars(args).items()}, "results": results},
+                                        ensure_ascii=False, indent=1), encoding="utf-8")
+        print(f"\n💾 Résultats enregistrés dans {args.save}")
+    if args.baseline and compare(results, args.baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'extraction de texte sur un corpus local de pages HTML sauvegardées.
+
+Compare :
+  - l'ancienne extraction (page entière en mémoire + arbre BeautifulSoup complet)
+  - l'extraction en flux (morceaux de 64 Ko, plafond d'octets, arrêt dès que le texte suffit)
+
+Le corpus est un dossier de fichiers .html : par défaut les pages enregistrées de
+benchmarks/corpus/. Avec --synthetic (ou si le dossier est vide), des pages synthétiques de
+tailles variées sont générées (benchmarks/html_corpus.py).
+
+Usage:
+    python3 benchmarks/bench_scrape.py [--corpus benchmarks/corpus] [--max-bytes 2097152]
+    python3 benchmarks/bench_scrape.py --synthetic [--pages-per-size 4]
+"""
+
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.absolute() / "scripts"))
+from veille_extract import StreamingTextExtractor, extract_with_bs4, MAX_CONTENT_CHARS
+from html_corpus import CORPUS_DIR, SYNTHETIC_SIZES_KB, corpus_files, write_synthetic
+
+CHUNK_SIZE = 64 * 1024
+# Pages synthétiques : tailles communes + une page de doc de plusieurs Mo (au-delà du plafond)
+SCRAPE_SIZES_KB = SYNTHETIC_SIZES_KB + [4000]
+
+
+def legacy(data, max_bytes):
+    return extract_with_bs4(data), len(data)
+
+
+def streaming(data, max_bytes):
+    extractor = StreamingTextExtractor(MAX_CONTENT_CHARS)
+    received = 0
+    for start in range(0, len(data), CHUNK_SIZE):
+        chunk = data[start:start + CHUNK_SIZE]
+        received += len(chunk)
+        extractor.feed(chunk)
+        if extractor.done or received >= max_bytes:
+            break
+    return extractor.close(), received
+
+
+def measure(label, extract, pages, max_bytes):
+    tracemalloc.start()
+    start = time.perf_counter()
+    received = 0
+    chars = 0
+    for data in pages:
+        (text, _, _), size = extract(data, max_bytes)
+        received += size
+        chars += len(text)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<12} {elapsed * 1000:9.1f} ms   {len(pages) / elapsed:8.1f} pages/s   "
+          f"lus {received / 1024 / 1024:7.1f} Mo   pic mémoire {peak / 1024 / 1024:7.1f} Mo   "
+          f"texte moyen {chars // len(pages)} car.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=Path, default=CORPUS_DIR, help="dossier de pages .html")
+    parser.add_argument("--synthetic", action="store_true", help="pages synthétiques au lieu du corpus")
+    parser.add_argument("--pages-per-size", type=int, default=4, help="pages synthétiques par taille")
+    parser.add_argument("--max-bytes", type=int, default=2 * 1024 * 1024, help="plafond d'octets par page")
+    args = parser.parse_args()
+
+    files = [] if args.synthetic else corpus_files(args.corpus)
+    with tempfile.TemporaryDirectory() as tmp:
+        if not files:
+            print(f"📂 Pages synthétiques ({SCRAPE_SIZES_KB} Ko)")
+            files = write_synthetic(tmp, args.pages_per_size * len(SCRAPE_SIZES_KB), SCRAPE_SIZES_KB)
+        pages = [f.read_bytes() for f in files]
+
+    total = sum(len(p) for p in pages)
+    print(f"📄 {len(pages)} pages, {total / 1024 / 1024:.1f} Mo au total\n")
+
+    try:
+        import bs4  # noqa: F401
+        measure("bs4", legacy, pages, args.max_bytes)
+    except ImportError:
+        print("  bs4          non installé, référence ignorée")
+    measure("streaming", streaming, pages, args.max_bytes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Services factices pour mesurer le pipeline hors ligne (voir bench_pipeline.py) :
+
+  - FakeGitHub  : API REST des issues (liste paginée + ETag, création, commentaire, fermeture)
+                  et mutations GraphQL groupées (addComment / closeIssue)
+  - FakeMistral : POST /v1/chat/completions compatible Mistral (réponse complète ou flux SSE),
+                  latence et taux d'erreurs 503 configurables
+  - CorpusServer : pages d'articles /articles/<n>.html : d'abord les pages enregistrées du
+                  corpus (benchmarks/corpus/), puis des pages synthétiques (html_corpus.py)
+
+Le pipeline y est branché par GITHUB_API_URL et MISTRAL_ENDPOINT.
+
+Usage:
+    python3 benchmarks/fake_services.py [--issues 50] [--mistral-ms 800]   # serveurs + variables à exporter
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs, urlencode
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.append(str(Path(__file__).parent.parent.absolute() / "scripts"))
+from veille_json import THEMATIQUES
+from html_corpus import CORPUS_DIR, corpus_files, synthetic_page
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Gestionnaire commun : délègue au service (self.server.service)."""
+
+    protocol_version = "HTTP/1.1"
+
+    def handle(self):
+        # L'extracteur en flux ferme la connexion dès qu'il a assez lu : rien d'anormal
+        try:
+            super().handle()
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+
+    def _dispatch(self, method):
+        service = self.server.service
+        length = int(self.headers.get("Content-Length", 0) or 0)
+        body = self.rfile.read(length) if length else b""
+        service.pause()
+        service.handle(self, method, urlsplit(self.path), body)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PATCH(self):
+        self._dispatch("PATCH")
+
+    def send_json(self, status, data, headers=None):
+        payload = json.dumps(data).encode() if data is not None else b""
+        self.send_response(status)
+        if data is not None:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeService:
+    """Serveur HTTP local (port libre) dans un thread, avec latence par requête."""
+
+    def __init__(self, latency_ms=0, seed=42):
+        self.latency = latency_ms / 1000
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0}
+        self.httpd = None
+
+    def start(self):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.service = self
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.stats[name] = self.stats.get(name, 0) + value
+
+    def pause(self):
+        """Latence simulée (±20 %)."""
+        self.count("requests")
+        if self.latency:
+            with self.lock:
+                factor = self.rng.uniform(0.8, 1.2)
+            time.sleep(self.latency * factor)
+
+    def handle(self, handler, method, parts, body):
+        raise NotImplementedError
+
+
+class FakeGitHub(FakeService):
+    """Issues d'un dépôt unique, en mémoire."""
+
+    def __init__(self, latency_ms=50, seed=42):
+        super().__init__(latency_ms, seed)
+        self.issues = {}
+        self.node_ids = {}
+        # Mutations exécutées puis répondues en 502 (réponse perdue), pour tester la reprise
+        self.lost_responses = 0
+
+    def add_issue(self, body, title="Article à traiter", labels=("to_process",)):
+        with self.lock:
+            number = len(self.issues) + 1
+            issue = {
+                "number": number,
+                "node_id": f"I_bench{number}",
+                "title": title,
+                "body": body,
+                "state": "open",
+                "labels": [{"name": label} for label in labels],
+                "updated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "comments": [],
+            }
+            self.issues[number] = issue
+            self.node_ids[issue["node_id"]] = number
+            return dict(issue)
+
+    def open_issues(self):
+        with self.lock:
+            return sum(1 for issue in self.issues.values() if issue["state"] == "open")
+
+    def _comment(self, number, body):
+        with self.lock:
+            self.issues[number]["comments"].append(body)
+        self.count("comments")
+
+    def _close(self, number):
+        with self.lock:
+            self.issues[number]["state"] = "closed"
+        self.count("closed")
+
+    def _list(self, handler, parts):
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        label = query.get("labels")
+        state = query.get("state", "open")
+        since = query.get("since")
+        per_page = int(query.get("per_page", 30))
+        page = int(query.get("page", 1))
+        with self.lock:
+            selected = [
+                {k: v for k, v in issue.items() if k != "comments"}
+                for issue in self.issues.values()
+                if (state == "all" or issue["state"] == state)
+                and (not label or any(l["name"] == label for l in issue["labels"]))
+                and (not since or issue["updated_at"] >= since)
+            ]
+        items = selected[(page - 1) * per_page:page * per_page]
+        etag = '"' + hashlib.sha1(json.dumps(selected, sort_keys=True).encode()).hexdigest() + '"'
+        headers = {
+            "ETag": etag,
+            "X-RateLimit-Resource": "core",
+            "X-RateLimit-Remaining": "4999",
+            "X-RateLimit-Reset": str(int(time.time()) + 3600),
+        }
+        if handler.headers.get("If-None-Match") == etag:
+            self.count("not_modified")
+            return handler.send_json(304, None, headers)
+        if page * per_page < len(selected):
+            query["page"] = page + 1
+            headers["Link"] = f'<{self.url}{parts.path}?{urlencode(query)}>; rel="next"'
+        handler.send_json(200, items, headers)
+
+    def _graphql(self, handler, body):
+        request = json.loads(body)
+        variables = request.get("variables", {})
+        data = {}
+        for alias, index in re.findall(r"(\w+): node\(id: \$id(\d+)\)", request["query"]):
+            number = self.node_ids.get(variables.get(f"id{index}"))
+            if number is None:
+                data[alias] = None
+                continue
+            with self.lock:
+                issue = self.issues[number]
+                data[alias] = {"state": issue["state"].upper(),
+                               "comments": {"nodes": [{"body": c} for c in issue["comments"][-20:]]}}
+        for alias, mutation, index in re.findall(r"(\w+): (addComment|closeIssue)\(input: \{\w+: \$id(\d+)", request["query"]):
+            number = self.node_ids.get(variables.get(f"id{index}"))
+            if number is None:
+                continue
+            if mutation == "addComment":
+                self._comment(number, variables.get(f"body{index}", ""))
+            else:
+                self._close(number)
+            data[alias] = {"clientMutationId": None}
+        self.count("graphql")
+        with self.lock:
+            lost = data and self.lost_responses > 0 and "mutation" in request["query"]
+            if lost:
+                self.lost_responses -= 1
+        if lost:
+            return handler.send_json(502, {"message": "Bad Gateway"})
+        handler.send_json(200, {"data": data}, {"X-RateLimit-Resource": "graphql",
+                                                "X-RateLimit-Remaining": "4999",
+                                                "X-RateLimit-Reset": str(int(time.time()) + 3600)})
+
+    def handle(self, handler, method, parts, body):
+        path = parts.path.rstrip("/")
+        if path == "/graphql" and method == "POST":
+            return self._graphql(handler, body)
+        match = re.fullmatch(r"/repos/[^/]+/[^/]+/issues(?:/(\d+))?(/comments)?", path)
+        if not match:
+            return handler.send_json(404, {"message": "Not Found"})
+        number = int(match.group(1)) if match.group(1) else None
+        if number is not None and number not in self.issues:
+            return handler.send_json(404, {"message": "Not Found"})
+
+        if number is None and method == "GET":
+            self.count("list")
+            return self._list(handler, parts)
+        if number is None and method == "POST":
+            data = json.loads(body)
+            issue = self.add_issue(data.get("body", ""), data.get("title", ""), data.get("labels", ()))
+            self.count("created")
+            return handler.send_json(201, issue)
+        if match.group(2) and method == "POST":
+            self._comment(number, json.loads(body).get("body", ""))
+            return handler.send_json(201, {"id": number})
+        if method == "PATCH":
+            if json.loads(body).get("state") == "closed":
+                self._close(number)
+            return handler.send_json(200, {"number": number, "state": self.issues[number]["state"]})
+        handler.send_json(405, {"message": "Method Not Allowed"})
+
+
+class FakeMistral(FakeService):
+    """Réponses déterministes : analyse JSON (titre unique par source) ou résumé de partie."""
+
+    def __init__(self, latency_ms=800, error_rate=0.0, seed=42):
+        super().__init__(latency_ms, seed)
+        self.error_rate = error_rate
+        self.in_flight = 0
+
+    def pause(self):
+        with self.lock:
+            self.in_flight += 1
+            self.stats["max_in_flight"] = max(self.stats.get("max_in_flight", 0), self.in_flight)
+        try:
+            super().pause()
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def _content(self, prompt):
+        source = re.search(r"Source: (\S+)", prompt)
+        seed = source.group(1) if source else prompt[:200]
+        digest = int(hashlib.sha1(seed.encode()).hexdigest(), 16)
+        if "Format JSON attendu" not in prompt and "Réponse à corriger" not in prompt:
+            # Étape map (article long) : résumé en texte libre
+            return " ".join(f"résumé{(digest >> i) % 97}" for i in range(180))
+        words = re.findall(r"\w{6,}", prompt[-3000:])[:40] or ["article"]
+        return json.dumps({
+            "titre": f"Analyse {digest % 10**8:08d} : {' '.join(words[:5])}",
+            "resume": " ".join(words[i % len(words)] for i in range(350)),
+            "tags": sorted({words[i % len(words)].lower() for i in range(0, 25, 5)}),
+            "thematique": THEMATIQUES[digest % len(THEMATIQUES)],
+        }, ensure_ascii=False)
+
+    def handle(self, handler, method, parts, body):
+        if parts.path.rstrip("/") != "/v1/chat/completions" or method != "POST":
+            return handler.send_json(404, {"object": "error", "message": "Not Found"})
+        with self.lock:
+            failed = self.rng.random() < self.error_rate
+        if failed:
+            self.count("errors")
+            return handler.send_json(503, {"object": "error", "message": "Service Unavailable"})
+
+        request = json.loads(body)
+        prompt = "".join(m.get("content", "") for m in request.get("messages", []))
+        content = self._content(prompt)
+        usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        self.count("prompt_tokens", usage["prompt_tokens"])
+        self.count("completion_tokens", usage["completion_tokens"])
+        base = {"id": "bench", "object": "chat.completion", "created": int(time.time()), "model": request.get("model")}
+
+        if not request.get("stream"):
+            return handler.send_json(200, dict(base, usage=usage, choices=[
+                {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+            ]))
+
+        # Flux SSE : morceaux de 200 caractères, bilan d'usage dans le dernier
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/event-stream")
+        handler.send_header("Connection", "close")
+        handler.end_headers()
+        pieces = [content[i:i + 200] for i in range(0, len(content), 200)]
+        for i, piece in enumerate(pieces):
+            last = i == len(pieces) - 1
+            chunk = dict(base, object="chat.completion.chunk", choices=[
+                {"index": 0, "delta": {"content": piece}, "finish_reason": "stop" if last else None}
+            ])
+            if last:
+                chunk["usage"] = usage
+            handler.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        handler.wfile.write(b"data: [DONE]\n\n")
+        handler.close_connection = True
+
+
+class CorpusServer(FakeService):
+    """
+    /articles/<n>.html : n-ième page enregistrée du corpus, puis pages synthétiques au-delà
+    (une page réelle servie deux fois serait un doublon et ne passerait pas par Mistral).
+    """
+
+    def __init__(self, corpus_dir=CORPUS_DIR, latency_ms=100, seed=42):
+        super().__init__(latency_ms, seed)
+        self.files = corpus_files(corpus_dir) if corpus_dir else []
+        self.pages = {}
+
+    def page(self, index):
+        if index < len(self.files):
+            return self.files[index].read_bytes()
+        with self.lock:
+            if index not in self.pages:
+                self.pages[index] = synthetic_page(index)[0]
+            return self.pages[index]
+
+    def article_url(self, index):
+        return f"{self.url}/articles/{index}.html"
+
+    def handle(self, handler, method, parts, body):
+        match = re.fullmatch(r"/articles/(\d+)\.html", parts.path)
+        if method != "GET" or not match:
+            return handler.send_json(404, {"message": "Not Found"})
+        data = self.page(int(match.group(1)))
+        self.count("bytes", len(data))
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/html; charset=utf-8")
+        handler.send_header("Content-Length", str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--issues", type=int, default=50, help="issues ouvertes au démarrage")
+    parser.add_argument("--corpus", type=Path, default=CORPUS_DIR, help="dossier de pages .html")
+    parser.add_argument("--github-ms", type=float, default=50, help="latence GitHub")
+    parser.add_argument("--mistral-ms", type=float, default=800, help="latence Mistral")
+    parser.add_argument("--site-ms", type=float, default=100, help="latence des sites")
+    args = parser.parse_args()
+
+    github = FakeGitHub(args.github_ms).start()
+    mistral = FakeMistral(args.mistral_ms).start()
+    corpus = CorpusServer(args.corpus, args.site_ms).start()
+    for i in range(args.issues):
+        github.add_issue(corpus.article_url(i))
+    print(f"🧪 {args.issues} issue(s) ouvertes, variables à exporter :\n")
+    print(f"export GITHUB_API_URL={github.url}")
+    print(f"export MISTRAL_ENDPOINT={mistral.url}")
+    print("export GITHUB_TOKEN=bench MISTRAL_API_KEY=bench VEILLE_CACHE_DIR=$(mktemp -d)\n")
+    print("⚠️  process_veille.py écrit les fiches dans docs/ : le lancer depuis une copie du dépôt")
+    print("Ctrl+C pour arrêter")
+    try:
+        while True:
+            time.sleep(5)
+    except KeyboardInterrupt:
+        print(f"\n📊 GitHub {github.stats}\n📊 Mistral {mistral.stats}\n📊 Sites {corpus.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Corpus de pages HTML partagé par les benchmarks (bench_scrape, bench_extractors, bench_pipeline).
+
+benchmarks/corpus/ contient quelques pages réelles enregistrées (voir corpus/README.md),
+accompagnées si possible du texte attendu (<page>.txt). Des pages synthétiques peuvent aussi
+être générées : un article au vocabulaire propre (pas de faux doublons SimHash entre pages),
+entouré de boilerplate (bannière cookies, menus, barre latérale, articles liés, commentaires),
+avec son texte attendu.
+
+Usage:
+    python3 benchmarks/html_corpus.py <dossier> [--pages 20]   # écrit des pages synthétiques
+"""
+
+import random
+import argparse
+from pathlib import Path
+
+CORPUS_DIR = Path(__file__).parent / "corpus"
+# Tailles des pages synthétiques (Ko) : brève, billet de blog, article long, pages de doc
+SYNTHETIC_SIZES_KB = [15, 40, 120, 400, 1500]
+
+SYLLABLES = "ka lo mi ne ru sa te vo di pa xe qui bra tor len fis gau mer zol chi".split()
+# Vocabulaire du boilerplate, commun à toutes les pages
+BOILERPLATE = ("accueil blog docs contact newsletter abonnement cookies accepter partager "
+               "commentaires répondre connexion mentions légales confidentialité").split()
+
+
+def corpus_files(directory=CORPUS_DIR):
+    """Pages .html d'un dossier de corpus (liste vide si absent)."""
+    directory = Path(directory)
+    return sorted(directory.glob("*.htm*")) if directory.is_dir() else []
+
+
+def synthetic_page(index, size_kb=None):
+    """Page d'article synthétique n° `index`. Retourne (HTML en octets, texte attendu)."""
+    rng = random.Random(index)
+    vocabulary = ["".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(400)]
+    size_kb = size_kb or SYNTHETIC_SIZES_KB[index % len(SYNTHETIC_SIZES_KB)]
+
+    def sentence(words, pool=vocabulary):
+        return " ".join(rng.choice(pool) for _ in range(words)).capitalize() + "."
+
+    title = sentence(6)[:-1]
+    links = " ".join(f'<li><a href="/{w}">{w}</a></li>' for w in BOILERPLATE)
+    head = (
+        '<!DOCTYPE html><html><head><meta charset="utf-8">'
+        f"<title>{title}</title>"
+        f'<meta property="og:image" content="https://example.com/cover-{index}.png">'
+        f'<link rel="canonical" href="https://example.com/articles/{index}">'
+        '<script>window.dataLayer = [];</script><style>body { color: #333 }</style></head><body>'
+        f'<div id="cookie-banner"><p>{sentence(20, BOILERPLATE)}</p></div>'
+        f"<header><nav><ul>{links}</ul></nav></header>"
+        f'<div class="layout"><main><article class="post"><h1>{title}</h1>'
+    )
+    comments = "".join(f'<div class="comment"><p>{sentence(15, BOILERPLATE)}</p></div>'
+                       for _ in range(rng.randint(0, 10)))
+    tail = (
+        "</article>"
+        f'<section class="related-posts"><h3>À lire aussi</h3><ul>{links}</ul></section>'
+        f'<section id="comments"><h3>Commentaires</h3>{comments}</section></main>'
+        f'<aside class="sidebar"><p>{sentence(30, BOILERPLATE)}</p><ul>{links}</ul></aside></div>'
+        f"<footer><p>{sentence(20, BOILERPLATE)}</p><ul>{links}</ul></footer></body></html>"
+    )
+
+    paragraphs = []
+    length = len(head) + len(tail)
+    while length < size_kb * 1024:
+        paragraph = " ".join(sentence(rng.randint(10, 25)) for _ in range(rng.randint(2, 6)))
+        paragraphs.append(paragraph)
+        length += len(paragraph) + 8
+    html = head + "".join(f"<p>{p}</p>\n" for p in paragraphs) + tail
+    return html.encode("utf-8"), title + "\n" + "\n".join(paragraphs)
+
+
+def write_synthetic(root, count, sizes_kb=SYNTHETIC_SIZES_KB):
+    """Écrit `count` pages synthétiques (page-<n>.html + page-<n>.txt). Retourne les pages HTML."""
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    files = []
+    for index in range(count):
+        html, expected = synthetic_page(index, sizes_kb[index % len(sizes_kb)])
+        path = root / f"page-{index}.html"
+        path.write_bytes(html)
+        path.with_suffix(".txt").write_text(expected, encoding="utf-8")
+        files.append(path)
+    return files
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", type=Path, help="dossier de destination")
+    parser.add_argument("--pages", type=int, default=20, help="nombre de pages")
+    args = parser.parse_args()
+    files = write_synthetic(args.directory, args.pages)
+    print(f"📄 {len(files)} page(s) synthétique(s) écrite(s) dans {args.directory}")
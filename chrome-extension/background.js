@@ -76,7 +76,9 @@ async function captureLink(url, pageTitle) {
     const result = await captureArticle(config, url, `Capturé depuis: ${pageTitle}`);
     const data = result.data;
     const msg = result.method === 'local'
-      ? `Traité localement (Issue #${data.issue_number})`
+      ? (data.status === 'exists'
+        ? `Déjà dans la veille (${data.fiche})`
+        : `Traitement local en cours (job ${data.job_id.slice(0, 8)})`)
       : `Issue #${data.number} créée`;
     showNotification(`✅ Article ajouté!`, msg);
   } catch (error) {
@@ -99,7 +101,9 @@ async function capturePage(url, title) {
     const result = await captureArticle(config, url, '');
     const data = result.data;
     const msg = result.method === 'local'
-      ? `Traité localement (Issue #${data.issue_number})`
+      ? (data.status === 'exists'
+        ? `Déjà dans la veille (${data.fiche})`
+        : `Traitement local en cours (job ${data.job_id.slice(0, 8)})`)
       : `Issue #${data.number} créée`;
     showNotification(`✅ Article ajouté!`, msg);
   } catch (error) {
@@ -218,9 +218,13 @@ captureBtn.addEventListener('click', async () => {
     const result = await captureArticle(config, url, description, tags);
     const data = result.data;
 
-    if (result.method === 'local') {
-      successMessage.textContent = `Article traité localement! (GitHub Issue #${data.issue_number})`;
-      currentIssueUrl = `https://github.com/${config.user}/${config.repo}/issues/${data.issue_number}`;
+    if (result.method === 'local' && data.status === 'exists') {
+      successMessage.textContent = `Article déjà dans la veille (${data.fiche})`;
+      currentIssueUrl = `https://github.com/${config.user}/${config.repo}/issues`;
+    } else if (result.method === 'local') {
+      // Le serveur local répond immédiatement (202) et traite la capture en arrière-plan
+      successMessage.textContent = `Article en cours de traitement local (job ${data.job_id.slice(0, 8)})`;
+      currentIssueUrl = `https://github.com/${config.user}/${config.repo}/issues`;
     } else {
       successMessage.textContent = `Issue #${data.number} créée avec succès!`;
       currentIssueUrl = data.html_url;
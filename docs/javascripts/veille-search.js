@@ -0,0 +1,87 @@
+// Recherche dans l'index fragmenté généré par scripts/veille_search.py (docs/search/).
+// Seuls meta.json, facets.json et les fragments des mots tapés sont téléchargés.
+(function () {
+  const root = document.getElementById("veille-search");
+  if (!root) return;
+
+  const base = root.dataset.root || "../";
+  const cache = new Map();
+  const fetchJson = (path) => {
+    if (!cache.has(path)) {
+      cache.set(path, fetch(base + "search/" + path).then((r) => (r.ok ? r.json() : {})).catch(() => ({})));
+    }
+    return cache.get(path);
+  };
+
+  // Même repli que veille_search.fold() : minuscules, sans accents
+  const fold = (text) => text.toLowerCase().normalize("NFKD").replace(/[\u0300-\u036f]/g, "");
+  const tokenize = (text, stopwords) =>
+    (fold(text).match(/[a-z0-9]+/g) || []).filter((w) => w.length > 1 && !stopwords.has(w));
+
+  const input = root.querySelector("input");
+  const category = root.querySelector("select");
+  const results = root.querySelector("ol");
+  const status = root.querySelector("p");
+
+  async function init() {
+    const facets = await fetchJson("facets.json");
+    for (const name of Object.keys(facets.categories || {}).sort()) {
+      category.add(new Option(name, name));
+    }
+  }
+
+  async function search() {
+    const meta = await fetchJson("meta.json");
+    const words = tokenize(input.value, new Set(meta.stopwords || []));
+    let scores = null;
+    for (const word of words) {
+      const key = word.slice(0, meta.prefix);
+      const shard = (meta.shards || []).includes(key) ? await fetchJson("terms/" + key + ".json") : {};
+      const wordScores = new Map();
+      for (const [term, postings] of Object.entries(shard)) {
+        if (!term.startsWith(word)) continue;
+        const idf = Math.log(1 + meta.docs / postings.length);
+        for (const [id, weight] of postings) wordScores.set(id, (wordScores.get(id) || 0) + weight * idf);
+      }
+      // Tous les mots de la requête doivent être présents
+      scores = scores === null ? wordScores
+        : new Map([...scores].filter(([id]) => wordScores.has(id)).map(([id, s]) => [id, s + wordScores.get(id)]));
+    }
+
+    if (category.value) {
+      const facets = await fetchJson("facets.json");
+      const allowed = new Set(facets.categories[category.value] || []);
+      scores = scores === null ? new Map([...allowed].map((id) => [id, 0]))
+        : new Map([...scores].filter(([id]) => allowed.has(id)));
+    }
+
+    results.innerHTML = "";
+    if (scores === null) {
+      status.textContent = "";
+      return;
+    }
+    const top = [...scores].sort((a, b) => b[1] - a[1]).slice(0, 30);
+    status.textContent = scores.size + " fiche(s)";
+    for (const [id] of top) {
+      const block = await fetchJson("docs/" + Math.floor(id / meta.block) + ".json");
+      const doc = block[id];
+      if (!doc) continue;
+      const [title, url, date, cat, tags] = doc;
+      const item = document.createElement("li");
+      const link = document.createElement("a");
+      link.href = base + url;
+      link.textContent = title;
+      item.append(link, " — " + [date, cat].filter(Boolean).join(" · "));
+      if (tags.length) item.append(document.createElement("br"), tags.map((t) => "#" + t).join(" "));
+      results.append(item);
+    }
+  }
+
+  let timer;
+  input.addEventListener("input", () => {
+    clearTimeout(timer);
+    timer = setTimeout(search, 200);
+  });
+  category.addEventListener("change", search);
+  init();
+})();
@@ -7,28 +7,72 @@ et génère les fiches Markdown.
 
 import os
 import sys
-import requests
 import datetime
+import time
 import re
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from urllib.parse import urljoin
 import yaml
+import requests
 from dotenv import load_dotenv
-# trafilatura supprimé car incompatible avec Python 3.14
-
 
 # Charger les variables d'environnement
 # On cherche le .env à la racine du projet
+# (avant les modules veille_*, qui lisent leur configuration à l'import)
 SCRIPT_DIR = Path(__file__).parent.absolute()
 PROJECT_ROOT = SCRIPT_DIR.parent
 ENV_PATH = PROJECT_ROOT / ".env"
 load_dotenv(dotenv_path=ENV_PATH)
 
+from veille_cache import SCRAPE_CACHE, ANALYSIS_CACHE, GITHUB_CACHE, hash_key
+from veille_index import FicheManifest, UrlIndex, normalize_url
+from veille_http import get_session
+from veille_github import GitHubWriteBack, GITHUB_RATE_LIMITER, GITHUB_BATCH_SIZE, GITHUB_API_URL
+from veille_dedup import SimHashIndex, simhash
+# Extraction du contenu principal : backend choisi par VEILLE_EXTRACTOR
+# (trafilatura n'est plus une dépendance : incompatible avec Python 3.14, backend optionnel)
+from veille_extract import make_extractor, MAX_CONTENT_CHARS
+from veille_budget import estimate_tokens, choose_model, map_model, needs_chunking, split_chunks
+from veille_mistral import get_gateway, MISTRAL_WORKERS
+from veille_json import JsonStreamParser, validate_analysis, THEMATIQUES
+from veille_state import StateStore, StageError
+from veille_io import write_atomic, BatchWriter
+from veille_search import SearchIndex
+from veille_pages import collect_articles, render_pages, PageSet
+from veille_metrics import METRICS, profiling
+
 # --- CONFIGURATION ---
 MISTRAL_API_KEY = os.getenv("MISTRAL_API_KEY", "").strip()
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN", "").strip()
 GITHUB_USER = os.getenv("GITHUB_USER", "martinregent").strip()
 REPO_NAME = os.getenv("REPO_NAME", "veille").strip()
+MISTRAL_MODEL = os.getenv("MISTRAL_MODEL", "mistral-large-latest").strip()
+# Mode JSON de l'API (response_format json_object) pour l'analyse
+MISTRAL_JSON_MODE = os.getenv("VEILLE_MISTRAL_JSON_MODE", "1").strip() != "0"
+ISSUE_LABEL = os.getenv("VEILLE_ISSUE_LABEL", "to_process").strip()
+# Relecture complète de la liste des issues (évince les issues supprimées ou transférées), en heures
+ISSUES_FULL_REFRESH_HOURS = float(os.getenv("VEILLE_ISSUES_FULL_REFRESH_HOURS", str(7 * 24)))
+
+# --- CONCURRENCE ---
+# Nombre maximal d'appels simultanés par étape (scraping, Mistral)
+# Les appels Mistral passent par la passerelle partagée (veille_mistral : concurrence + quota)
+# Les écritures GitHub sont groupées par lots (voir veille_github.GITHUB_BATCH_SIZE)
+SCRAPE_WORKERS = max(1, int(os.getenv("VEILLE_SCRAPE_WORKERS", "8")))
+
+# --- CACHE ---
+# Durée (secondes) pendant laquelle une page scrapée est réutilisée sans aucune requête réseau.
+# Au-delà, elle est revalidée via ETag / Last-Modified.
+SCRAPE_CACHE_FRESH = int(os.getenv("VEILLE_SCRAPE_CACHE_FRESH", str(7 * 86400)))
+
+# --- SCRAPING ---
+# Taille maximale téléchargée par page (les pages de doc de plusieurs Mo sont tronquées)
+SCRAPE_MAX_BYTES = int(os.getenv("VEILLE_SCRAPE_MAX_BYTES", str(2 * 1024 * 1024)))
+SCRAPE_CHUNK_SIZE = 64 * 1024
+# Types de contenu acceptés (un PDF ou une image ne passe pas par l'extraction HTML)
+HTML_CONTENT_TYPES = {"text/html", "application/xhtml+xml", "text/plain"}
 
 # --- PATHS ---
 # Définir la racine du projet de manière absolue
@@ -47,32 +91,108 @@ if not GITHUB_TOKEN:
 
 # --- FONCTIONS ---
 
+def _fetch_all_pages(url, headers, params):
+    """GET paginé : suit l'en-tête Link jusqu'à la dernière page. Retourne (réponse initiale, éléments)."""
+    GITHUB_RATE_LIMITER.wait()
+    first = get_session().get(url, headers=headers, params=params, timeout=10)
+    GITHUB_RATE_LIMITER.update(first)
+    if first.status_code != 200:
+        return first, None
+
+    items = first.json()
+    next_url = first.links.get("next", {}).get("url")
+    while next_url:
+        GITHUB_RATE_LIMITER.wait()
+        resp = get_session().get(next_url, headers={"Authorization": headers["Authorization"]}, timeout=10)
+        GITHUB_RATE_LIMITER.update(resp)
+        if resp.status_code != 200:
+            return resp, None
+        items.extend(resp.json())
+        next_url = resp.links.get("next", {}).get("url")
+    return first, items
+
 def get_open_issues():
-    """Récupère les issues GitHub à traiter (label 'to_process' ou titre spécifique)."""
-    url = f"https://api.github.com/repos/{GITHUB_USER}/{REPO_NAME}/issues"
+    """
+    Récupère les issues GitHub à traiter (label 'to_process').
+    Toutes les pages sont parcourues ; entre deux runs, seules les issues modifiées
+    depuis le dernier passage sont téléchargées (since + ETag, un 304 si rien n'a changé),
+    sans filtre de label pour voir aussi celles qui l'ont perdu. La liste complète est relue
+    périodiquement (VEILLE_ISSUES_FULL_REFRESH_HOURS, bien plus long que l'intervalle du cron) :
+    une issue supprimée ou transférée n'apparaît plus dans les réponses incrémentales. Chaque
+    requête garde son propre ETag : une nuit sans changement coûte un 304, relecture complète
+    comprise.
+    """
+    url = f"{GITHUB_API_URL}/repos/{GITHUB_USER}/{REPO_NAME}/issues"
     headers = {"Authorization": f"token {GITHUB_TOKEN}"}
-    # On récupère toutes les issues ouvertes sans filtrer par label ici
-    params = {"state": "open", "per_page": 100}
+    cache_key = hash_key("issues", GITHUB_USER, REPO_NAME, ISSUE_LABEL)
+    state, _ = GITHUB_CACHE.get(cache_key)
+    state = state or {}
+    since = state.get("since")
+    full_at = state.get("full_at")
+    full = not since or not full_at or time.time() - full_at > ISSUES_FULL_REFRESH_HOURS * 3600
+    known_issues = {} if full else state.get("issues", {})
+    etags = {"full": state.get("full_etag"), "since": state.get("etag")}
+
+    if full:
+        # Liste complète, filtrée par label côté serveur : remplace le cache
+        params = {"labels": ISSUE_LABEL, "state": "open", "per_page": 100}
+        full_at = time.time()
+        etag_key = "full"
+    else:
+        # Incrémental : issues modifiées depuis le dernier run, fermées et sans le label comprises
+        params = {"state": "all", "since": since, "per_page": 100}
+        etag_key = "since"
+    if etags[etag_key]:
+        headers["If-None-Match"] = etags[etag_key]
 
     try:
-        resp = requests.get(url, headers=headers, params=params, timeout=10)
-        if resp.status_code == 200:
-            all_issues = resp.json()
-            # Filtrage côté client : Label 'to_process' OU Titre 'Article à traiter'
-            filtered_issues = [
-                i for i in all_issues
-                if any(l['name'] == 'to_process' for l in i['labels']) or
-                "Article à traiter" in i['title']
-            ]
-            return filtered_issues
-        else:
+        resp, fetched = _fetch_all_pages(url, headers, params)
+        if resp.status_code == 304:
+            print("💾 Aucune modification des issues depuis le dernier run (304)")
+            if full:
+                known_issues = state.get("issues", {})
+                GITHUB_CACHE.set(cache_key, dict(state, full_at=full_at))
+        elif fetched is None:
             print(f"❌ Erreur API GitHub: {resp.status_code}")
             print(f"   {resp.text}")
             return []
+        else:
+            for issue in fetched:
+                if "pull_request" in issue:
+                    continue
+                number = str(issue["number"])
+                labels = [{"name": l["name"]} for l in issue["labels"]]
+                if issue["state"] == "open" and any(l["name"] == ISSUE_LABEL for l in labels):
+                    known_issues[number] = {
+                        "number": issue["number"],
+                        "node_id": issue.get("node_id"),
+                        "title": issue["title"],
+                        "body": issue["body"],
+                        "labels": labels,
+                        "updated_at": issue["updated_at"],
+                    }
+                else:
+                    known_issues.pop(number, None)
+                if not since or issue["updated_at"] > since:
+                    since = issue["updated_at"]
+
+            etags[etag_key] = resp.headers.get("ETag")
+            if since != state.get("since"):
+                # Nouvelle date : la prochaine requête incrémentale n'a pas encore d'ETag
+                etags["since"] = None
+            GITHUB_CACHE.set(cache_key, {
+                "since": since,
+                "full_at": full_at,
+                "etag": etags["since"],
+                "full_etag": etags["full"],
+                "issues": known_issues,
+            })
     except Exception as e:
         print(f"❌ Erreur lors de la récupération des issues: {e}")
         return []
 
+    return sorted(known_issues.values(), key=lambda i: i["number"])
+
 def extract_issue_data(issue_body):
     """
     Extrait les données de l'issue (URL, note, tags).
@@ -109,62 +229,128 @@ def extract_issue_data(issue_body):
         "user_tags": []
     }
 
-def scrape_content(url):
-    """Scrape le contenu textuel et l'image d'une URL via BeautifulSoup."""
-    from bs4 import BeautifulSoup
+# Statuts HTTP pour lesquels un nouvel essai plus tard a des chances d'aboutir
+TRANSIENT_HTTP_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+def fetch_page(url):
+    """
+    Scrape une URL en passant par le cache disque.
+    Retourne un dict (text, image_url, final_url, canonical_url, etag, last_modified).
+    Lève StageError en cas d'échec (transient : timeout, erreur réseau, 429, 5xx).
+    """
+    key = hash_key(normalize_url(url))
+    cached, age = SCRAPE_CACHE.get(key)
+
+    # Entrée fraîche : aucune requête réseau
+    if cached and age < SCRAPE_CACHE_FRESH:
+        print(f"   💾 Cache scraping: {url[:60]}")
+        METRICS.add("scrape_cache_hits")
+        return cached
+
     try:
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        # Extraction de l'image og:image
-        og_image = soup.find("meta", property="og:image")
-        image_url = og_image["content"] if og_image else None
-
-        # Nettoyage basique (supprimer scripts, styles, nav, footer)
-        for script in soup(["script", "style", "nav", "footer", "noscript", "header"]):
-            script.decompose()
-
-        text = soup.get_text(separator=' ')
-        # Réduire les espaces multiples
-        clean_text = re.sub(r'\s+', ' ', text).strip()
+        # Revalidation conditionnelle d'une entrée périmée
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        # Téléchargement en flux : on s'arrête au plafond d'octets ou dès que le texte suffit
+        response = get_session().get(url, headers=headers, timeout=10, stream=True)
+        # Retries urllib3 (5xx, 429) effectués par la session partagée
+        retries = getattr(response.raw, "retries", None)
+        METRICS.add("http_retries", len(retries.history) if retries else 0)
+        try:
+            if response.status_code == 304 and cached:
+                print(f"   💾 Cache scraping revalidé (304): {url[:60]}")
+                METRICS.add("scrape_cache_hits")
+                SCRAPE_CACHE.set(key, cached)
+                return cached
+
+            response.raise_for_status()
+
+            content_type = response.headers.get('Content-Type', '')
+            mime_type = content_type.split(';')[0].strip().lower()
+            if mime_type and mime_type not in HTML_CONTENT_TYPES:
+                raise StageError(f"type de contenu non supporté ({mime_type})", transient=False)
+
+            charset = re.search(r'charset=["\']?([\w-]+)', content_type, re.IGNORECASE)
+            extractor = make_extractor(max_chars=MAX_CONTENT_CHARS, encoding=charset.group(1) if charset else None)
+            received = 0
+            for chunk in response.iter_content(chunk_size=SCRAPE_CHUNK_SIZE):
+                received += len(chunk)
+                extractor.feed(chunk)
+                if extractor.done:
+                    break
+                if received >= SCRAPE_MAX_BYTES:
+                    print(f"   ✂️  Page tronquée à {SCRAPE_MAX_BYTES // 1024} Ko: {url[:60]}")
+                    break
+            METRICS.add("bytes", received)
+            clean_text, image_url, canonical_url = extractor.close()
+        finally:
+            response.close()
 
         if not clean_text:
-             return None, None
-
-        # Limiter la taille pour ne pas exploser le contexte Mistral
-        if len(clean_text) > 15000:
-            clean_text = clean_text[:15000] + "..."
-
-        return clean_text, image_url
-
+            raise StageError("aucun texte exploitable dans la page", transient=False)
+
+        page = {
+            "url": url,
+            # URL après redirections et URL canonique déclarée par la page
+            "final_url": response.url,
+            "canonical_url": urljoin(response.url, canonical_url) if canonical_url else None,
+            "text": clean_text,
+            "image_url": image_url,
+            "etag": response.headers.get('ETag'),
+            "last_modified": response.headers.get('Last-Modified'),
+        }
+        SCRAPE_CACHE.set(key, page)
+        return page
+
+    except StageError:
+        raise
+    except requests.HTTPError as e:
+        status = e.response.status_code if e.response is not None else None
+        raise StageError(f"HTTP {status}", transient=status in TRANSIENT_HTTP_STATUSES) from e
+    except (requests.Timeout, requests.ConnectionError) as e:
+        raise StageError(f"site injoignable ({type(e).__name__})", transient=True) from e
     except Exception as e:
+        # Erreur inattendue : réessayée, la file de relance borne le nombre de tentatives
+        raise StageError(str(e) or type(e).__name__, transient=True) from e
+
+def scrape_page(url):
+    """Comme fetch_page(), mais retourne None en cas d'échec."""
+    try:
+        return fetch_page(url)
+    except StageError as e:
         print(f"   ⚠️  Erreur scraping {url}: {e}")
-        return None, None
+        return None
 
-def analyze_with_mistral(text, url, user_note="", user_tags=[]):
-    """Analyse le texte avec Mistral et retourne un JSON structuré."""
-    from mistralai.client import MistralClient
-    client = MistralClient(api_key=MISTRAL_API_KEY)
+def scrape_content(url):
+    """Scrape le contenu textuel et l'image d'une URL."""
+    page = scrape_page(url)
+    if not page:
+        return None, None
+    return page['text'], page['image_url']
 
+def build_analysis_prompt(text, url, user_note="", user_tags=[], text_label="Texte à analyser"):
+    """Prompt d'analyse finale (JSON titre / résumé / tags / thématique)."""
     user_context = ""
     if user_note:
         user_context += f"\nNote de l'utilisateur sur cet article : {user_note}"
     if user_tags:
         user_context += f"\nTags suggérés par l'utilisateur : {', '.join(user_tags)}"
 
-    prompt = f"""Analyse le texte suivant qui provient d'un article technique pour une veille technologique.
+    return f"""Analyse le texte suivant qui provient d'un article technique pour une veille technologique.
 
 INSTRUCTIONS IMPORTANTES:
 - Réponds UNIQUEMENT en JSON valide (pas de texte avant ou après)
 - Ne modifie pas la structure JSON proposée
 - Assure-toi que le JSON est parsable
 - Les tags doivent être pertinents et courts. Inclus les tags suggérés par l'utilisateur si pertinents.
-- La thématique doit être UNE SEULE parmi: [DevOps, IA & Data, Développement, Architecture, Business, Cybersécurité, Infrastructure]
+- La thématique doit être UNE SEULE parmi: [{', '.join(THEMATIQUES)}]
 - Le résumé doit faire entre 300-500 mots.
 - Intègre la note de l'utilisateur dans le résumé si elle apporte du contexte.
 
@@ -178,51 +364,138 @@ Format JSON attendu:
 
 {user_context}
 
-Texte à analyser:
+{text_label}:
 {text}
 
 ---
 Source: {url}
 """
 
-    try:
-        chat_response = client.chat(
-            model="mistral-large-latest",
-            messages=[{"role": "user", "content": prompt}]
-        )
+def build_chunk_prompt(chunk, index, total):
+    """Prompt de résumé d'une partie d'un article long (étape map)."""
+    return f"""Voici la partie {index}/{total} d'un article technique trop long pour être analysé d'un bloc.
+Résume cette partie en français en 150 à 250 mots. Conserve les faits techniques, chiffres, noms
+d'outils et conclusions. Réponds uniquement avec le résumé, sans introduction.
 
-        response_text = chat_response.choices[0].message.content.strip()
+Partie {index}/{total}:
+{chunk}
+"""
 
-        # Essayer de parser le JSON
-        json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-        if json_match:
-            response_text = json_match.group()
+def build_repair_prompt(raw_output, errors):
+    """Prompt de réparation : ne renvoie que la réponse fautive, pas l'article."""
+    return f"""La réponse JSON suivante ne respecte pas le format attendu.
 
-        try:
-            # strict=False autorise les sauts de ligne dans les chaînes (common LLM issue)
-            data = json.loads(response_text, strict=False)
-        except json.JSONDecodeError:
-            # Fallback : tentative de nettoyage des sauts de ligne non échappés
-            clean_text = response_text.replace('\n', ' ').replace('\r', '')
-            data = json.loads(clean_text, strict=False)
-
-        # Validation minimale
-        required_keys = {"titre", "resume", "tags", "thematique"}
-        if not all(key in data for key in required_keys):
-            print(f"   ⚠️  Clés manquantes dans la réponse Mistral")
-            return None
-
-        return data
-    except json.JSONDecodeError as e:
-        print(f"   ⚠️  Erreur parsing JSON Mistral: {e}")
-        print(f"   Réponse: {response_text[:200]}...")
-        return None
+Problèmes détectés :
+{chr(10).join(f"- {error}" for error in errors)}
+
+Format attendu : un objet JSON avec exactement les clés "titre" (chaîne), "resume" (chaîne),
+"tags" (liste de chaînes courtes) et "thematique" (UNE valeur parmi : {', '.join(THEMATIQUES)}).
+Corrige uniquement ce qui pose problème, sans réécrire le contenu. Réponds uniquement avec le JSON.
+
+Réponse à corriger :
+{raw_output[:8000]}
+"""
+
+def mistral_json(prompt, model):
+    """
+    Appel Mistral en mode JSON, réponse lue en flux par un parseur incrémental.
+    Retourne (analyse validée ou None, erreurs, texte brut).
+    """
+    parser = JsonStreamParser()
+    options = {"response_format": {"type": "json_object"}} if MISTRAL_JSON_MODE else {}
+    with METRICS.counting("mistral_") as counters:
+        raw_output = get_gateway().chat(prompt, model, parser=parser, counters=counters, **options)
+    data, error = parser.result()
+    if error:
+        return None, [error], raw_output
+    data, errors = validate_analysis(data)
+    return data, errors, raw_output
+
+def summarize_chunks(chunks, url):
+    """Étape map : résume chaque partie en parallèle (résumés partiels mis en cache)."""
+    model = map_model(MISTRAL_MODEL)
+    prompts = [build_chunk_prompt(chunk, i, len(chunks)) for i, chunk in enumerate(chunks, start=1)]
+    keys = [hash_key(model, prompt) for prompt in prompts]
+
+    summaries = [ANALYSIS_CACHE.get(key)[0] for key in keys]
+    missing = [i for i, cached in enumerate(summaries) if not cached]
+    summaries = [cached['summary'] if cached else None for cached in summaries]
+
+    # Un seul lot pour toutes les parties manquantes
+    with METRICS.counting("mistral_") as counters:
+        results = get_gateway().chat_batch([prompts[i] for i in missing], model, counters=counters)
+    for i, summary in zip(missing, results):
+        summaries[i] = summary
+        ANALYSIS_CACHE.set(keys[i], {"url": url, "model": model, "summary": summary})
+    return summaries
+
+# Requête refusée par Mistral (contenu ou paramètres invalides) : inutile de la rejouer
+PERMANENT_MISTRAL_STATUSES = {400, 422}
+
+def run_analysis(text, url, user_note="", user_tags=[]):
+    """
+    Analyse le texte avec Mistral et retourne un JSON structuré.
+    Les textes longs sont résumés par parties en parallèle avant l'analyse finale.
+    Lève StageError en cas d'échec.
+    """
+    tokens = estimate_tokens(text)
+    model = choose_model(tokens, MISTRAL_MODEL)
+    prompt = build_analysis_prompt(text, url, user_note, user_tags)
+
+    # Même texte + même modèle => même analyse : on réutilise le résultat mis en cache
+    cache_key = hash_key(model, prompt)
+    cached, _ = ANALYSIS_CACHE.get(cache_key)
+    if cached:
+        print(f"   💾 Cache analyse: {url[:60]}")
+        METRICS.add("analysis_cache_hits")
+        return cached['analysis']
+
+    try:
+        if needs_chunking(tokens):
+            chunks = split_chunks(text)
+            print(f"   ✂️  Article long (~{tokens} tokens) : {len(chunks)} parties résumées en parallèle")
+            summaries = summarize_chunks(chunks, url)
+            text = "\n\n".join(f"[Partie {i}/{len(summaries)}] {summary}" for i, summary in enumerate(summaries, start=1))
+            prompt = build_analysis_prompt(
+                text, url, user_note, user_tags,
+                text_label="Résumés successifs des parties de l'article (article complet trop long)"
+            )
+        else:
+            print(f"   🧮 ~{tokens} tokens, modèle {model}")
+
+        data, errors, raw_output = mistral_json(prompt, model)
+        if errors:
+            # Réparation ciblée par le petit modèle plutôt qu'une nouvelle analyse complète
+            print(f"   🩹 Réponse Mistral invalide ({'; '.join(errors)}), demande de correction")
+            data, errors, raw_output = mistral_json(build_repair_prompt(raw_output, errors), map_model(MISTRAL_MODEL))
     except Exception as e:
-        print(f"   ⚠️  Erreur Mistral: {e}")
+        status = getattr(e, "http_status", None)
+        raise StageError(f"Mistral {status or 'indisponible'} : {e}",
+                         transient=status not in PERMANENT_MISTRAL_STATUSES) from e
+
+    if errors:
+        print(f"   Réponse: {raw_output[:200]}...")
+        # Sortie non déterministe : une nouvelle tentative plus tard peut aboutir
+        raise StageError(f"réponse Mistral inexploitable ({'; '.join(errors)})", transient=True)
+
+    ANALYSIS_CACHE.set(cache_key, {"url": url, "model": model, "analysis": data})
+    return data
+
+def analyze_with_mistral(text, url, user_note="", user_tags=[]):
+    """Comme run_analysis(), mais retourne None en cas d'échec."""
+    try:
+        return run_analysis(text, url, user_note, user_tags)
+    except StageError as e:
+        print(f"   ⚠️  Erreur analyse: {e}")
         return None
 
-def create_markdown_fiche(data, url, issue_number, image_url=None):
-    """Crée le fichier Markdown de la fiche."""
+def create_markdown_fiche(data, url, issue_number, image_url=None, writer=None):
+    """
+    Crée le fichier Markdown de la fiche. Retourne son chemin, ou False en cas d'échec.
+    `writer` (ex. BatchWriter) diffère l'écriture ; par défaut elle est immédiate et atomique.
+    Un nom déjà pris (sur disque ou en attente dans `writer`) reçoit un suffixe -2, -3... :
+    l'appelant sérialise les créations pour que ce test reste valable jusqu'à l'écriture.
+    """
     date_now = datetime.datetime.now()
     year = date_now.strftime("%Y")
     month = date_now.strftime("%m")
@@ -246,6 +519,11 @@ def create_markdown_fiche(data, url, issue_number, image_url=None):
 
     safe_title = slugify(data['titre'])
     filename = base_path / f"{day}-{safe_title}.md"
+    suffix = 1
+    # Deux articles du même titre le même jour : le second ne remplace pas le premier
+    while filename.exists() or (writer is not None and filename in writer):
+        suffix += 1
+        filename = base_path / f"{day}-{safe_title}-{suffix}.md"
 
     # Frontmatter YAML pour MkDocs
     frontmatter = {
@@ -285,39 +563,26 @@ def create_markdown_fiche(data, url, issue_number, image_url=None):
 *Généré automatiquement via Mistral AI - Issue {issue_number}*
 """
 
-    # Tentative d'écriture
     try:
-        # 1. Tentative standard
-        try:
-            with open(filename, "w", encoding="utf-8") as f:
-                f.write(content)
-            print(f"   ✅ Fiche créée: {filename}")
-            return True
-        except PermissionError as e:
-            print(f"   ⚠️ Échec écriture Python ({e}), tentative via Shell...")
-            
-            # 2. Repli via Shell (cat)
-            import subprocess
-            process = subprocess.Popen(['cat', '-', '>', str(filename)], stdin=subprocess.PIPE, shell=True)
-            process.communicate(input=content.encode('utf-8'))
-            
-            if process.returncode == 0:
-                print(f"   ✅ Fiche créée via Shell: {filename}")
-                return True
-            else:
-                raise Exception(f"Shell return code: {process.returncode}")
-
-    except Exception as e:
+        if writer is not None:
+            writer.write(filename, content)
+        else:
+            write_atomic(filename, content)
+        print(f"   ✅ Fiche créée: {filename}")
+        return filename
+    except OSError as e:
         print(f"   ❌ Erreur fatale création fiche: {e}")
         return False
 
 def close_issue(issue_number):
     """Ferme une issue GitHub."""
-    url = f"https://api.github.com/repos/{GITHUB_USER}/{REPO_NAME}/issues/{issue_number}"
+    url = f"{GITHUB_API_URL}/repos/{GITHUB_USER}/{REPO_NAME}/issues/{issue_number}"
     headers = {"Authorization": f"token {GITHUB_TOKEN}"}
 
     try:
-        resp = requests.patch(url, headers=headers, json={"state": "closed"}, timeout=10)
+        GITHUB_RATE_LIMITER.wait()
+        resp = get_session().patch(url, headers=headers, json={"state": "closed"}, timeout=10)
+        GITHUB_RATE_LIMITER.update(resp)
         if resp.status_code == 200:
             print(f"   🔒 Issue #{issue_number} fermée")
             return True
@@ -330,225 +595,344 @@ def close_issue(issue_number):
 
 def add_issue_comment(issue_number, comment):
     """Ajoute un commentaire à une issue."""
-    url = f"https://api.github.com/repos/{GITHUB_USER}/{REPO_NAME}/issues/{issue_number}/comments"
+    url = f"{GITHUB_API_URL}/repos/{GITHUB_USER}/{REPO_NAME}/issues/{issue_number}/comments"
     headers = {"Authorization": f"token {GITHUB_TOKEN}"}
 
     try:
-        resp = requests.post(
+        GITHUB_RATE_LIMITER.wait()
+        resp = get_session().post(
             url,
             headers=headers,
             json={"body": comment},
             timeout=10
         )
+        GITHUB_RATE_LIMITER.update(resp)
         return resp.status_code == 201
     except Exception as e:
         print(f"   ⚠️  Erreur ajout commentaire: {e}")
         return False
 
 def update_index_page():
-    """Régénère la page d'accueil avec la liste chronologique des fiches."""
+    """
+    Régénère les pages de navigation (accueil, pages d'archive, mois, thématiques) :
+    seules les pages dont le contenu change sont réécrites.
+    """
     if not FICHES_DIR.exists():
         return
 
-    articles = []
-
-    # Parcourir tous les fichiers markdown
-    processed_titles = set()
+    # Le manifeste ne re-parse que les fiches nouvelles ou modifiées
     print(f"📂 Recherche de fiches dans: {FICHES_DIR}")
-    for file_path in FICHES_DIR.rglob("*.md"):
-        # Ignorer l'index lui-même
-        if file_path.name == "index.md": continue
-        
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                
-            # Extraction frontmatter
-            if content.startswith('---'):
-                parts = content.split('---', 2)
-                if len(parts) >= 3:
-                    try:
-                        fm = yaml.safe_load(parts[1])
-                    except Exception as e:
-                        print(f"   ⚠️  Erreur YAML dans {file_path}: {e}")
-                        continue
-                        
-                    title = fm.get('title', file_path.stem)
-                    
-                    # Dédoublonnage par titre (insensible à la casse)
-                    case_title = title.lower().strip()
-                    if case_title in processed_titles:
-                        continue
-                    processed_titles.add(case_title)
-                    
-                    date_val = fm.get('date')
-                    
-                    # Parsing robuste de la date
-                    if isinstance(date_val, (datetime.date, datetime.datetime)):
-                        date_obj = date_val if isinstance(date_val, datetime.date) else date_val.date()
-                    elif isinstance(date_val, str):
-                        try:
-                            # Tente formats ISO YYYY-MM-DD
-                            date_obj = datetime.datetime.strptime(date_val[:10], "%Y-%m-%d").date()
-                        except:
-                            date_obj = datetime.date.min
-                    else:
-                        date_obj = datetime.date.min
-                    
-                    # Chemin relatif pour le lien (MkDocs s'attend à un chemin relatif à la racine docs/)
-                    rel_path = file_path.relative_to(DOCS_DIR)
-                    
-                    articles.append({
-                        "date": date_obj,
-                        "title": title,
-                        "path": str(rel_path)
-                    })
-        except Exception as e:
-            print(f"⚠️  Erreur lecture {file_path}: {e}")
+    entries, parsed = FicheManifest(docs_dir=DOCS_DIR, fiches_dir=FICHES_DIR).refresh()
+    print(f"   🔄 {parsed} fiche(s) nouvelle(s) ou modifiée(s) relue(s)")
 
+    articles = collect_articles(entries)
     print(f"📊 {len(articles)} articles trouvés pour l'index.")
 
-    # Trier par date décroissante puis titre
-    articles.sort(key=lambda x: (x['date'], x['title']), reverse=True)
+    try:
+        written, removed = PageSet(docs_dir=DOCS_DIR).sync(render_pages(articles))
+        print(f"✅ Pages d'accueil et d'archive mises à jour: {written} réécrite(s), {removed} supprimée(s).")
+    except OSError as e:
+        print(f"❌ Échec définitif mise à jour index: {e}")
 
-    # Générer le contenu de l'index
-    index_content = """# 📰 Veille Technologique
+    # Index de recherche fragmenté (docs/search) : seuls les fragments touchés sont réécrits
+    try:
+        reindexed, written = SearchIndex().update(entries)
+        if reindexed:
+            print(f"🔎 Index de recherche: {reindexed} fiche(s) réindexée(s), {written} fichier(s) réécrit(s)")
+    except OSError as e:
+        print(f"⚠️  Index de recherche non mis à jour: {e}")
 
-## 📅 Derniers articles
+# --- MAIN ---
 
-"""
+# Sémaphore bornant le scraping concurrent (les appels Mistral sont bornés par la passerelle veille_mistral)
+_SCRAPE_SLOTS = threading.BoundedSemaphore(SCRAPE_WORKERS)
+# Sérialise la création des fiches : le choix d'un nom libre (suffixe si deux articles du
+# même titre le même jour) et sa mise en attente dans FICHE_WRITER forment une seule étape
+_FICHE_LOCK = threading.Lock()
+# Fiches de l'exécution, écrites par lots (atomiquement) avant chaque envoi vers GitHub
+FICHE_WRITER = BatchWriter()
+
+# Retours vers GitHub (commentaire + fermeture) envoyés par lots GraphQL ;
+# les fiches en attente sont écrites sur disque avant qu'une issue ne soit fermée
+WRITE_BACK = GitHubWriteBack(GITHUB_TOKEN, add_issue_comment, close_issue, before_send=FICHE_WRITER.flush)
+
+def fiche_exists(rel_path):
+    """Fiche présente dans docs/ ou encore en attente d'écriture dans FICHE_WRITER."""
+    return (DOCS_DIR / rel_path).exists() or DOCS_DIR / rel_path in FICHE_WRITER
+
+# Empreintes SimHash des articles déjà transformés en fiches
+DUP_INDEX = SimHashIndex(exists=fiche_exists)
+# URLs canoniques déjà transformées en fiches
+URL_INDEX = UrlIndex(exists=fiche_exists)
+# Étapes terminées par issue (reprise après une exécution interrompue)
+STATE = StateStore()
+
+def report_issue(issue, comment, close=True):
+    """Programme le commentaire et (par défaut) la fermeture d'une issue (envoyés par lots)."""
+    # Un lot complet est envoyé pendant l'appel : temps compté dans l'étape github_write
+    with METRICS.stage("github_write"):
+        WRITE_BACK.add(issue, comment, close=close)
+
+def report_failure(issue, url, stage, error, message):
+    """
+    Échec d'une étape. Permanent : commentaire et fermeture. Temporaire : l'URL entre dans la
+    file de relance (l'issue reste ouverte) jusqu'à épuisement des tentatives.
+    Retourne 'error' (issue fermée) ou 'retry'.
+    """
+    issue_number = issue['number']
+    key = normalize_url(url)
+    if not error.transient:
+        STATE.clear_retry(key)
+        print(f"   ⚠️  #{issue_number}: {message} ({error})")
+        report_issue(issue, f"⚠️ Erreur: {message}\n\nDétail : {error}")
+        return "error"
+
+    entry = STATE.schedule_retry(key, issue_number, stage, error)
+    if entry['status'] == "dead":
+        print(f"   💀 #{issue_number}: {message}, abandon après {entry['attempts']} tentative(s) ({error})")
+        report_issue(
+            issue,
+            f"⚠️ Erreur: {message}\n\nAbandon après {entry['attempts']} tentative(s). Dernière erreur : {error}"
+        )
+        return "error"
+
+    next_attempt = datetime.datetime.fromtimestamp(entry['next_attempt_at']).strftime("%Y-%m-%d %H:%M")
+    print(f"   ⏳ #{issue_number}: échec temporaire ({error}), nouvel essai après {next_attempt}")
+    # Un seul commentaire au premier échec : les relances suivantes restent silencieuses
+    if entry['attempts'] == 1:
+        report_issue(
+            issue,
+            f"⏳ Échec temporaire : {error}\n\nNouvelle tentative automatique lors d'un prochain traitement "
+            f"(pas avant {next_attempt}).",
+            close=False
+        )
+    return "retry"
 
-    current_month = None
-    
-    for art in articles:
-        # En-tête de mois
-        art_month = art['date'].strftime("%B %Y").capitalize() if art['date'] != datetime.date.min else "Anciens articles"
-        if art_month != current_month:
-            index_content += f"\n### {art_month}\n\n"
-            current_month = art_month
-            
-        date_str = art['date'].strftime("%d/%m") if art['date'] != datetime.date.min else "??"
-        index_content += f"- **[{date_str}]** [{art['title']}]({art['path']})\n"
+def report_success(issue, analysis):
+    """Commentaire de succès (fiche créée) puis fermeture de l'issue."""
+    report_issue(
+        issue,
+        f"""✅ Fiche créée avec succès!
 
-    try:
-        index_path = DOCS_DIR / "index.md"
-        temp_path = DOCS_DIR / "index.md.tmp"
-        
-        # 1. Tentative d'écriture via temporaire + Shell replace (Workaround macOS EPERM)
-        try:
-            # Écrire dans un fichier temporaire
-            with open(temp_path, "w", encoding="utf-8") as f:
-                f.write(index_content)
-            
-            # Utiliser le shell pour le remplacement (cat) si os.replace échoue
-            import subprocess
-            cmd = f"cat {temp_path} > {index_path} && rm {temp_path}"
-            subprocess.run(cmd, shell=True, check=True)
-            print(f"✅ Page d'accueil ({index_path}) mise à jour via Shell.")
-            return
-        except Exception as e:
-            print(f"   ⚠️  Tentative Shell-cat échouée: {e}")
-            # Ultime tentative standard
-            with open(index_path, "w", encoding="utf-8") as f:
-                f.write(index_content)
-            print("   ✅ Index mis à jour via écriture directe.")
+**Titre:** {analysis['titre']}
 
-    except Exception as e_final:
-        print(f"❌ Échec définitif mise à jour index: {e_final}")
+**Thématique:** {analysis['thematique']}
 
-# --- MAIN ---
+**Tags:** {', '.join(analysis['tags'])}
+
+*Fiche générée et publiée automatiquement.*"""
+    )
+
+def page_aliases(page):
+    """URLs alternatives d'une page scrapée (après redirections, canonique)."""
+    return [u for u in (page.get('final_url'), page.get('canonical_url')) if u]
+
+def find_duplicate(content):
+    """Cherche une fiche quasi-identique au texte scrapé. Retourne (empreinte, fiche ou None)."""
+    fingerprint = simhash(content)
+    duplicate, _ = DUP_INDEX.find(fingerprint)
+    return fingerprint, duplicate
+
+def process_issue(issue, idx, total):
+    """
+    Traite une issue de bout en bout. Retourne 'success', 'duplicate', 'error', 'retry'
+    (échec temporaire, relance programmée) ou 'deferred' (relance pas encore due).
+    Les étapes déjà terminées lors d'une exécution précédente (voir veille_state) sont reprises.
+    """
+    with METRICS.issue(issue['number']):
+        status = _process_issue(issue, idx, total)
+    METRICS.set_status(issue['number'], status)
+    STATE.finish(issue['number'], status)
+    return status
+
+def _process_issue(issue, idx, total):
+    issue_number = issue['number']
+    issue_body = issue['body'] or ""
+
+    # Extraction des données structurées
+    data = extract_issue_data(issue_body)
+    url = data['url']
+    note = data['note']
+    user_tags = data['user_tags']
+
+    if not url:
+        print(f"[{idx}/{total}] Issue #{issue_number}: ❌ Pas d'URL valide")
+        report_issue(
+            issue,
+            "❌ Erreur: L'issue ne contient pas d'URL valide."
+        )
+        return "error"
+
+    print(f"[{idx}/{total}] Issue #{issue_number}: {url[:60]}")
+
+    state = STATE.load(issue_number)
+    artifacts = state['artifacts'] if state['url'] == url else {}
+    if artifacts:
+        print(f"   ⏯️  #{issue_number}: reprise après l'étape '{state['stage']}'")
+
+    # Fiche déjà créée lors d'une exécution interrompue : il ne reste qu'à répondre sur l'issue
+    fiche = artifacts.get('fiche')
+    if fiche and ((DOCS_DIR / fiche['path']).exists() or DOCS_DIR / fiche['path'] in FICHE_WRITER):
+        report_success(issue, artifacts['analyzed'])
+        return "success"
+
+    # URL déjà traitée : ni scraping ni appel Mistral
+    existing = None if artifacts else URL_INDEX.lookup(url)
+    if existing:
+        print(f"   ♻️  #{issue_number}: URL déjà traitée ({existing})")
+        report_issue(
+            issue,
+            f"♻️ Article déjà présent dans la veille : `{existing}`"
+        )
+        return "duplicate"
+
+    # Échec temporaire lors d'une exécution précédente : on attend la fin du délai de relance
+    retry = STATE.retry_entry(normalize_url(url))
+    if retry and retry['status'] == "dead":
+        # URL abandonnée puis soumise à nouveau : nouveau cycle de tentatives
+        STATE.clear_retry(normalize_url(url))
+    elif retry and retry['next_attempt_at'] > time.time():
+        print(f"   ⏳ #{issue_number}: relance programmée (tentative {retry['attempts'] + 1}), ignorée pour l'instant")
+        return "deferred"
+
+    # Scraper le contenu
+    page = artifacts.get('scraped')
+    if not page:
+        try:
+            with _SCRAPE_SLOTS, METRICS.stage("scrape"):
+                page = fetch_page(url)
+        except StageError as e:
+            return report_failure(
+                issue, url, "scraped", e,
+                "Impossible de récupérer le contenu de l'URL. L'URL est peut-être invalide, protégée ou inaccessible."
+            )
+        STATE.record(issue_number, "scraped", page, url=url)
+    content = page['text']
+
+    image_url = page['image_url']
+    page_urls = page_aliases(page)
+
+    # Même article derrière une redirection ou une URL canonique différente
+    existing = None if 'analyzed' in artifacts else URL_INDEX.lookup(*page_urls)
+    if existing:
+        print(f"   ♻️  #{issue_number}: URL canonique déjà traitée ({existing})")
+        URL_INDEX.add(existing, url)
+        report_issue(
+            issue,
+            f"♻️ Article déjà présent dans la veille : `{existing}`"
+        )
+        return "duplicate"
+
+    # Quasi-doublon d'une fiche existante : inutile de payer un appel Mistral
+    with METRICS.stage("dedup"):
+        fingerprint, duplicate = find_duplicate(content)
+    if duplicate and 'analyzed' not in artifacts:
+        print(f"   ♻️  #{issue_number}: Doublon probable de {duplicate['path']}")
+        report_issue(
+            issue,
+            f"♻️ Article déjà présent dans la veille (contenu quasi-identique) : `{duplicate['path']}`\n\nSource initiale : {duplicate['url']}"
+        )
+        return "duplicate"
+
+    # Analyser avec Mistral
+    analysis = artifacts.get('analyzed')
+    if not analysis:
+        try:
+            with METRICS.stage("analyze"):
+                analysis = run_analysis(content, url, note, user_tags)
+        except StageError as e:
+            return report_failure(issue, url, "analyzed", e, "Impossible d'analyser le contenu avec Mistral.")
+        STATE.record(issue_number, "analyzed", analysis)
+
+    # Créer la fiche Markdown
+    with _FICHE_LOCK, METRICS.stage("fiche"):
+        created = create_markdown_fiche(analysis, url, issue_number, image_url, writer=FICHE_WRITER)
+    if not created:
+        error = StageError("écriture de la fiche impossible", transient=True)
+        return report_failure(issue, url, "fiche", error, "Impossible de créer la fiche.")
+    STATE.clear_retry(normalize_url(url))
+    fiche_path = created.relative_to(DOCS_DIR).as_posix()
+    STATE.record(issue_number, "fiche", {"path": fiche_path})
+    DUP_INDEX.add(fingerprint, fiche_path, url, analysis['titre'])
+    URL_INDEX.add(fiche_path, url, *page_urls)
+
+    # Ajouter un commentaire de succès
+    report_success(issue, analysis)
+    return "success"
 
 def main():
-    """Boucle principale du traitement."""
+    """
+    Boucle principale du traitement. Le run est mesuré (résumé et exports en fin de run,
+    voir veille_metrics) et profilé si VEILLE_PROFILE est défini.
+    """
+    METRICS.reset()
+    with profiling():
+        try:
+            run()
+        finally:
+            METRICS.finish()
+
+def run():
+    """Traitement des issues ouvertes (appelé par main())."""
     print("\n🚀 Démarrage du traitement de la veille...\n")
 
     # Récupérer les issues
-    issues = get_open_issues()
+    with METRICS.stage("github_fetch"):
+        issues = get_open_issues()
     if not issues:
         print("ℹ️  Aucune issue à traiter.")
         # On met quand même à jour l'index au cas où il y a eu des modifs manuelles
-        update_index_page()
+        with METRICS.stage("index"):
+            update_index_page()
         return
 
-    print(f"🔍 {len(issues)} lien(s) à traiter...\n")
-
-    success_count = 0
-    error_count = 0
-
-    for idx, issue in enumerate(issues, 1):
-        issue_number = issue['number']
-        issue_body = issue['body'] or ""
-        
-        # Extraction des données structurées
-        data = extract_issue_data(issue_body)
-        url = data['url']
-        note = data['note']
-        user_tags = data['user_tags']
-
-        if not url:
-            print(f"[{idx}/{len(issues)}] Issue #{issue_number}: ❌ Pas d'URL valide")
-            add_issue_comment(
-                issue_number,
-                "❌ Erreur: L'issue ne contient pas d'URL valide."
-            )
-            close_issue(issue_number)
-            error_count += 1
-            continue
-
-        print(f"[{idx}/{len(issues)}] Issue #{issue_number}: {url[:60]}")
-
-        # Scraper le contenu avec Trafilatura
-        content, image_url = scrape_content(url)
-        if not content:
-            print(f"   ⚠️  Impossible de scraper le contenu")
-            add_issue_comment(
-                issue_number,
-                "⚠️ Erreur: Impossible de récupérer le contenu de l'URL. L'URL est peut-être invalide, protégée ou inaccessible."
-            )
-            close_issue(issue_number)
-            error_count += 1
-            continue
-
-        # Analyser avec Mistral
-        analysis = analyze_with_mistral(content, url, note, user_tags)
-        if not analysis:
-            print(f"   ⚠️  Erreur analyse Mistral")
-            add_issue_comment(
-                issue_number,
-                "⚠️ Erreur: Impossible d'analyser le contenu avec Mistral."
-            )
-            close_issue(issue_number)
-            error_count += 1
-            continue
-
-        # Créer la fiche Markdown
-        if create_markdown_fiche(analysis, url, issue_number, image_url):
-            # Ajouter un commentaire de succès
-            add_issue_comment(
-                issue_number,
-                f"""✅ Fiche créée avec succès!
-
-**Titre:** {analysis['titre']}
-
-**Thématique:** {analysis['thematique']}
-
-**Tags:** {', '.join(analysis['tags'])}
-
-*Fiche générée et publiée automatiquement.*"""
-            )
-            close_issue(issue_number)
-            success_count += 1
-        else:
-            error_count += 1
+    print(f"🔍 {len(issues)} lien(s) à traiter...")
+    print(f"⚙️  Concurrence: scraping={SCRAPE_WORKERS}, mistral={MISTRAL_WORKERS}, lots GitHub={GITHUB_BATCH_SIZE}\n")
+
+    # Chaque issue avance dans son propre thread ; les sémaphores bornent chaque étape,
+    # de sorte que la durée totale suit l'étape la plus lente et non la somme des étapes.
+    max_workers = SCRAPE_WORKERS + MISTRAL_WORKERS
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(process_issue, issue, idx, len(issues))
+            for idx, issue in enumerate(issues, 1)
+        ]
+
+    # Écriture des dernières fiches puis envoi des retours GitHub en attente
+    with METRICS.stage("fiche_flush"):
+        FICHE_WRITER.flush()
+    with METRICS.stage("github_write"):
+        WRITE_BACK.flush()
+    get_gateway().close()
+
+    counts = {"success": 0, "duplicate": 0, "error": 0, "retry": 0, "deferred": 0}
+    for future in futures:
+        try:
+            status = future.result()
+        except Exception as e:
+            print(f"❌ Erreur inattendue: {e}")
+            status = "error"
+        counts[status] += 1
 
     # Résumé
     print(f"\n{'='*50}")
-    print(f"✅ Succès: {success_count}")
-    print(f"❌ Erreurs: {error_count}")
+    print(f"✅ Succès: {counts['success']}")
+    print(f"♻️  Doublons: {counts['duplicate']}")
+    print(f"❌ Erreurs: {counts['error']}")
+    print(f"⏳ Relances: {counts['retry']} programmée(s), {counts['deferred']} pas encore due(s)")
+    mistral = get_gateway().stats
+    print(f"🤖 Mistral: {mistral['requests']} requête(s), {mistral['prompt_tokens']} + {mistral['completion_tokens']} tokens, "
+          f"{mistral['retries']} retry(s), {mistral['throttled']} 429")
     print(f"{'='*50}\n")
     
     # Mise à jour de la page d'accueil
-    update_index_page()
+    with METRICS.stage("index"):
+        update_index_page()
+
+    # Éviction des pages trop anciennes ou au-delà de la taille maximale du cache
+    SCRAPE_CACHE.evict()
+    ANALYSIS_CACHE.evict()
+    STATE.prune()
 
 if __name__ == "__main__":
     main()
@@ -9,8 +9,8 @@ Usage:
 
 import os
 import sys
-import requests
 from dotenv import load_dotenv
+from veille_http import get_session
 
 load_dotenv()
 
@@ -40,7 +40,7 @@ def trigger_workflow():
     print(f"   Repository: {GITHUB_USER}/{REPO_NAME}")
 
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=10)
+        response = get_session().post(url, headers=headers, json=payload, timeout=10)
 
         if response.status_code == 204:
             print("✅ Workflow déclenché avec succès!")
@@ -70,7 +70,7 @@ def get_workflow_runs():
     }
 
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = get_session().get(url, headers=headers, timeout=10)
 
         if response.status_code == 200:
             data = response.json()
@@ -7,14 +7,19 @@ Usage:
     python3 scripts/veille_api_server.py
 
 Endpoints:
-    POST /api/capture - Capturer une URL
+    POST /api/capture   - Capturer une URL (traitement asynchrone, répond 202 + job_id)
+    GET  /api/jobs/<id> - État d'avancement d'une capture
 """
 
 import os
 import sys
 import json
-import requests
-from http.server import HTTPServer, BaseHTTPRequestHandler
+import time
+import uuid
+import queue
+import signal
+import threading
+from http.server import HTTPServer, ThreadingHTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 from dotenv import load_dotenv
 
@@ -27,12 +32,20 @@ load_dotenv(dotenv_path=ENV_PATH)
 # Importer les fonctions de traitement de process_veille
 # On ajoute le dossier scripts au path pour permettre l'import
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from veille_http import get_session
+from veille_mistral import get_gateway
+from veille_github import GITHUB_API_URL
 try:
     from process_veille import (
-        scrape_content, 
+        scrape_page, 
         analyze_with_mistral, 
         create_markdown_fiche, 
-        update_index_page
+        update_index_page,
+        find_duplicate,
+        page_aliases,
+        DUP_INDEX,
+        URL_INDEX,
+        DOCS_DIR
     )
 except ImportError as e:
     print(f"⚠️ Erreur import process_veille: {e}")
@@ -41,9 +54,214 @@ GITHUB_TOKEN = os.getenv("GITHUB_TOKEN", "").strip()
 GITHUB_USER = os.getenv("GITHUB_USER", "martinregent").strip()
 REPO_NAME = os.getenv("REPO_NAME", "veille").strip()
 
+# Nombre de captures traitées simultanément en arrière-plan
+CAPTURE_WORKERS = max(1, int(os.getenv("VEILLE_CAPTURE_WORKERS", "2")))
+# Durée de conservation (secondes) des jobs terminés pour GET /api/jobs/<id>
+JOB_RETENTION = int(os.getenv("VEILLE_JOB_RETENTION", "3600"))
+# Mode du serveur HTTP : 'threaded' (connexions concurrentes, keep-alive) ou 'single'
+SERVER_MODE = os.getenv("VEILLE_SERVER_MODE", "threaded").strip()
+# Nombre maximal de connexions servies simultanément en mode 'threaded'
+SERVER_THREADS = max(1, int(os.getenv("VEILLE_SERVER_THREADS", "16")))
+# Délai maximal (secondes) accordé aux captures en cours lors de l'arrêt
+SHUTDOWN_TIMEOUT = int(os.getenv("VEILLE_SHUTDOWN_TIMEOUT", "120"))
+
+# Sérialise l'écriture des fiches et la régénération de l'index entre workers
+_WRITE_LOCK = threading.Lock()
+
+
+def create_github_issue(url, description, tags):
+    """Crée une issue GitHub"""
+    if not GITHUB_TOKEN:
+        raise Exception("GITHUB_TOKEN non configuré")
+
+    # Préparer le contenu de l'issue (Format JSON pour process_veille)
+    issue_data = {
+        "url": url,
+        "note": description,
+        "tags": tags
+    }
+    body = json.dumps(issue_data, indent=2)
+
+    # Préparer les labels
+    labels = ['to_process']
+
+    # Faire la requête GitHub
+    response = get_session().post(
+        f"{GITHUB_API_URL}/repos/{GITHUB_USER}/{REPO_NAME}/issues",
+        headers={
+            'Authorization': f"token {GITHUB_TOKEN}",
+            'Accept': 'application/vnd.github.v3+json',
+            'Content-Type': 'application/json'
+        },
+        json={
+            'title': 'Article à traiter',
+            'body': body,
+            'labels': labels
+        },
+        timeout=10
+    )
+
+    if response.status_code != 201:
+        error_data = response.json()
+        raise Exception(f"Erreur GitHub: {error_data.get('message', 'Unknown error')}")
+
+    return response.json()
+
+
+class CaptureJobQueue:
+    """File de captures traitées en arrière-plan par un pool de workers."""
+
+    def __init__(self, workers=CAPTURE_WORKERS):
+        self.queue = queue.Queue()
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.closed = False
+        self.threads = []
+        for i in range(workers):
+            thread = threading.Thread(target=self._worker, name=f"capture-worker-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def submit(self, url, description, tags):
+        """Enregistre une capture et la place en file. Retourne une copie du job."""
+        if self.closed:
+            raise RuntimeError("Serveur en cours d'arrêt")
+        job = {
+            'id': uuid.uuid4().hex,
+            'url': url,
+            'description': description,
+            'tags': tags,
+            'status': 'queued',
+            'step': None,
+            'issue_number': None,
+            'message': None,
+            'created_at': time.time(),
+            'updated_at': time.time(),
+        }
+        with self.lock:
+            self._prune()
+            self.jobs[job['id']] = job
+        self.queue.put(job['id'])
+        return dict(job)
+
+    def get(self, job_id):
+        """Retourne une copie du job ou None."""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def pending(self):
+        """Nombre de captures en attente dans la file."""
+        return self.queue.qsize()
+
+    def drain(self, timeout=SHUTDOWN_TIMEOUT):
+        """Refuse les nouvelles captures et attend la fin des jobs en file. Retourne True si tout est traité."""
+        self.closed = True
+        waiter = threading.Thread(target=self.queue.join, daemon=True)
+        waiter.start()
+        waiter.join(timeout)
+        return not waiter.is_alive()
+
+    def _update(self, job_id, **fields):
+        with self.lock:
+            self.jobs[job_id].update(fields, updated_at=time.time())
+
+    def _prune(self):
+        # Oublie les jobs terminés depuis plus de JOB_RETENTION secondes
+        limit = time.time() - JOB_RETENTION
+        for job_id in [j for j, job in self.jobs.items()
+                       if job['status'] in ('done', 'error') and job['updated_at'] < limit]:
+            del self.jobs[job_id]
+
+    def _worker(self):
+        while True:
+            job_id = self.queue.get()
+            try:
+                self._run(self.get(job_id))
+            except Exception as e:
+                print(f"   ❌ Erreur job {job_id[:8]}: {e}")
+                self._update(job_id, status='error', message=str(e))
+            finally:
+                self.queue.task_done()
+
+    def _run(self, job):
+        """Traite une capture : issue GitHub, scraping, analyse, fiche et index."""
+        job_id = job['id']
+        url = job['url']
+        print(f"⚙️  Job {job_id[:8]}: traitement de {url}")
+
+        # 1. Créer l'issue GitHub (pour le déploiement Cloudflare)
+        self._update(job_id, status='running', step='github')
+        issue_number = 0
+        try:
+            issue = create_github_issue(url, job['description'], job['tags'])
+            issue_number = issue['number']
+            print(f"   ✅ Issue GitHub #{issue_number} créée")
+        except Exception as e:
+            print(f"   ⚠️ Erreur GitHub sync: {e}")
+        self._update(job_id, issue_number=issue_number)
+
+        # 2. Traitement Local
+        self._update(job_id, step='scraping')
+        page = scrape_page(url)
+        if not page:
+            print(f"   ❌ Erreur scraping contenu")
+            return self._update(job_id, status='error', message="Erreur scraping contenu")
+        content, image_url = page['text'], page['image_url']
+
+        # Même article derrière une redirection ou une URL canonique différente
+        page_urls = page_aliases(page)
+        existing = URL_INDEX.lookup(*page_urls)
+        if existing:
+            print(f"   ♻️  URL canonique déjà traitée ({existing})")
+            URL_INDEX.add(existing, url)
+            return self._update(job_id, status='done', step=None, duplicate_of=existing,
+                                message="Article déjà présent dans la veille")
+
+        fingerprint, duplicate = find_duplicate(content)
+        if duplicate:
+            print(f"   ♻️  Doublon probable de {duplicate['path']}")
+            return self._update(job_id, status='done', step=None, duplicate_of=duplicate['path'],
+                                message="Article déjà présent dans la veille")
+
+        self._update(job_id, step='analyse')
+        analysis = analyze_with_mistral(content, url, job['description'], job['tags'])
+        if not analysis:
+            print(f"   ❌ Erreur analyse Mistral")
+            return self._update(job_id, status='error', message="Erreur analyse Mistral")
+
+        self._update(job_id, step='fiche')
+        with _WRITE_LOCK:
+            fiche_path = create_markdown_fiche(analysis, url, issue_number, image_url)
+            if not fiche_path:
+                print(f"   ❌ Erreur création fiche locale")
+                return self._update(job_id, status='error', message="Erreur création fiche locale")
+            rel_path = fiche_path.relative_to(DOCS_DIR).as_posix()
+            DUP_INDEX.add(fingerprint, rel_path, url, analysis['titre'])
+            URL_INDEX.add(rel_path, url, *page_urls)
+            self._update(job_id, step='index')
+            update_index_page()
+
+        print(f"   ✨ Fiche locale créée et index mis à jour")
+        self._update(job_id, status='done', step=None, title=analysis['titre'],
+                     message="Article capturé et traité localement")
+
+
 class VeilleAPIHandler(BaseHTTPRequestHandler):
     """Gestionnaire HTTP pour l'API Veille"""
 
+    # File de traitement partagée, attachée au serveur par make_server()
+    jobs = None
+    # Ferme les connexions keep-alive inactives (libère le thread associé)
+    timeout = 15
+
+    def do_GET(self):
+        """Gère les requêtes GET"""
+        if self.path.startswith('/api/jobs/'):
+            self.handle_job_status(self.path[len('/api/jobs/'):])
+        else:
+            self.send_error(404, "Endpoint not found")
+
     def do_POST(self):
         """Gère les requêtes POST"""
         if self.path == '/api/capture':
@@ -55,12 +273,13 @@ class VeilleAPIHandler(BaseHTTPRequestHandler):
         """Gère les requêtes OPTIONS (CORS preflight)"""
         self.send_response(200)
         self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Content-Length', '0')
         self.end_headers()
 
     def handle_capture(self):
-        """Endpoint: Capturer une URL"""
+        """Endpoint: Capturer une URL (mise en file, réponse immédiate)"""
         try:
             # Lire le corps de la requête
             content_length = int(self.headers.get('Content-Length', 0))
@@ -75,98 +294,52 @@ class VeilleAPIHandler(BaseHTTPRequestHandler):
             description = data.get('description', '')
             tags = data.get('tags', [])
 
-            print(f"📥 Capture reçue: {url}")
-
-            # 1. Créer l'issue GitHub (pour le déploiement Cloudflare)
-            try:
-                issue = self.create_github_issue(url, description, tags)
-                issue_number = issue['number']
-                print(f"   ✅ Issue GitHub #{issue_number} créée")
-            except Exception as e:
-                print(f"   ⚠️ Erreur GitHub sync: {e}")
-                issue_number = 0
-
-            # 2. Traitement Local Temps Réel
-            print(f"   ⚙️ Traitement local en cours...")
-            content, image_url = scrape_content(url)
-            local_success = False
-            if content:
-                analysis = analyze_with_mistral(content, url, description, tags)
-                if analysis:
-                    if create_markdown_fiche(analysis, url, issue_number, image_url):
-                        update_index_page()
-                        print(f"   ✨ Fiche locale créée et index mis à jour")
-                        local_success = True
-                    else:
-                        print(f"   ❌ Erreur création fiche locale")
-                else:
-                    print(f"   ❌ Erreur analyse Mistral")
-            else:
-                print(f"   ❌ Erreur scraping contenu")
-
-            if local_success:
-                msg = "Article capturé et traité localement"
-            else:
-                msg = "Article capturé mais erreur lors du traitement local"
-
-            # Retourner la réponse
-            self.send_json_response(200, {
-                'status': 'success',
-                'message': msg,
-                'issue_number': issue_number
+            # Re-capture d'un article déjà en fiche : réponse immédiate, aucun traitement
+            existing = URL_INDEX.lookup(url)
+            if existing:
+                print(f"♻️  Capture déjà traitée: {url} ({existing})")
+                return self.send_json_response(200, {
+                    'status': 'exists',
+                    'message': "Article déjà présent dans la veille",
+                    'fiche': existing
+                })
+
+            job = self.jobs.submit(url, description, tags)
+            print(f"📥 Capture reçue: {url} (job {job['id'][:8]}, {self.jobs.pending()} en file)")
+
+            # Le traitement se fait en arrière-plan : on répond tout de suite
+            self.send_json_response(202, {
+                'status': 'accepted',
+                'message': "Article capturé, traitement local en cours",
+                'job_id': job['id'],
+                'status_url': f"/api/jobs/{job['id']}"
             })
 
         except json.JSONDecodeError:
             self.send_json_error(400, "JSON invalide")
+        except RuntimeError as e:
+            self.send_json_error(503, str(e))
         except Exception as e:
             print(f"   ❌ Erreur serveur: {e}")
             self.send_json_error(500, str(e))
 
-    def create_github_issue(self, url, description, tags):
-        """Crée une issue GitHub"""
-        if not GITHUB_TOKEN:
-            raise Exception("GITHUB_TOKEN non configuré")
-
-        # Préparer le contenu de l'issue (Format JSON pour process_veille)
-        issue_data = {
-            "url": url,
-            "note": description,
-            "tags": tags
-        }
-        body = json.dumps(issue_data, indent=2)
-
-        # Préparer les labels
-        labels = ['to_process']
-
-        # Faire la requête GitHub
-        response = requests.post(
-            f"https://api.github.com/repos/{GITHUB_USER}/{REPO_NAME}/issues",
-            headers={
-                'Authorization': f"token {GITHUB_TOKEN}",
-                'Accept': 'application/vnd.github.v3+json',
-                'Content-Type': 'application/json'
-            },
-            json={
-                'title': 'Article à traiter',
-                'body': body,
-                'labels': labels
-            },
-            timeout=10
-        )
-
-        if response.status_code != 201:
-            error_data = response.json()
-            raise Exception(f"Erreur GitHub: {error_data.get('message', 'Unknown error')}")
-
-        return response.json()
+    def handle_job_status(self, job_id):
+        """Endpoint: État d'une capture"""
+        job = self.jobs.get(job_id)
+        if not job:
+            return self.send_json_error(404, "Job inconnu")
+        self.send_json_response(200, job)
 
     def send_json_response(self, status_code, data):
         """Envoie une réponse JSON"""
+        payload = json.dumps(data).encode()
         self.send_response(status_code)
         self.send_header('Content-Type', 'application/json')
         self.send_header('Access-Control-Allow-Origin', '*')
+        # Content-Length obligatoire pour garder la connexion ouverte (HTTP/1.1)
+        self.send_header('Content-Length', str(len(payload)))
         self.end_headers()
-        self.wfile.write(json.dumps(data).encode())
+        self.wfile.write(payload)
 
     def send_json_error(self, status_code, error_message):
         """Envoie une erreur JSON"""
@@ -180,10 +353,63 @@ class VeilleAPIHandler(BaseHTTPRequestHandler):
         print(f"[{self.client_address[0]}] {format % args}")
 
 
+class KeepAliveHandler(VeilleAPIHandler):
+    """Gestionnaire HTTP/1.1 : les connexions restent ouvertes entre deux requêtes."""
+    protocol_version = "HTTP/1.1"
+    # Sans TCP_NODELAY, en-têtes et corps séparés subissent le délai d'ACK (~40 ms) en keep-alive
+    disable_nagle_algorithm = True
+
+
+class BoundedThreadingHTTPServer(ThreadingHTTPServer):
+    """Serveur HTTP multi-threadé avec un nombre borné de connexions simultanées."""
+    daemon_threads = True
+
+    def __init__(self, server_address, handler_class, max_threads=SERVER_THREADS):
+        super().__init__(server_address, handler_class)
+        self._slots = threading.BoundedSemaphore(max_threads)
+
+    def process_request(self, request, client_address):
+        # Bloque l'acceptation tant que toutes les places sont occupées
+        self._slots.acquire()
+        try:
+            super().process_request(request, client_address)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            self._slots.release()
+
+
+def make_server(host='localhost', port=5888, mode=SERVER_MODE, max_threads=SERVER_THREADS, jobs=None):
+    """Construit le serveur HTTP ('threaded' ou 'single') et sa file de captures."""
+    VeilleAPIHandler.jobs = jobs or CaptureJobQueue()
+    if mode == 'single':
+        # Un seul thread : HTTP/1.0 pour qu'une connexion inactive ne bloque pas les autres
+        return HTTPServer((host, port), VeilleAPIHandler)
+    return BoundedThreadingHTTPServer((host, port), KeepAliveHandler, max_threads)
+
+
+def shutdown_server(httpd):
+    """Arrêt propre : plus de nouvelles connexions, puis attente des captures en cours."""
+    httpd.server_close()
+    jobs = VeilleAPIHandler.jobs
+    pending = jobs.pending()
+    if pending:
+        print(f"⏳ Attente de {pending} capture(s) en file (max {SHUTDOWN_TIMEOUT}s)...")
+    if jobs.drain(SHUTDOWN_TIMEOUT):
+        print("✅ Toutes les captures ont été traitées.")
+    else:
+        print("⚠️  Délai dépassé : des captures n'ont pas été traitées.")
+    get_gateway().close()
+
+
 def run_server(host='localhost', port=5888):
     """Lance le serveur HTTP"""
-    server_address = (host, port)
-    httpd = HTTPServer(server_address, VeilleAPIHandler)
+    httpd = make_server(host, port)
 
     print(f"""
 ╔════════════════════════════════════════════════╗
@@ -191,11 +417,14 @@ def run_server(host='localhost', port=5888):
 ╠════════════════════════════════════════════════╣
 ║ URL:     http://{host}:{port}               ║
 ║ Endpoint: POST http://{host}:{port}/api/capture ║
+║ Statut:   GET  http://{host}:{port}/api/jobs/<id> ║
 ╠════════════════════════════════════════════════╣
 ║ Configuration:                                  ║
 ║ • GitHub User: {GITHUB_USER:<25}║
 ║ • Repository:  {REPO_NAME:<25}║
 ║ • Token:       {"✅ Configuré" if GITHUB_TOKEN else "❌ Manquant":<25}║
+║ • Workers:     {CAPTURE_WORKERS:<25}║
+║ • Mode HTTP:   {f"{SERVER_MODE} ({SERVER_THREADS} conn.)" if SERVER_MODE != 'single' else SERVER_MODE:<25}║
 ╚════════════════════════════════════════════════╝
 
 Exemple de requête:
@@ -210,11 +439,15 @@ Exemple de requête:
 Appuie sur CTRL+C pour arrêter.
 """)
 
+    # SIGTERM (launchd, systemd, kill) suit le même chemin d'arrêt que CTRL+C
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
     try:
         httpd.serve_forever()
     except KeyboardInterrupt:
-        print("\n\n👋 Serveur arrêté.")
-        httpd.server_close()
+        print("\n\n🛑 Arrêt demandé...")
+        shutdown_server(httpd)
+        print("👋 Serveur arrêté.")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Budget de tokens avant l'analyse Mistral.
+
+  - contenu court  : appel direct, avec le petit modèle sous VEILLE_SMALL_MODEL_MAX_TOKENS
+  - contenu moyen  : appel direct au modèle principal
+  - contenu long   : découpage en parties (map) résumées en parallèle, puis analyse finale
+                     sur les résumés (reduce) ; le nombre de parties est plafonné pour que
+                     le coût et la latence restent bornés
+
+Les tokens sont estimés sans tokenizer (≈ 3,5 caractères par token pour du texte technique
+en français ou en anglais), ce qui suffit pour décider du découpage.
+
+Usage:
+    python3 scripts/veille_budget.py fichier.txt   # plan de découpage d'un texte
+"""
+
+import os
+import re
+import sys
+import math
+
+CHARS_PER_TOKEN = 3.5
+
+# Petit modèle pour les pages courtes et les résumés partiels ('' = toujours MISTRAL_MODEL)
+MISTRAL_MODEL_SMALL = os.getenv("MISTRAL_MODEL_SMALL", "mistral-small-latest").strip()
+SMALL_MODEL_MAX_TOKENS = int(os.getenv("VEILLE_SMALL_MODEL_MAX_TOKENS", "2000"))
+# Au-delà, le texte est découpé et résumé par parties
+DIRECT_MAX_TOKENS = int(os.getenv("VEILLE_DIRECT_MAX_TOKENS", "6000"))
+# Taille cible d'une partie et nombre maximal de parties
+CHUNK_TOKENS = int(os.getenv("VEILLE_CHUNK_TOKENS", "4000"))
+MAX_CHUNKS = max(1, int(os.getenv("VEILLE_MAX_CHUNKS", "8")))
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?…])\s+")
+
+
+def estimate_tokens(text):
+    """Estimation du nombre de tokens d'un texte."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def choose_model(tokens, model):
+    """Modèle de l'analyse finale selon la taille du contenu (`model` = modèle principal)."""
+    if MISTRAL_MODEL_SMALL and tokens <= SMALL_MODEL_MAX_TOKENS:
+        return MISTRAL_MODEL_SMALL
+    return model
+
+
+def map_model(model):
+    """Modèle des résumés partiels (tâche simple : le petit modèle suffit)."""
+    return MISTRAL_MODEL_SMALL or model
+
+
+def needs_chunking(tokens):
+    return tokens > DIRECT_MAX_TOKENS
+
+
+def split_chunks(text, chunk_tokens=CHUNK_TOKENS, max_chunks=MAX_CHUNKS):
+    """
+    Découpe le texte en au plus max_chunks parties, aux fins de phrases.
+    Les parties grossissent au-delà de chunk_tokens plutôt que de dépasser max_chunks.
+    """
+    chunk_tokens = max(chunk_tokens, math.ceil(estimate_tokens(text) / max_chunks))
+    limit = int(chunk_tokens * CHARS_PER_TOKEN)
+
+    chunks, current, size = [], [], 0
+    for sentence in _SENTENCE_END_RE.split(text):
+        # Phrase géante (code, liste sans ponctuation) : coupe franche
+        while len(sentence) > limit:
+            if current:
+                chunks.append(" ".join(current))
+                current, size = [], 0
+            chunks.append(sentence[:limit])
+            sentence = sentence[limit:]
+        if size + len(sentence) > limit and current:
+            chunks.append(" ".join(current))
+            current, size = [], 0
+        current.append(sentence)
+        size += len(sentence) + 1
+    if current:
+        chunks.append(" ".join(current))
+
+    # Les coupes franches peuvent produire une partie de trop : on fusionne la fin
+    while len(chunks) > max_chunks:
+        chunks[-2:] = [chunks[-2] + " " + chunks[-1]]
+    return chunks
+
+
+def plan(text, model):
+    """Résumé de la stratégie retenue pour un texte (affichage / diagnostic)."""
+    tokens = estimate_tokens(text)
+    if not needs_chunking(tokens):
+        return {"tokens": tokens, "strategy": "direct", "model": choose_model(tokens, model), "chunks": 1}
+    chunks = split_chunks(text)
+    return {
+        "tokens": tokens,
+        "strategy": "map-reduce",
+        "model": model,
+        "map_model": map_model(model),
+        "chunks": len(chunks),
+        "chunk_tokens": [estimate_tokens(c) for c in chunks],
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    with open(sys.argv[1], "r", encoding="utf-8") as f:
+        print(plan(f.read(), os.getenv("MISTRAL_MODEL", "mistral-large-latest").strip()))
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Build MkDocs de la CI : reconstruit site/ seulement si docs/ ou la configuration ont changé
+depuis le dernier build (site/ restauré depuis le cache de la CI).
+
+Les fichiers modifiés depuis le dernier build sont déterminés par `git diff` avec le commit de
+ce build (et, hors dépôt git, par leur date de modification). Si rien n'a changé, site/ est
+gardé tel quel ; sinon le site est reconstruit entièrement. `mkdocs build --dirty` n'est pas
+utilisé : le plugin blog relie chaque fiche à ses voisines et construit les extraits, la table
+des matières des vues et les archives à partir du rendu de toutes les fiches, et un build
+partiel ne produit pas le même site (tests/test_build.py compare avec un build complet).
+
+Usage:
+    python3 scripts/veille_build.py           # build si docs/ ou la configuration ont changé
+    python3 scripts/veille_build.py --full    # build dans tous les cas
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import subprocess
+from pathlib import Path
+
+from veille_io import write_atomic
+from veille_index import DOCS_DIR
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = SCRIPT_DIR.parent
+SITE_DIR = PROJECT_ROOT / "site"
+BUILD_STATE_PATH = SITE_DIR / ".veille_build.json"
+# Fichiers de configuration dont la modification impose un build
+CONFIG_FILES = ("mkdocs.yml", "requirements.txt")
+
+
+def git(*args):
+    """Sortie d'une commande git, ou None si elle échoue (pas de dépôt, commit inconnu)."""
+    try:
+        result = subprocess.run(["git", *args], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout
+
+
+def config_digest():
+    digest = hashlib.sha1()
+    for name in CONFIG_FILES:
+        try:
+            digest.update((PROJECT_ROOT / name).read_bytes())
+        except OSError:
+            pass
+    return digest.hexdigest()
+
+
+def load_state():
+    try:
+        with open(BUILD_STATE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def docs_sources():
+    """Fichiers de docs/ (chemins relatifs) -> date de modification."""
+    sources = {}
+    for root, _, names in os.walk(DOCS_DIR):
+        for name in names:
+            path = Path(root) / name
+            sources[path.relative_to(DOCS_DIR).as_posix()] = path.stat().st_mtime
+    return sources
+
+
+def changed_docs(state, sources):
+    """Fichiers de docs/ ajoutés, modifiés ou supprimés depuis le dernier build (chemins relatifs à docs/)."""
+    previous = state.get("sources", {})
+    removed = set(previous) - set(sources)
+
+    commit = state.get("commit")
+    if commit and git("cat-file", "-e", f"{commit}^{{commit}}") is not None:
+        # Commit du dernier build -> arbre de travail (modifications non commitées comprises) ;
+        # l'index est rafraîchi pour ignorer les fichiers dont seule la date a changé
+        git("update-index", "-q", "--refresh")
+        diff = git("diff", "--name-only", "--no-renames", commit, "--", "docs")
+        untracked = git("ls-files", "--others", "--exclude-standard", "--", "docs")
+        if diff is not None and untracked is not None:
+            changed = {Path(p).relative_to("docs").as_posix() for p in (diff + untracked).splitlines()}
+            return (changed & set(sources)) | removed
+
+    # Hors git (ou commit inconnu) : date de modification différente de celle du dernier build
+    return {path for path, mtime in sources.items() if previous.get(path) != mtime} | removed
+
+
+def run_mkdocs():
+    command = [sys.executable, "-m", "mkdocs", "build"]
+    return subprocess.run(command, cwd=PROJECT_ROOT).returncode == 0
+
+
+def plan(sources, full=False):
+    """Retourne la raison de reconstruire le site, ou None s'il est à jour."""
+    state = load_state()
+    if full:
+        return "demandé (--full)"
+    if state is None or not SITE_DIR.is_dir():
+        return "aucun build précédent dans site/"
+    if state.get("config") != config_digest():
+        return "configuration modifiée"
+    changed = changed_docs(state, sources)
+    if changed:
+        return f"{len(changed)} fichier(s) de docs/ modifié(s)"
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--full", action="store_true", help="build même si rien n'a changé")
+    args = parser.parse_args()
+
+    start = time.time()
+    reason = plan(docs_sources(), args.full)
+    if reason is None:
+        print("✅ Site à jour : aucun fichier de docs/ modifié depuis le dernier build")
+        return
+    print(f"🏗️  Build : {reason}")
+    if not run_mkdocs():
+        print("❌ Échec du build MkDocs")
+        sys.exit(1)
+    elapsed = time.time() - start
+
+    write_atomic(BUILD_STATE_PATH, json.dumps({
+        "commit": (git("rev-parse", "HEAD") or "").strip() or None,
+        "config": config_digest(),
+        "started_at": start,
+        "seconds": round(elapsed, 2),
+        "sources": docs_sources(),
+    }), fsync=False)
+    print(f"⏱️  Build en {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Cache disque pour la veille technologique.
+Stocke des entrées JSON adressées par empreinte SHA-256, avec éviction par âge et par taille.
+
+Usage:
+    python3 scripts/veille_cache.py stats
+    python3 scripts/veille_cache.py purge
+    python3 scripts/veille_cache.py clear [scrape|analysis|github|all]
+    python3 scripts/veille_cache.py forget <url>
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+from pathlib import Path
+
+from veille_io import write_atomic
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = SCRIPT_DIR.parent
+CACHE_DIR = Path(os.getenv("VEILLE_CACHE_DIR", str(PROJECT_ROOT / ".cache")))
+
+# Éviction par défaut : 30 jours, 200 Mo par cache
+DEFAULT_MAX_AGE = int(os.getenv("VEILLE_CACHE_MAX_AGE_DAYS", "30")) * 86400
+DEFAULT_MAX_BYTES = int(os.getenv("VEILLE_CACHE_MAX_MB", "200")) * 1024 * 1024
+# Durée de vie des analyses Mistral mises en cache (90 jours par défaut)
+ANALYSIS_TTL = int(os.getenv("VEILLE_ANALYSIS_CACHE_TTL_DAYS", "90")) * 86400
+
+
+def hash_key(*parts):
+    """Calcule une clé de cache stable à partir de plusieurs éléments."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """Cache clé/valeur JSON sur disque, un fichier par entrée."""
+
+    def __init__(self, name, max_age=DEFAULT_MAX_AGE, max_bytes=DEFAULT_MAX_BYTES):
+        self.name = name
+        self.directory = CACHE_DIR / name
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        # Sous-dossier par préfixe pour éviter les répertoires géants
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key):
+        """Retourne (valeur, âge en secondes) ou (None, None) si absente ou expirée."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None, None
+
+        age = time.time() - record.get("stored_at", 0)
+        if age > self.max_age:
+            return None, None
+        return record.get("value"), age
+
+    def set(self, key, value):
+        """Enregistre une valeur (écriture atomique ; sans fsync, le cache se reconstruit)."""
+        try:
+            write_atomic(self._path(key), json.dumps({"stored_at": time.time(), "value": value}, ensure_ascii=False),
+                         fsync=False)
+        except OSError as e:
+            print(f"   ⚠️  Cache {self.name}: écriture impossible ({e})")
+
+    def delete(self, key):
+        """Supprime une entrée."""
+        try:
+            self._path(key).unlink()
+            return True
+        except OSError:
+            return False
+
+    def delete_where(self, predicate):
+        """Supprime les entrées dont la valeur satisfait le prédicat (parcours complet)."""
+        removed = 0
+        for _, _, path in self._entries():
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    value = json.load(f).get("value")
+            except (OSError, ValueError):
+                continue
+            if isinstance(value, dict) and predicate(value):
+                try:
+                    path.unlink()
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+    def _entries(self):
+        if not self.directory.exists():
+            return []
+        entries = []
+        for path in self.directory.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self):
+        """Supprime les entrées expirées puis les plus anciennes au-delà de la taille maximale."""
+        now = time.time()
+        entries = sorted(self._entries())
+        removed = 0
+        total = sum(size for _, size, _ in entries)
+
+        for mtime, size, path in entries:
+            if now - mtime <= self.max_age and total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                removed += 1
+                total -= size
+            except OSError:
+                pass
+        return removed
+
+    def clear(self):
+        """Vide entièrement le cache."""
+        removed = 0
+        for _, _, path in self._entries():
+            try:
+                path.unlink()
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def stats(self):
+        """Retourne (nombre d'entrées, taille totale en octets)."""
+        entries = self._entries()
+        return len(entries), sum(size for _, size, _ in entries)
+
+
+# Caches partagés par les scripts
+SCRAPE_CACHE = DiskCache("scrape")
+ANALYSIS_CACHE = DiskCache("analysis", max_age=ANALYSIS_TTL)
+# État de synchronisation des issues (since, ETag, issues ouvertes connues)
+GITHUB_CACHE = DiskCache("github", max_age=365 * 86400)
+
+CACHES = {
+    "scrape": SCRAPE_CACHE,
+    "analysis": ANALYSIS_CACHE,
+    "github": GITHUB_CACHE,
+}
+
+
+def main(argv):
+    command = argv[1] if len(argv) > 1 else "stats"
+    target = argv[2] if len(argv) > 2 else "all"
+
+    if command == "forget":
+        # Invalide toutes les entrées (scraping + analyses) liées à une URL
+        if len(argv) < 3:
+            print(__doc__)
+            return 1
+        url = target.strip()
+        for cache in CACHES.values():
+            removed = cache.delete_where(lambda value: value.get("url") == url)
+            print(f"🗑️  {cache.name}: {removed} entrée(s) supprimée(s) pour {url}")
+        return 0
+
+    if target != "all" and target not in CACHES:
+        print(f"❌ Cache inconnu: {target} (choix: {', '.join(CACHES)}, all)")
+        return 1
+    selected = CACHES.values() if target == "all" else [CACHES[target]]
+
+    if command == "stats":
+        for cache in selected:
+            count, size = cache.stats()
+            print(f"📦 {cache.name}: {count} entrée(s), {size / 1024:.1f} Ko")
+    elif command == "purge":
+        for cache in selected:
+            print(f"🧹 {cache.name}: {cache.evict()} entrée(s) évincée(s)")
+    elif command == "clear":
+        for cache in selected:
+            print(f"🗑️  {cache.name}: {cache.clear()} entrée(s) supprimée(s)")
+    else:
+        print(__doc__)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
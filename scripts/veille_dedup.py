@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Détection de quasi-doublons entre articles par SimHash 64 bits sur le texte scrapé.
+
+L'empreinte est découpée en 8 bandes de 8 bits : deux empreintes à distance de Hamming
+inférieure à 8 partagent forcément une bande identique. La recherche ne compare donc que
+les quelques candidats d'une bande, quel que soit le nombre de fiches indexées.
+
+L'index est complété au premier accès avec les fiches du manifeste qu'il ne couvre pas
+(fiches antérieures, .cache perdu) dont le texte scrapé est encore dans le cache de scraping.
+Le corps d'une fiche (résumé Mistral) ne peut pas approcher l'empreinte d'un texte scrapé :
+les autres fiches ne sont couvertes que par l'index d'URL. Les fiches supprimées en sont retirées.
+
+Usage:
+    python3 scripts/veille_dedup.py             # statistiques de l'index
+    python3 scripts/veille_dedup.py --rebuild   # reconstruit l'index depuis les fiches
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+import threading
+
+from veille_cache import CACHE_DIR, SCRAPE_CACHE, hash_key
+from veille_io import write_atomic
+from veille_index import FicheManifest, normalize_url
+
+INDEX_PATH = CACHE_DIR / "simhash_index.json"
+
+SIMHASH_BITS = 64
+BANDS = 8
+BAND_BITS = SIMHASH_BITS // BANDS
+# Distance de Hamming maximale pour considérer deux textes comme quasi-identiques
+# (doit rester < BANDS pour que le découpage en bandes garantisse de trouver les candidats)
+MAX_DISTANCE = min(BANDS - 1, int(os.getenv("VEILLE_DUP_MAX_DISTANCE", "6")))
+# Taille des shingles (n-grammes de mots)
+SHINGLE_SIZE = 3
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def simhash(text):
+    """Calcule l'empreinte SimHash 64 bits d'un texte."""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        words = words + [""] * (SHINGLE_SIZE - len(words))
+
+    blake2b = hashlib.blake2b
+    count = len(words) - SHINGLE_SIZE + 1
+    digests = "".join([blake2b(" ".join(words[i:i + SHINGLE_SIZE]).encode("utf-8"), digest_size=8).hexdigest()
+                       for i in range(count)])
+    # Toutes les empreintes bout à bout en binaire : le caractère `pos` de chacune (bit 63 - pos)
+    # s'obtient par tranche, et les 1 se comptent en C plutôt que bit à bit en Python
+    bits = bin(int("1" + digests, 16))[3:]
+
+    fingerprint = 0
+    for pos in range(SIMHASH_BITS):
+        # Bit à 1 si majoritaire parmi les shingles
+        if 2 * bits[pos::SIMHASH_BITS].count("1") > count:
+            fingerprint |= 1 << (SIMHASH_BITS - 1 - pos)
+    return fingerprint
+
+
+_BAND_MASK = (1 << BAND_BITS) - 1
+
+
+def _bands(fingerprint):
+    # Clé entière (numéro de bande, valeur de la bande)
+    return [(i << BAND_BITS) | (fingerprint >> (i * BAND_BITS) & _BAND_MASK) for i in range(BANDS)]
+
+
+def _popcount(value):
+    return bin(value).count("1")
+
+
+# int.bit_count() (Python 3.10+) est nettement plus rapide
+if hasattr(int, "bit_count"):
+    _popcount = int.bit_count
+
+
+class SimHashIndex:
+    """
+    Index persistant empreinte -> fiche, interrogeable par bandes.
+    `exists(chemin)` indique si une fiche existe encore (par défaut : fichier présent dans docs/).
+    """
+
+    def __init__(self, path=INDEX_PATH, manifest=None, exists=None):
+        self.path = path
+        self.manifest = manifest or FicheManifest()
+        self.exists = exists or (lambda rel_path: (self.manifest.docs_dir / rel_path).exists())
+        self.entries = {}
+        self.buckets = {}
+        self.seeded = False
+        self.lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+        self._reindex()
+
+    def _reindex(self):
+        self.buckets = {}
+        for key in self.entries:
+            self._index(int(key, 16))
+
+    def _index(self, fingerprint):
+        for band in _bands(fingerprint):
+            self.buckets.setdefault(band, []).append(fingerprint)
+
+    def _save(self):
+        write_atomic(self.path, json.dumps(self.entries, ensure_ascii=False), fsync=False)
+
+    def _seed_text(self, entry):
+        # Texte scrapé de l'article, seul comparable au texte d'un nouvel article (None si absent)
+        if not entry.get("source"):
+            return None
+        page, _ = SCRAPE_CACHE.get(hash_key(normalize_url(entry["source"])))
+        return page.get("text") if page else None
+
+    def _ensure_seeded(self):
+        """Ajoute les fiches du manifeste absentes de l'index et retire les fiches supprimées."""
+        if self.seeded:
+            return
+        self.seeded = True
+        manifest_entries, _ = self.manifest.refresh()
+        indexed = {entry["path"] for entry in self.entries.values()}
+
+        stale = [key for key, entry in self.entries.items()
+                 if entry["path"] not in manifest_entries and not self.exists(entry["path"])]
+        for key in stale:
+            del self.entries[key]
+
+        added = 0
+        for rel_path, entry in manifest_entries.items():
+            if rel_path in indexed:
+                continue
+            text = self._seed_text(entry)
+            if not text:
+                continue
+            fingerprint = simhash(text)
+            self.entries.setdefault(f"{fingerprint:016x}", {
+                "path": rel_path, "url": entry.get("source"), "title": entry.get("title"),
+            })
+            added += 1
+
+        if stale or added:
+            self._reindex()
+            try:
+                self._save()
+            except OSError as e:
+                print(f"   ⚠️  Index de doublons non sauvegardé: {e}")
+
+    def rebuild(self):
+        """Reconstruit l'index depuis les fiches du manifeste. Retourne le nombre d'empreintes."""
+        with self.lock:
+            self.entries = {}
+            self.seeded = False
+            self._ensure_seeded()
+            return len(self.entries)
+
+    def find(self, fingerprint, max_distance=MAX_DISTANCE):
+        """Retourne (entrée, distance) de la fiche existante la plus proche, ou (None, None)."""
+        best, best_distance = None, None
+        with self.lock:
+            self._ensure_seeded()
+            for band in _bands(fingerprint):
+                for candidate in self.buckets.get(band, ()):
+                    distance = _popcount(candidate ^ fingerprint)
+                    if distance > max_distance or (best_distance is not None and distance >= best_distance):
+                        continue
+                    # Fiche supprimée depuis son indexation : pas un doublon
+                    if not self.exists(self.entries[f"{candidate:016x}"]["path"]):
+                        continue
+                    best, best_distance = candidate, distance
+            if best is None:
+                return None, None
+            return self.entries[f"{best:016x}"], best_distance
+
+    def add(self, fingerprint, path, url, title=None):
+        """Enregistre l'empreinte d'une fiche créée."""
+        key = f"{fingerprint:016x}"
+        with self.lock:
+            self._ensure_seeded()
+            if key not in self.entries:
+                self._index(fingerprint)
+            self.entries[key] = {"path": str(path), "url": url, "title": title}
+            try:
+                self._save()
+            except OSError as e:
+                print(f"   ⚠️  Index de doublons non sauvegardé: {e}")
+
+
+if __name__ == "__main__":
+    index = SimHashIndex()
+    if "--rebuild" in sys.argv:
+        index.rebuild()
+    else:
+        with index.lock:
+            index._ensure_seeded()
+    print(f"🧬 {len(index.entries)} empreinte(s), {len(index.buckets)} bande(s) distinctes")
+    sys.exit(0)
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Extraction du texte principal des pages HTML scrapées.
+
+Chaque backend fournit un extracteur au fil de l'eau : feed(bytes) à chaque morceau reçu,
+`done` indique que la suite de la page est inutile, close() retourne (texte, image, canonique).
+
+  - stream       : parseur incrémental de la bibliothèque standard, page entière sans
+                   boilerplate évident, arrêt dès que suffisamment de texte est collecté
+  - bs4          : extraction historique (arbre BeautifulSoup complet puis get_text())
+  - readability  : lxml, ne garde que le bloc de contenu principal (score par paragraphes,
+                   pénalité de densité de liens), sans menus, encarts ni commentaires
+  - trafilatura  : optionnel, si le paquet est installé
+
+Le backend est choisi par VEILLE_EXTRACTOR (défaut : stream, seul à arrêter la lecture de la page
+en cours de route ; les autres ont besoin de la page entière, jusqu'au plafond d'octets).
+
+Usage:
+    python3 scripts/veille_extract.py page.html [backend]   # tester une extraction
+"""
+
+import os
+import re
+import sys
+import codecs
+import importlib.util
+from functools import partial
+from html.parser import HTMLParser
+
+# Taille maximale du texte extrait d'une page (≈ 34 000 tokens). Les textes longs sont
+# ensuite découpés et résumés par parties avant l'analyse (voir veille_budget).
+MAX_CONTENT_CHARS = int(os.getenv("VEILLE_MAX_CONTENT_CHARS", "120000"))
+# Backend d'extraction ('stream', 'bs4', 'readability', 'trafilatura' ; 'auto' = stream)
+EXTRACTOR = os.getenv("VEILLE_EXTRACTOR", "stream").strip().lower()
+
+# Balises dont le contenu n'est pas du texte d'article
+SKIP_TAGS = {"script", "style", "nav", "footer", "noscript", "header", "template", "svg"}
+
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
+_SPACES_RE = re.compile(r'\s+')
+_XML_DECLARATION_RE = re.compile(r'^\s*<\?xml[^>]*\?>')
+
+
+def sniff_encoding(data):
+    """Sans charset dans les en-têtes : <meta charset> en début de document, sinon UTF-8."""
+    match = _META_CHARSET_RE.search(data[:4096])
+    return match.group(1).decode("ascii") if match else "utf-8"
+
+
+def finalize_text(pieces, max_chars=MAX_CONTENT_CHARS):
+    """Assemble les fragments, réduit les espaces et tronque à max_chars."""
+    clean_text = _SPACES_RE.sub(' ', ''.join(pieces)).strip()
+    # Limiter la taille pour ne pas exploser le contexte Mistral
+    if len(clean_text) > max_chars:
+        clean_text = clean_text[:max_chars] + "..."
+    return clean_text
+
+
+class _TextCollector(HTMLParser):
+    """Parseur incrémental : collecte le texte visible, og:image et rel=canonical."""
+
+    def __init__(self, max_chars):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.pieces = []
+        self.length = 0
+        self.skip_depth = 0
+        self.image_url = None
+        self.canonical_url = None
+
+    @property
+    def done(self):
+        return self.length > self.max_chars
+
+    def handle_starttag(self, tag, attrs):
+        # Séparateur entre nœuds, comme get_text(separator=' ')
+        self.pieces.append(' ')
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+        elif tag == "meta" and self.image_url is None:
+            attrs = dict(attrs)
+            if attrs.get("property") == "og:image" and attrs.get("content"):
+                self.image_url = attrs["content"]
+        elif tag == "link" and self.canonical_url is None:
+            attrs = dict(attrs)
+            if "canonical" in (attrs.get("rel") or "").lower().split() and attrs.get("href"):
+                self.canonical_url = attrs["href"]
+
+    def handle_startendtag(self, tag, attrs):
+        # <meta ... />, <link ... /> : mêmes attributs, pas de profondeur
+        if tag not in SKIP_TAGS:
+            self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        self.pieces.append(' ')
+        if tag in SKIP_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        # Le texte d'un nœud peut arriver en plusieurs morceaux : pas de séparateur ici
+        self.pieces.append(data)
+        self.length += len(data.strip())
+
+
+class StreamingTextExtractor:
+    """
+    Extraction au fil de l'eau : feed(bytes) à chaque morceau reçu, `done` indique
+    que le budget de texte est atteint, close() retourne (texte, image, canonique).
+    """
+
+    def __init__(self, max_chars=MAX_CONTENT_CHARS, encoding=None):
+        self.max_chars = max_chars
+        self.encoding = encoding
+        self.decoder = None
+        self.parser = _TextCollector(max_chars)
+
+    @property
+    def done(self):
+        return self.parser.done
+
+    def _init_decoder(self, first_chunk):
+        encoding = self.encoding or sniff_encoding(first_chunk)
+        try:
+            self.decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        except LookupError:
+            self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def feed(self, chunk):
+        if self.done or not chunk:
+            return
+        if self.decoder is None:
+            self._init_decoder(chunk)
+        self.parser.feed(self.decoder.decode(chunk))
+
+    def close(self):
+        if self.decoder is not None and not self.done:
+            self.parser.feed(self.decoder.decode(b"", final=True))
+            self.parser.close()
+        text = finalize_text(self.parser.pieces, self.max_chars)
+        return text, self.parser.image_url, self.parser.canonical_url
+
+
+def extract_with_bs4(html, max_chars=MAX_CONTENT_CHARS, encoding=None):
+    """Extraction historique : arbre BeautifulSoup complet puis get_text()."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser', from_encoding=encoding)
+
+    # Extraction de l'image og:image
+    og_image = soup.find("meta", property="og:image")
+    image_url = og_image["content"] if og_image else None
+
+    # <link rel="canonical"> (peut être relative)
+    canonical = soup.find("link", rel="canonical")
+    canonical_url = canonical.get("href") if canonical else None
+
+    # Nettoyage basique (supprimer scripts, styles, nav, footer)
+    for script in soup(["script", "style", "nav", "footer", "noscript", "header"]):
+        script.decompose()
+
+    return finalize_text([soup.get_text(separator=' ')], max_chars), image_url, canonical_url
+
+
+class BufferedExtractor:
+    """Accumule la page puis extrait en une fois (backends qui ont besoin de l'arbre complet)."""
+
+    done = False
+
+    def __init__(self, extract, max_chars=MAX_CONTENT_CHARS, encoding=None):
+        self.extract = extract
+        self.max_chars = max_chars
+        self.encoding = encoding
+        self.chunks = []
+
+    def feed(self, chunk):
+        self.chunks.append(chunk)
+
+    def close(self):
+        data = b"".join(self.chunks)
+        if not data.strip():
+            return "", None, None
+        return self.extract(data, self.max_chars, self.encoding)
+
+
+def _first(values):
+    return values[0].strip() if values else None
+
+
+def _parse_lxml(data, encoding=None):
+    """Document lxml + (titre, og:image, canonique)."""
+    from lxml import html as lxml_html
+    # Décodage côté Python : libxml2 ne connaît pas tous les alias (latin-1...)
+    try:
+        text = data.decode(encoding or sniff_encoding(data), errors="replace")
+    except LookupError:
+        text = data.decode("utf-8", errors="replace")
+    parser = lxml_html.HTMLParser(remove_comments=True, remove_pis=True)
+    # lxml refuse une chaîne qui porte encore sa déclaration <?xml encoding=...?> (XHTML)
+    tree = lxml_html.document_fromstring(_XML_DECLARATION_RE.sub("", text, count=1), parser=parser)
+    title = _first(tree.xpath("//meta[@property='og:title']/@content")) or _first(tree.xpath("//title/text()"))
+    image_url = _first(tree.xpath("//meta[@property='og:image']/@content"))
+    canonical_url = _first(tree.xpath(
+        "//link[contains(concat(' ', normalize-space(translate(@rel, 'CANONIL', 'canonil')), ' '), ' canonical ')]/@href"
+    ))
+    return tree, title, image_url, canonical_url
+
+
+# Éléments jamais utiles au contenu principal
+READABILITY_DROP_TAGS = ("script", "style", "nav", "footer", "noscript", "header", "aside",
+                         "form", "template", "svg", "iframe", "button", "select")
+# Classes / identifiants typiques du boilerplate (menus, partage, commentaires, bannières...)
+_BOILERPLATE_RE = re.compile(
+    r"comment|share|social|sidebar|related|recommend|newsletter|subscribe|cookie|consent|banner|"
+    r"promo|advert|sponsor|breadcrumb|menu|popup|modal|footer|masthead|signup|widget",
+    re.IGNORECASE,
+)
+_POSITIVE_RE = re.compile(r"article|content|entry|main|post|story|text|body", re.IGNORECASE)
+# Éléments porteurs de paragraphes et blocs candidats au contenu principal
+_PARAGRAPH_TAGS = ("p", "pre", "blockquote", "li", "td", "h2", "h3", "h4")
+_MIN_PARAGRAPH_CHARS = 25
+
+
+def _with_title(title, text):
+    # Le titre de la page n'est pas toujours dans le bloc principal
+    if title and title not in text[:len(title) + 200]:
+        return [title, " ", text]
+    return [text]
+
+
+def _node_text(node):
+    return _SPACES_RE.sub(" ", " ".join(node.itertext())).strip()
+
+
+def _link_density(node, text_length):
+    link_length = sum(len(_node_text(a)) for a in node.iter("a"))
+    return link_length / text_length if text_length else 1.0
+
+
+def extract_with_readability(data, max_chars=MAX_CONTENT_CHARS, encoding=None):
+    """Extraction façon Readability : le bloc qui concentre le plus de paragraphes."""
+    tree, title, image_url, canonical_url = _parse_lxml(data, encoding)
+
+    for node in tree.xpath("//" + " | //".join(READABILITY_DROP_TAGS)):
+        node.drop_tree()
+    for node in tree.xpath("//body//*[@class or @id]"):
+        attrs = f"{node.get('class', '')} {node.get('id', '')}"
+        if _BOILERPLATE_RE.search(attrs) and not _POSITIVE_RE.search(attrs) and node.getparent() is not None:
+            node.drop_tree()
+
+    # Chaque paragraphe vote pour son parent (et pour moitié pour le grand-parent)
+    scores = {}
+    for paragraph in tree.iter(*_PARAGRAPH_TAGS):
+        text = _node_text(paragraph)
+        if len(text) < _MIN_PARAGRAPH_CHARS:
+            continue
+        score = 1 + text.count(",") + min(len(text) // 100, 3)
+        parent = paragraph.getparent()
+        if parent is None:
+            continue
+        scores[parent] = scores.get(parent, 0) + score
+        grandparent = parent.getparent()
+        if grandparent is not None:
+            scores[grandparent] = scores.get(grandparent, 0) + score / 2
+
+    best, best_score = None, 0
+    for node, score in scores.items():
+        text_length = len(_node_text(node))
+        score *= 1 - _link_density(node, text_length)
+        if _POSITIVE_RE.search(f"{node.get('class', '')} {node.get('id', '')} {node.tag}"):
+            score *= 1.25
+        if score > best_score:
+            best, best_score = node, score
+
+    body = tree.find("body")
+    if best is None:
+        best = body if body is not None else tree
+    text = _node_text(best)
+    if body is not None and len(text) < 200:
+        # Page sans structure exploitable : tout le corps nettoyé
+        text = _node_text(body)
+
+    return finalize_text(_with_title(title, text), max_chars), image_url, canonical_url
+
+
+def extract_with_trafilatura(data, max_chars=MAX_CONTENT_CHARS, encoding=None):
+    """Extraction par trafilatura (optionnel) sur l'arbre lxml."""
+    import trafilatura
+    tree, title, image_url, canonical_url = _parse_lxml(data, encoding)
+    text = trafilatura.extract(tree, include_comments=False, include_tables=True, favor_precision=True) or ""
+    return finalize_text(_with_title(title, text), max_chars), image_url, canonical_url
+
+
+def _available(module):
+    return importlib.util.find_spec(module) is not None
+
+
+# Backend -> (fabrique d'extracteur, module requis)
+EXTRACTORS = {
+    "stream": (StreamingTextExtractor, None),
+    "bs4": (partial(BufferedExtractor, extract_with_bs4), "bs4"),
+    "readability": (partial(BufferedExtractor, extract_with_readability), "lxml"),
+    "trafilatura": (partial(BufferedExtractor, extract_with_trafilatura), "trafilatura"),
+}
+
+
+def available_extractors():
+    """Backends utilisables dans l'environnement courant."""
+    return [name for name, (_, module) in EXTRACTORS.items() if module is None or _available(module)]
+
+
+def resolve_extractor(name=EXTRACTOR):
+    """Nom du backend effectif ('auto' ou backend absent -> stream)."""
+    if name in available_extractors():
+        return name
+    if name != "auto":
+        print(f"   ⚠️  Extracteur '{name}' indisponible, utilisation de 'stream'")
+    return "stream"
+
+
+def make_extractor(name=EXTRACTOR, max_chars=MAX_CONTENT_CHARS, encoding=None):
+    """Crée un extracteur (feed / done / close) pour une page."""
+    factory, _ = EXTRACTORS[resolve_extractor(name)]
+    return factory(max_chars=max_chars, encoding=encoding)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    backend = resolve_extractor(sys.argv[2] if len(sys.argv) > 2 else EXTRACTOR)
+    extractor = make_extractor(backend)
+    with open(sys.argv[1], "rb") as f:
+        extractor.feed(f.read())
+    text, image_url, canonical_url = extractor.close()
+    print(f"🧩 {backend} — {len(text)} caractères, image: {image_url}, canonique: {canonical_url}\n")
+    print(text)
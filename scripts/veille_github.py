@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Écritures GitHub groupées pour le traitement de la veille.
+Les commentaires et fermetures d'issues sont collectés puis envoyés par lots
+dans une seule mutation GraphQL (alias c0/k0, c1/k1...), avec un ordonnanceur
+qui respecte X-RateLimit-Remaining / X-RateLimit-Reset (quotas REST et GraphQL séparés).
+Seuls les alias en échec sont rejoués en REST ; après une erreur ambiguë (délai dépassé,
+5xx), l'état des issues est relu avant de rejouer quoi que ce soit.
+"""
+
+import os
+import time
+import threading
+
+from veille_http import get_session
+
+# Racine de l'API GitHub (GitHub Enterprise, serveur factice des benchmarks)
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").strip().rstrip("/")
+GRAPHQL_URL = f"{GITHUB_API_URL}/graphql"
+
+# Nombre d'issues par mutation GraphQL (0 = appels REST immédiats)
+GITHUB_BATCH_SIZE = max(0, int(os.getenv("VEILLE_GITHUB_BATCH_SIZE", "20")))
+# En dessous de ce quota restant, on attend la réinitialisation de la fenêtre
+RATE_LIMIT_THRESHOLD = int(os.getenv("VEILLE_RATE_LIMIT_THRESHOLD", "50"))
+# Attente maximale (secondes) avant de tenter quand même la requête
+RATE_LIMIT_MAX_WAIT = int(os.getenv("VEILLE_RATE_LIMIT_MAX_WAIT", "900"))
+# Commentaires relus par issue pour savoir si une mutation interrompue a été appliquée
+RECOVER_COMMENTS = 20
+
+
+class RateLimiter:
+    """
+    Suit les quotas GitHub à partir des en-têtes de réponse et temporise si nécessaire.
+    REST (core) et GraphQL ont des budgets distincts : un état par ressource,
+    identifiée par l'en-tête X-RateLimit-Resource.
+    """
+
+    def __init__(self, threshold=RATE_LIMIT_THRESHOLD, max_wait=RATE_LIMIT_MAX_WAIT):
+        self.threshold = threshold
+        self.max_wait = max_wait
+        # ressource -> {"remaining": ..., "reset_at": ...}
+        self.quotas = {}
+        self.lock = threading.Lock()
+
+    def update(self, response):
+        """Met à jour le quota de la ressource à partir des en-têtes X-RateLimit-*."""
+        resource = response.headers.get("X-RateLimit-Resource", "core")
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset_at = response.headers.get("X-RateLimit-Reset")
+        with self.lock:
+            quota = self.quotas.setdefault(resource, {"remaining": None, "reset_at": None})
+            if remaining is not None:
+                quota["remaining"] = int(remaining)
+            if reset_at is not None:
+                quota["reset_at"] = int(reset_at)
+
+    def wait(self, resource="core"):
+        """Attend la réinitialisation du quota de `resource` s'il est presque épuisé."""
+        with self.lock:
+            quota = self.quotas.get(resource)
+            if not quota or quota["remaining"] is None or quota["reset_at"] is None \
+                    or quota["remaining"] > self.threshold:
+                return
+            remaining = quota["remaining"]
+            delay = quota["reset_at"] - time.time()
+        if delay > 0:
+            delay = min(delay, self.max_wait)
+            print(f"   ⏳ Quota GitHub {resource} presque épuisé ({remaining} restant), pause de {delay:.0f}s")
+            time.sleep(delay)
+
+
+# Quotas partagés par tous les appels GitHub du processus
+GITHUB_RATE_LIMITER = RateLimiter()
+
+
+class GitHubWriteBack:
+    """
+    Collecte les retours (commentaire + fermeture) par issue et les envoie par lots GraphQL.
+    `rest_comment(number, body)` et `rest_close(number)` servent de repli unitaire ;
+    `before_send()` est appelé avant chaque envoi (ex. écrire les fiches sur disque).
+    """
+
+    def __init__(self, token, rest_comment, rest_close, batch_size=GITHUB_BATCH_SIZE, limiter=None,
+                 before_send=None):
+        self.token = token
+        self.rest_comment = rest_comment
+        self.rest_close = rest_close
+        self.before_send = before_send
+        self.batch_size = batch_size
+        self.limiter = limiter or GITHUB_RATE_LIMITER
+        self.pending = []
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+
+    def add(self, issue, comment, close=True):
+        """Programme un commentaire puis, par défaut, la fermeture d'une issue."""
+        if self.batch_size == 0 or not issue.get("node_id"):
+            # Pas de node_id GraphQL (ou lots désactivés) : appels REST directs
+            if self.before_send:
+                self.before_send()
+            self._rest(issue["number"], comment, close)
+            return
+
+        with self.lock:
+            self.pending.append((issue["number"], issue["node_id"], comment, close))
+            full = len(self.pending) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Envoie toutes les écritures en attente, par lots de batch_size issues."""
+        with self.flush_lock:
+            while True:
+                with self.lock:
+                    batch = self.pending[:self.batch_size]
+                    self.pending = self.pending[self.batch_size:]
+                if not batch:
+                    return
+                if self.before_send:
+                    self.before_send()
+                self._send(batch)
+
+    def _rest(self, number, comment, close):
+        self.rest_comment(number, comment)
+        if close:
+            self.rest_close(number)
+
+    def _send(self, batch):
+        # Une mutation = N alias exécutés dans l'ordre (commentaire avant fermeture)
+        declarations, fields, variables = [], [], {}
+        for i, (number, node_id, comment, close) in enumerate(batch):
+            declarations += [f"$id{i}: ID!", f"$body{i}: String!"]
+            fields.append(f"c{i}: addComment(input: {{subjectId: $id{i}, body: $body{i}}}) {{ clientMutationId }}")
+            if close:
+                fields.append(f"k{i}: closeIssue(input: {{issueId: $id{i}}}) {{ clientMutationId }}")
+            variables[f"id{i}"] = node_id
+            variables[f"body{i}"] = comment
+        query = f"mutation({', '.join(declarations)}) {{\n  " + "\n  ".join(fields) + "\n}"
+
+        self.limiter.wait("graphql")
+        try:
+            resp = get_session().post(
+                GRAPHQL_URL,
+                headers={"Authorization": f"bearer {self.token}"},
+                json={"query": query, "variables": variables},
+                timeout=30
+            )
+            self.limiter.update(resp)
+            result = resp.json() if resp.status_code == 200 else None
+        except Exception as e:
+            # Délai dépassé, connexion coupée... : GitHub a peut-être exécuté la mutation
+            print(f"   ⚠️  Erreur mutation GraphQL ({e}), vérification de {len(batch)} issue(s)")
+            self._recover(batch)
+            return
+
+        if result is None:
+            if resp.status_code >= 500:
+                print(f"   ⚠️  Erreur mutation GraphQL (HTTP {resp.status_code}), vérification de {len(batch)} issue(s)")
+                self._recover(batch)
+            else:
+                # Requête refusée (401, 403, 422...) : rien n'a été exécuté
+                print(f"   ⚠️  Mutation GraphQL refusée (HTTP {resp.status_code}), repli REST pour {len(batch)} issue(s)")
+                for number, _, comment, close in batch:
+                    self._rest(number, comment, close)
+            return
+
+        # Un alias exécuté a une valeur dans "data" ; les erreurs sont rattachées à l'alias via
+        # leur "path". Sans "data" (requête invalide), aucune mutation n'a été exécutée.
+        data = result.get("data") or {}
+        failed = {error["path"][0] for error in result.get("errors", []) if error.get("path")}
+        done = {alias for alias, value in data.items() if value is not None and alias not in failed}
+
+        for i, (number, _, comment, close) in enumerate(batch):
+            if f"c{i}" not in done:
+                self.rest_comment(number, comment)
+            if not close:
+                continue
+            if f"k{i}" not in done:
+                self.rest_close(number)
+            else:
+                print(f"   🔒 Issue #{number} fermée")
+        print(f"   📤 {len(batch)} issue(s) traitée(s) en 1 requête GraphQL")
+
+    def _recover(self, batch):
+        """
+        Après une erreur ambiguë, relit l'état des issues (commentaires récents, état) et ne
+        rejoue en REST que ce qui manque : pas de commentaire en double. Si la relecture échoue
+        aussi, les issues restent ouvertes et seront reprises au prochain run.
+        """
+        declarations, fields, variables = [], [], {}
+        for i, (_, node_id, _, _) in enumerate(batch):
+            declarations.append(f"$id{i}: ID!")
+            fields.append(f"i{i}: node(id: $id{i}) {{ ... on Issue {{ state comments(last: {RECOVER_COMMENTS}) {{ nodes {{ body }} }} }} }}")
+            variables[f"id{i}"] = node_id
+        query = f"query({', '.join(declarations)}) {{\n  " + "\n  ".join(fields) + "\n}"
+
+        self.limiter.wait("graphql")
+        try:
+            resp = get_session().post(
+                GRAPHQL_URL,
+                headers={"Authorization": f"bearer {self.token}"},
+                json={"query": query, "variables": variables},
+                timeout=30
+            )
+            self.limiter.update(resp)
+            if resp.status_code != 200:
+                raise Exception(f"HTTP {resp.status_code}")
+            data = resp.json().get("data") or {}
+        except Exception as e:
+            print(f"   ⚠️  Vérification impossible ({e}) : {len(batch)} issue(s) laissée(s) ouverte(s) jusqu'au prochain run")
+            return
+
+        for i, (number, _, comment, close) in enumerate(batch):
+            issue = data.get(f"i{i}")
+            if issue is None:
+                print(f"   ⚠️  Issue #{number} introuvable, retour ignoré")
+                continue
+            bodies = [node["body"] for node in issue["comments"]["nodes"]]
+            if comment not in bodies:
+                self.rest_comment(number, comment)
+            if close and issue["state"] != "CLOSED":
+                self.rest_close(number)
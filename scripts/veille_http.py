@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Session HTTP partagée par les scripts de la veille.
+Pool de connexions par hôte (keep-alive), retries avec backoff exponentiel
+sur 5xx / 429 et respect de l'en-tête Retry-After (plafonné : la même session interroge des
+sites tiers, qui ne doivent pas bloquer un worker pendant une heure).
+"""
+
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Nombre de tentatives supplémentaires et facteur de backoff (0.5s, 1s, 2s, ...)
+HTTP_RETRIES = int(os.getenv("VEILLE_HTTP_RETRIES", "3"))
+HTTP_BACKOFF = float(os.getenv("VEILLE_HTTP_BACKOFF", "0.5"))
+# Pause maximale (secondes) accordée à un en-tête Retry-After
+HTTP_MAX_RETRY_AFTER = float(os.getenv("VEILLE_HTTP_MAX_RETRY_AFTER", "30"))
+# Nombre d'hôtes gardés en pool et de connexions ouvertes par hôte
+HTTP_POOL_HOSTS = int(os.getenv("VEILLE_HTTP_POOL_HOSTS", "32"))
+HTTP_POOL_SIZE = int(os.getenv("VEILLE_HTTP_POOL_SIZE", "16"))
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class VeilleRetry(Retry):
+    """
+    Retry urllib3 qui rejoue aussi les POST, mais uniquement sur 429 :
+    la requête n'a pas été traitée, la rejouer ne crée pas de doublon (issue, commentaire).
+    La pause demandée par Retry-After est plafonnée à HTTP_MAX_RETRY_AFTER.
+    """
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, HTTP_MAX_RETRY_AFTER)
+
+    def is_retry(self, method, status_code, has_retry_after=False):
+        if method and method.upper() == "POST" and status_code == 429:
+            return True
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+def build_session():
+    """Crée une session avec pool de connexions et politique de retry."""
+    retry = VeilleRetry(
+        total=HTTP_RETRIES,
+        backoff_factor=HTTP_BACKOFF,
+        status_forcelist=RETRY_STATUSES,
+        # Méthodes idempotentes (GET, PUT, DELETE...) + PATCH (fermeture d'issue)
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS | {"PATCH"},
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_HOSTS,
+        pool_maxsize=HTTP_POOL_SIZE,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session():
+    """Retourne la session partagée (créée au premier appel)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session()
+    return _session
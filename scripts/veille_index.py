@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Manifeste des fiches pour la génération incrémentale de l'index.
+Mémorise (chemin, mtime, taille, empreinte du contenu, titre, date, tags, catégorie) de chaque
+fiche : seules les fiches nouvelles ou modifiées sont relues et leur frontmatter re-parsé.
+Une fiche dont seule la date a changé (checkout de la CI) est reconnue par
+l'empreinte SHA-1 de son contenu et n'est pas re-parsée.
+
+Usage:
+    python3 scripts/veille_index.py          # met à jour le manifeste
+    python3 scripts/veille_index.py --full   # reconstruit le manifeste de zéro
+"""
+
+import os
+import sys
+import json
+import hashlib
+import datetime
+import threading
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import yaml
+
+from veille_cache import CACHE_DIR
+from veille_io import write_atomic
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = SCRIPT_DIR.parent
+DOCS_DIR = PROJECT_ROOT / "docs"
+FICHES_DIR = DOCS_DIR / "fiches"
+
+MANIFEST_PATH = CACHE_DIR / "fiches_manifest.json"
+URL_INDEX_PATH = CACHE_DIR / "url_index.json"
+# Incrémenter si le format des entrées change (force une reconstruction)
+MANIFEST_VERSION = 3
+
+# Paramètres de suivi sans effet sur le contenu de la page
+# (pas `ref` : souvent significatif, ex. branche GitHub `?ref=main`)
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "_hsenc", "_hsmi", "cmpid", "xtor", "at_medium", "at_campaign",
+}
+
+# Un seul rafraîchissement du manifeste à la fois (workers du serveur local)
+_MANIFEST_LOCK = threading.Lock()
+
+
+def normalize_url(url):
+    """
+    Forme canonique d'une URL : casse, port par défaut, www, slash final, fragment,
+    paramètres de suivi (utm_*, fbclid...) retirés et paramètres restants triés.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme, netloc.rsplit(':', 1)[-1]) in (('http', '80'), ('https', '443')):
+        netloc = netloc.rsplit(':', 1)[0]
+    if netloc.startswith('www.'):
+        netloc = netloc[4:]
+    path = parts.path.rstrip('/') or '/'
+    params = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith('utm_') and k.lower() not in TRACKING_PARAMS
+    ]
+    return urlunsplit((scheme, netloc, path, urlencode(sorted(params)), ''))
+
+
+def parse_date(date_val):
+    """Convertit la date du frontmatter en chaîne ISO (YYYY-MM-DD) ou None."""
+    if isinstance(date_val, datetime.datetime):
+        return date_val.date().isoformat()
+    if isinstance(date_val, datetime.date):
+        return date_val.isoformat()
+    if isinstance(date_val, str):
+        try:
+            # Tente formats ISO YYYY-MM-DD
+            return datetime.datetime.strptime(date_val[:10], "%Y-%m-%d").date().isoformat()
+        except ValueError:
+            return None
+    return None
+
+
+# Chargeur YAML accéléré en C (libyaml) s'il est disponible
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def read_frontmatter(file_path):
+    """
+    Lit uniquement le frontmatter YAML d'une fiche, sans charger le corps.
+    La lecture s'arrête au délimiteur '---' fermant. Retourne un dict ou None.
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        if f.readline().rstrip() != '---':
+            return None
+        lines = []
+        for line in f:
+            if line.rstrip() == '---':
+                break
+            lines.append(line)
+        else:
+            # Pas de délimiteur fermant : frontmatter invalide
+            return None
+
+    fm = yaml.load(''.join(lines), Loader=YAML_LOADER)
+    return fm if isinstance(fm, dict) else None
+
+
+def content_hash(file_path):
+    """Empreinte SHA-1 du contenu d'un fichier."""
+    with open(file_path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _iter_fiches(directory):
+    """Parcourt récursivement les fiches Markdown en renvoyant (chemin, stat)."""
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from _iter_fiches(entry.path)
+                elif entry.name.endswith(".md") and entry.name != "index.md":
+                    yield Path(entry.path), entry.stat()
+    except FileNotFoundError:
+        return
+
+
+class FicheManifest:
+    """Manifeste persistant des métadonnées de fiches, mis à jour incrémentalement."""
+
+    def __init__(self, path=MANIFEST_PATH, docs_dir=DOCS_DIR, fiches_dir=FICHES_DIR):
+        self.path = Path(path)
+        self.docs_dir = Path(docs_dir)
+        self.fiches_dir = Path(fiches_dir)
+        self.entries = {}
+
+    def load(self):
+        """Charge le manifeste depuis le disque (vide si absent ou obsolète)."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                self.entries = data.get("entries", {})
+            else:
+                self.entries = {}
+        except (OSError, ValueError):
+            self.entries = {}
+        return self.entries
+
+    def save(self):
+        """Écrit le manifeste de manière atomique."""
+        write_atomic(self.path, json.dumps({"version": MANIFEST_VERSION, "entries": self.entries}, ensure_ascii=False),
+                     fsync=False)
+
+    def _parse(self, file_path, stat, sha):
+        fm = read_frontmatter(file_path)
+        if fm is None:
+            return None
+        tags = fm.get('tags') or []
+        return {
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha": sha,
+            "title": str(fm.get('title', file_path.stem)),
+            "date": parse_date(fm.get('date')),
+            "tags": [str(t) for t in tags] if isinstance(tags, list) else [str(tags)],
+            "category": fm.get('category'),
+            "source": fm.get('source'),
+        }
+
+    def refresh(self):
+        """
+        Synchronise le manifeste avec docs/fiches.
+        Un simple stat() suffit pour les fiches inchangées ; si seule la date diffère, l'empreinte
+        du contenu est comparée avant de re-parser la fiche.
+        Retourne (entrées, nombre de fiches re-parsées).
+        """
+        with _MANIFEST_LOCK:
+            self.load()
+            seen = set()
+            parsed = 0
+            changed = False
+
+            for file_path, stat in _iter_fiches(self.fiches_dir):
+                rel_path = file_path.relative_to(self.docs_dir).as_posix()
+                seen.add(rel_path)
+                entry = self.entries.get(rel_path)
+                if entry and entry["mtime"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                    continue
+
+                try:
+                    sha = content_hash(file_path)
+                except OSError as e:
+                    print(f"⚠️  Erreur lecture {file_path}: {e}")
+                    continue
+                if entry and entry["size"] == stat.st_size and entry.get("sha") == sha:
+                    # Contenu identique, seule la date a changé : pas de re-parsing
+                    entry["mtime"] = stat.st_mtime_ns
+                    changed = True
+                    continue
+
+                try:
+                    new_entry = self._parse(file_path, stat, sha)
+                except yaml.YAMLError as e:
+                    print(f"   ⚠️  Erreur YAML dans {file_path}: {e}")
+                    new_entry = None
+                except Exception as e:
+                    print(f"⚠️  Erreur lecture {file_path}: {e}")
+                    new_entry = None
+
+                parsed += 1
+                changed = True
+                # Une fiche illisible est mémorisée comme invalide pour ne pas la relire à chaque run
+                self.entries[rel_path] = new_entry or {
+                    "mtime": stat.st_mtime_ns,
+                    "size": stat.st_size,
+                    "sha": sha,
+                    "invalid": True,
+                }
+
+            # Fiches supprimées
+            for rel_path in set(self.entries) - seen:
+                del self.entries[rel_path]
+                changed = True
+
+            if changed:
+                try:
+                    self.save()
+                except OSError as e:
+                    print(f"   ⚠️  Manifeste non sauvegardé: {e}")
+
+            valid = {path: e for path, e in self.entries.items() if not e.get("invalid")}
+            return valid, parsed
+
+
+class UrlIndex:
+    """
+    Index persistant URL canonique -> fiche (chemin relatif à docs/), consulté en O(1).
+    Au premier accès, il est complété avec le champ `source` des fiches du manifeste.
+    `exists(chemin)` indique si une fiche existe encore (par défaut : fichier présent dans docs/).
+    """
+
+    def __init__(self, path=URL_INDEX_PATH, manifest=None, exists=None):
+        self.path = Path(path)
+        self.manifest = manifest or FicheManifest()
+        self.exists = exists or (lambda rel_path: (self.manifest.docs_dir / rel_path).exists())
+        self.urls = None
+        self.lock = threading.Lock()
+
+    def _ensure_loaded(self):
+        if self.urls is not None:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.urls = json.load(f)
+        except (OSError, ValueError):
+            self.urls = {}
+        # Fiches créées hors pipeline (édition manuelle, autre machine)
+        entries, _ = self.manifest.refresh()
+        for rel_path, entry in entries.items():
+            if entry.get("source"):
+                self.urls.setdefault(normalize_url(entry["source"]), rel_path)
+
+    def _save(self):
+        write_atomic(self.path, json.dumps(self.urls, ensure_ascii=False), fsync=False)
+
+    def lookup(self, *urls):
+        """Retourne le chemin de la fiche déjà créée pour l'une des URLs, ou None."""
+        with self.lock:
+            self._ensure_loaded()
+            for url in urls:
+                rel_path = self.urls.get(normalize_url(url))
+                if rel_path and self.exists(rel_path):
+                    return rel_path
+        return None
+
+    def add(self, rel_path, *urls):
+        """Associe une ou plusieurs URLs (originale, finale, canonique) à une fiche."""
+        with self.lock:
+            self._ensure_loaded()
+            for url in urls:
+                self.urls[normalize_url(url)] = rel_path
+            try:
+                self._save()
+            except OSError as e:
+                print(f"   ⚠️  Index des URLs non sauvegardé: {e}")
+
+
+if __name__ == "__main__":
+    manifest = FicheManifest()
+    if "--full" in sys.argv:
+        try:
+            manifest.path.unlink()
+        except OSError:
+            pass
+    entries, parsed = manifest.refresh()
+    print(f"📊 {len(entries)} fiche(s) dans le manifeste, {parsed} re-parsée(s).")
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Écriture atomique des fichiers générés (fiches, page d'accueil, index JSON, cache).
+
+write_atomic() écrit dans un fichier temporaire du même dossier, le synchronise (fsync) puis le
+renomme sur la cible (os.replace) : un lecteur concurrent (mkdocs serve, autre worker de capture)
+voit l'ancienne ou la nouvelle version, jamais un fichier à moitié écrit. Aucun processus n'est lancé.
+Si le renommage est refusé (PermissionError, vu sur macOS dans certains dossiers synchronisés),
+le contenu est réécrit en place dans le fichier existant.
+
+BatchWriter regroupe les écritures d'une exécution : flush() synchronise tous les fichiers puis
+chaque dossier une seule fois, au lieu d'un aller-retour disque complet par fiche.
+
+Usage:
+    python3 scripts/veille_io.py <fichier> < contenu   # écriture atomique depuis l'entrée standard
+"""
+
+import os
+import sys
+import threading
+from pathlib import Path
+
+# Verrou par fichier cible : deux threads qui écrivent le même fichier se succèdent
+_PATH_LOCKS = {}
+_PATH_LOCKS_GUARD = threading.Lock()
+
+
+def _path_lock(path):
+    with _PATH_LOCKS_GUARD:
+        return _PATH_LOCKS.setdefault(str(path), threading.Lock())
+
+
+def _temp_path(path):
+    # Nom unique par processus et par thread, dans le même dossier (os.replace reste un renommage)
+    return path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def _write_temp(path, content, fsync):
+    tmp_path = _temp_path(path)
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+    except BaseException:
+        _unlink(tmp_path)
+        raise
+    return tmp_path
+
+
+def _replace(tmp_path, path, content):
+    try:
+        os.replace(tmp_path, path)
+    except PermissionError as e:
+        # Renommage refusé : réécriture en place (non atomique, mais sans passer par un shell)
+        print(f"   ⚠️  Renommage refusé pour {path.name} ({e}), écriture directe")
+        _unlink(tmp_path)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+
+def _unlink(path):
+    try:
+        path.unlink()
+    except OSError:
+        pass
+
+
+def fsync_dir(directory):
+    """Rend les renommages d'un dossier durables (sans effet là où ce n'est pas supporté)."""
+    try:
+        fd = os.open(str(directory), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_atomic(path, content, fsync=True):
+    """Remplace le contenu de `path` de manière atomique. Lève OSError en cas d'échec."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _path_lock(path):
+        tmp_path = _write_temp(path, content, fsync)
+        _replace(tmp_path, path, content)
+    if fsync:
+        fsync_dir(path.parent)
+
+
+class BatchWriter:
+    """
+    Écritures différées, partagées entre threads : write() met un contenu en attente (la dernière
+    version d'un même fichier l'emporte), flush() les écrit toutes de manière atomique.
+    Un fichier en cours d'écriture reste « contenu » (`path in writer`) jusqu'à son renommage.
+    """
+
+    def __init__(self, fsync=True):
+        self.fsync = fsync
+        self.pending = {}
+        self.writing = {}
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+
+    def write(self, path, content):
+        with self.lock:
+            self.pending[Path(path)] = content
+
+    def __contains__(self, path):
+        with self.lock:
+            return Path(path) in self.pending or Path(path) in self.writing
+
+    def flush(self):
+        """Écrit les fichiers en attente. Retourne le nombre de fichiers écrits."""
+        with self.flush_lock:
+            with self.lock:
+                batch, self.pending = self.pending, {}
+                self.writing = batch
+            if not batch:
+                return 0
+
+            # 1. Contenus écrits et synchronisés, 2. renommages, 3. un fsync par dossier
+            staged = []
+            try:
+                for path, content in batch.items():
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    staged.append((path, _write_temp(path, content, self.fsync), content))
+                for path, tmp_path, content in staged:
+                    with _path_lock(path):
+                        _replace(tmp_path, path, content)
+            except BaseException:
+                for _, tmp_path, _ in staged:
+                    _unlink(tmp_path)
+                # Rien n'est perdu : les écritures non faites restent en attente
+                with self.lock:
+                    for path, content in batch.items():
+                        self.pending.setdefault(path, content)
+                    self.writing = {}
+                raise
+            with self.lock:
+                self.writing = {}
+            if self.fsync:
+                for directory in {path.parent for path in batch}:
+                    fsync_dir(directory)
+            return len(batch)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(__doc__)
+        sys.exit(1)
+    write_atomic(sys.argv[1], sys.stdin.read())
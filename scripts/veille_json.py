@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Lecture et validation des réponses JSON de Mistral.
+
+JsonStreamParser consomme la réponse au fil du flux : il ignore le texte avant le premier '{'
+(préambule, ```json), échappe les sauts de ligne bruts dans les chaînes et signale la fin de
+l'objet racine, ce qui permet d'arrêter la lecture du flux sans attendre un éventuel bavardage.
+validate_analysis() vérifie et normalise le schéma attendu d'une analyse.
+"""
+
+import json
+import unicodedata
+
+THEMATIQUES = ["DevOps", "IA & Data", "Développement", "Architecture", "Business", "Cybersécurité", "Infrastructure"]
+ANALYSIS_KEYS = ("titre", "resume", "tags", "thematique")
+MAX_TAGS = 10
+
+# Caractères de contrôle fréquents dans les chaînes générées par un LLM
+_STRING_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+
+
+class JsonStreamParser:
+    """Parseur incrémental d'un objet JSON racine. feed(texte) -> True quand l'objet est complet."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.buffer = []
+        self.started = False
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.complete = False
+
+    def feed(self, text):
+        buffer = self.buffer
+        for char in text:
+            if self.complete:
+                break
+            if not self.started:
+                # Préambule ignoré jusqu'à l'ouverture de l'objet
+                if char == "{":
+                    self.started = True
+                    self.depth = 1
+                    buffer.append(char)
+                continue
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == "\\":
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+                elif char in _STRING_ESCAPES:
+                    char = _STRING_ESCAPES[char]
+            elif char == '"':
+                self.in_string = True
+            elif char in "{[":
+                self.depth += 1
+            elif char in "}]":
+                self.depth -= 1
+                if self.depth == 0:
+                    self.complete = True
+            buffer.append(char)
+        return self.complete
+
+    def text(self):
+        return "".join(self.buffer)
+
+    def result(self):
+        """Retourne (objet, erreur) : l'objet décodé ou None avec la description du problème."""
+        if not self.started:
+            return None, "aucun objet JSON dans la réponse"
+        if not self.complete:
+            return None, "JSON tronqué (objet non refermé)"
+        try:
+            return json.loads(self.text(), strict=False), None
+        except ValueError as e:
+            return None, f"JSON invalide : {e}"
+
+
+def _fold(value):
+    # Comparaison insensible à la casse et aux accents
+    return "".join(c for c in unicodedata.normalize("NFKD", value.casefold()) if not unicodedata.combining(c))
+
+
+_THEMATIQUES_FOLDED = {_fold(t): t for t in THEMATIQUES}
+
+
+def validate_analysis(data):
+    """
+    Vérifie le schéma d'une analyse (titre, resume, tags, thematique).
+    Retourne (analyse normalisée, []) ou (None, liste des erreurs).
+    """
+    if not isinstance(data, dict):
+        return None, ["la réponse doit être un objet JSON"]
+
+    errors = []
+    missing = [key for key in ANALYSIS_KEYS if key not in data]
+    if missing:
+        errors.append(f"clés manquantes : {', '.join(missing)}")
+
+    result = dict(data)
+    for key in ("titre", "resume"):
+        if key in data and (not isinstance(data[key], str) or not data[key].strip()):
+            errors.append(f"'{key}' doit être une chaîne non vide")
+        elif key in data:
+            result[key] = data[key].strip()
+
+    tags = data.get("tags")
+    if isinstance(tags, str):
+        tags = tags.split(",")
+    if "tags" in data:
+        if not isinstance(tags, list) or not all(isinstance(t, str) for t in tags):
+            errors.append("'tags' doit être une liste de chaînes")
+        else:
+            cleaned = []
+            for tag in (t.strip().lstrip("#") for t in tags):
+                if tag and tag.lower() not in (c.lower() for c in cleaned):
+                    cleaned.append(tag)
+            if not cleaned:
+                errors.append("'tags' ne doit pas être vide")
+            result["tags"] = cleaned[:MAX_TAGS]
+
+    if "thematique" in data:
+        thematique = _THEMATIQUES_FOLDED.get(_fold(str(data["thematique"]).strip()))
+        if thematique is None:
+            errors.append(f"'thematique' doit être une valeur parmi : {', '.join(THEMATIQUES)}")
+        else:
+            result["thematique"] = thematique
+
+    if errors:
+        return None, errors
+    return result, []
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Mesures du pipeline : durée de chaque étape (scraping, analyse Mistral, écriture des fiches,
+appels GitHub, pages d'index), octets téléchargés, tokens envoyés / reçus et retries,
+par issue et pour l'ensemble de l'exécution.
+
+  - METRICS.issue(numéro) : rattache les mesures du thread courant à une issue
+  - METRICS.stage(nom) : chronomètre une étape (temps écoulé)
+  - METRICS.add(compteur, valeur) : octets, tokens, retries...
+  - en fin de run : résumé affiché, JSON (VEILLE_METRICS_JSON) et format texte Prometheus
+    (VEILLE_METRICS_PROM, pour le textfile collector de node_exporter)
+  - profiling(VEILLE_PROFILE) : cProfile ("cpu") ou tracemalloc ("memory") autour du run
+
+Usage:
+    python3 scripts/veille_metrics.py                         # résumé du dernier run
+    python3 scripts/veille_metrics.py --prom                  # même chose, format Prometheus
+    python3 scripts/veille_metrics.py .cache/metrics.json     # autre fichier de mesures
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import threading
+from contextlib import contextmanager
+
+from veille_io import write_atomic
+from veille_cache import CACHE_DIR, PROJECT_ROOT
+
+# Mesures du dernier run (JSON) ; vide pour désactiver
+METRICS_JSON = os.getenv("VEILLE_METRICS_JSON", str(CACHE_DIR / "metrics.json")).strip()
+# Export Prometheus (format texte) ; vide par défaut
+METRICS_PROM = os.getenv("VEILLE_METRICS_PROM", "").strip()
+# Profilage du run : "cpu" (cProfile), "memory" (tracemalloc) ; vide pour désactiver
+PROFILE_MODE = os.getenv("VEILLE_PROFILE", "").strip().lower()
+PROFILE_PATH = CACHE_DIR / "profile.pstats"
+# Nombre de lignes des rapports (issues les plus lentes, fonctions, allocations)
+REPORT_TOP = 10
+
+
+def percentile(values, q):
+    """Percentile au rang le plus proche (values triées)."""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(q * len(values)) - 1)]
+
+
+class RunMetrics:
+    """Mesures d'une exécution, alimentées depuis les threads de traitement."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started_at = time.time()
+            self.started = time.perf_counter()
+            self.finished = None
+            # étape -> durées (secondes)
+            self.stages = {}
+            # compteur -> total (bytes, mistral_prompt_tokens, http_retries...)
+            self.counters = {}
+            # numéro d'issue -> {"status", "seconds", "stages": {étape: s}, "counters": {...}}
+            self.issues = {}
+
+    # --- Contexte ---
+
+    @contextmanager
+    def issue(self, number):
+        """Rattache les étapes et compteurs du thread courant à l'issue `number`."""
+        previous = getattr(self._local, "issue", None)
+        self._local.issue = number
+        with self.lock:
+            self.issues.setdefault(number, {"status": None, "seconds": 0.0, "stages": {}, "counters": {}})
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.issues[number]["seconds"] += elapsed
+            self._local.issue = previous
+
+    @contextmanager
+    def stage(self, name):
+        """Chronomètre une étape (temps écoulé, attente des sémaphores comprise)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        number = getattr(self._local, "issue", None)
+        with self.lock:
+            self.stages.setdefault(name, []).append(seconds)
+            if number is not None:
+                stages = self.issues[number]["stages"]
+                stages[name] = stages.get(name, 0.0) + seconds
+
+    def add(self, name, value=1):
+        """Incrémente un compteur (global et, le cas échéant, de l'issue courante)."""
+        if not value:
+            return
+        number = getattr(self._local, "issue", None)
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+            if number is not None:
+                counters = self.issues[number]["counters"]
+                counters[name] = counters.get(name, 0) + value
+
+    def add_all(self, counters, prefix=""):
+        for name, value in counters.items():
+            self.add(prefix + name, value)
+
+    @contextmanager
+    def counting(self, prefix=""):
+        """Dict de compteurs à remplir (ex. `counters` de la passerelle Mistral), cumulé à la sortie."""
+        counters = {}
+        try:
+            yield counters
+        finally:
+            self.add_all(counters, prefix)
+
+    def set_status(self, number, status):
+        with self.lock:
+            self.issues.setdefault(number, {"status": None, "seconds": 0.0, "stages": {}, "counters": {}})
+            self.issues[number]["status"] = status
+
+    # --- Résultats ---
+
+    def snapshot(self):
+        """Mesures agrégées, sérialisables en JSON."""
+        with self.lock:
+            elapsed = (self.finished or time.perf_counter()) - self.started
+            stages = {}
+            for name, durations in self.stages.items():
+                ordered = sorted(durations)
+                stages[name] = {
+                    "calls": len(ordered),
+                    "seconds": round(sum(ordered), 4),
+                    "p50": round(percentile(ordered, 0.5), 4),
+                    "p95": round(percentile(ordered, 0.95), 4),
+                    "max": round(ordered[-1], 4),
+                }
+            statuses = {}
+            for entry in self.issues.values():
+                if entry["status"]:
+                    statuses[entry["status"]] = statuses.get(entry["status"], 0) + 1
+            issue_times = sorted(entry["seconds"] for entry in self.issues.values())
+            return {
+                "started_at": self.started_at,
+                "seconds": round(elapsed, 4),
+                "stages": stages,
+                "counters": dict(self.counters),
+                "statuses": statuses,
+                "issue_latency": {
+                    "p50": round(percentile(issue_times, 0.5), 4),
+                    "p95": round(percentile(issue_times, 0.95), 4),
+                },
+                "issues": {
+                    str(number): {
+                        "status": entry["status"],
+                        "seconds": round(entry["seconds"], 4),
+                        "stages": {k: round(v, 4) for k, v in entry["stages"].items()},
+                        "counters": dict(entry["counters"]),
+                    }
+                    for number, entry in self.issues.items()
+                },
+            }
+
+    def finish(self):
+        """Arrête le chronomètre du run, affiche le résumé et écrit les exports configurés."""
+        with self.lock:
+            self.finished = time.perf_counter()
+        data = self.snapshot()
+        print_report(data)
+        for path, render in ((METRICS_JSON, lambda d: json.dumps(d, ensure_ascii=False, indent=1)),
+                             (METRICS_PROM, to_prometheus)):
+            if not path:
+                continue
+            # Chemin relatif : depuis la racine du projet
+            path = PROJECT_ROOT / path
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                write_atomic(path, render(data), fsync=False)
+            except OSError as e:
+                print(f"⚠️  Mesures non écrites dans {path}: {e}")
+        return data
+
+
+def format_bytes(size):
+    for unit in ("o", "Ko", "Mo"):
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} Go"
+
+
+def print_report(data):
+    """Résumé lisible : temps par étape, compteurs, issues les plus lentes."""
+    counters = data["counters"]
+    print(f"⏱️  Mesures du run ({data['seconds']:.1f}s)")
+    if data["stages"]:
+        print(f"   {'étape':<14}{'appels':>7}{'total':>10}{'p50':>9}{'p95':>9}{'max':>9}")
+        for name, stage in sorted(data["stages"].items(), key=lambda item: -item[1]["seconds"]):
+            print(f"   {name:<14}{stage['calls']:>7}{stage['seconds']:>9.2f}s{stage['p50']:>8.2f}s"
+                  f"{stage['p95']:>8.2f}s{stage['max']:>8.2f}s")
+    print(f"   📥 {format_bytes(counters.get('bytes', 0))} téléchargé(s), "
+          f"🤖 {counters.get('mistral_prompt_tokens', 0)} + {counters.get('mistral_completion_tokens', 0)} tokens, "
+          f"🔁 {counters.get('mistral_retries', 0)} retry(s) Mistral, {counters.get('http_retries', 0)} retry(s) HTTP")
+    if data["issues"]:
+        latency = data["issue_latency"]
+        print(f"   Par issue : p50 {latency['p50']:.2f}s, p95 {latency['p95']:.2f}s")
+        slowest = sorted(data["issues"].items(), key=lambda item: -item[1]["seconds"])[:REPORT_TOP]
+        for number, entry in slowest:
+            detail = ", ".join(f"{k} {v:.2f}s" for k, v in sorted(entry["stages"].items(), key=lambda kv: -kv[1]))
+            print(f"     #{number} {entry['status'] or '?'} {entry['seconds']:.2f}s ({detail})")
+
+
+def _prom_labels(**labels):
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels.items()) + "}"
+
+
+def to_prometheus(data):
+    """Mesures au format texte Prometheus (exposition 0.0.4)."""
+    lines = [
+        "# HELP veille_run_duration_seconds Durée totale du dernier run.",
+        "# TYPE veille_run_duration_seconds gauge",
+        f"veille_run_duration_seconds {data['seconds']}",
+        "# HELP veille_run_timestamp_seconds Début du dernier run (epoch).",
+        "# TYPE veille_run_timestamp_seconds gauge",
+        f"veille_run_timestamp_seconds {data['started_at']:.0f}",
+        "# HELP veille_stage_seconds Durée des étapes du pipeline.",
+        "# TYPE veille_stage_seconds summary",
+    ]
+    for name, stage in sorted(data["stages"].items()):
+        for key, quantile in (("p50", "0.5"), ("p95", "0.95")):
+            lines.append(f"veille_stage_seconds{_prom_labels(stage=name, quantile=quantile)} {stage[key]}")
+        lines.append(f"veille_stage_seconds_sum{_prom_labels(stage=name)} {stage['seconds']}")
+        lines.append(f"veille_stage_seconds_count{_prom_labels(stage=name)} {stage['calls']}")
+    lines += [
+        "# HELP veille_issues Issues traitées par statut.",
+        "# TYPE veille_issues gauge",
+    ]
+    for status, count in sorted(data["statuses"].items()):
+        lines.append(f"veille_issues{_prom_labels(status=status)} {count}")
+    lines += [
+        "# HELP veille_counter Compteurs du run (octets, tokens, retries).",
+        "# TYPE veille_counter gauge",
+    ]
+    for name, value in sorted(data["counters"].items()):
+        lines.append(f"veille_counter{_prom_labels(name=name)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def profiling(mode=PROFILE_MODE):
+    """Profilage optionnel : cProfile ("cpu", dump dans .cache/profile.pstats) ou tracemalloc ("memory")."""
+    if mode == "cpu":
+        import cProfile
+        import pstats
+        profilers = [cProfile.Profile()]
+        lock = threading.Lock()
+        # Avant Python 3.12, cProfile ne suit que le thread qui l'active : chaque thread démarré
+        # pendant le run (workers des issues, passerelle Mistral) reçoit son propre profileur,
+        # et les profils sont fusionnés à la fin
+        per_thread = sys.version_info < (3, 12)
+
+        def profile_thread(*_):
+            sys.setprofile(None)
+            profiler = cProfile.Profile()
+            with lock:
+                profilers.append(profiler)
+            profiler.enable()
+
+        if per_thread:
+            threading.setprofile(profile_thread)
+        profilers[0].enable()
+        try:
+            yield
+        finally:
+            profilers[0].disable()
+            if per_thread:
+                threading.setprofile(None)
+            with lock:
+                stats = pstats.Stats(*profilers, stream=sys.stdout)
+            PROFILE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            stats.dump_stats(PROFILE_PATH)
+            print(f"🔬 Profil CPU ({len(profilers)} thread(s)) : {PROFILE_PATH} (python -m pstats), "
+                  "fonctions les plus coûteuses :")
+            stats.sort_stats("cumulative").print_stats(REPORT_TOP)
+    elif mode == "memory":
+        import tracemalloc
+        tracemalloc.start(25)
+        try:
+            yield
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"🔬 Pic mémoire Python : {format_bytes(peak)}, allocations principales :")
+            for stat in snapshot.statistics("lineno")[:REPORT_TOP]:
+                print(f"   {stat}")
+    else:
+        if mode:
+            print(f"⚠️  VEILLE_PROFILE={mode} inconnu (cpu ou memory)")
+        yield
+
+
+# Mesures partagées par le pipeline
+METRICS = RunMetrics()
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    path = args[0] if args else PROJECT_ROOT / METRICS_JSON
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"❌ Mesures illisibles ({path}): {e}")
+        sys.exit(1)
+    if "--prom" in sys.argv:
+        sys.stdout.write(to_prometheus(saved))
+    else:
+        print_report(saved)
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Passerelle Mistral partagée : un seul client asynchrone (MistralAsyncClient), ouvert une fois
+et piloté par une boucle d'événements dédiée dans un thread d'arrière-plan.
+
+  - VEILLE_MISTRAL_WORKERS requêtes simultanées au plus
+  - seaux à jetons dimensionnés sur le quota du compte (requêtes/min et tokens/min)
+  - sur 429 : pause commune (Retry-After), débit divisé par deux puis rétabli
+    progressivement à chaque succès ; 5xx et erreurs réseau rejoués avec backoff
+  - chat() pour un appel depuis du code synchrone, chat_batch() pour N prompts -> N réponses
+  - lecture en flux avec un parseur incrémental (chat(..., parser=JsonStreamParser()))
+
+Usage:
+    python3 scripts/veille_mistral.py "prompt"   # appel de test
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import threading
+
+from veille_budget import estimate_tokens
+
+# Quota du compte Mistral (voir la console : limites de l'espace de travail)
+MISTRAL_RPM = int(os.getenv("VEILLE_MISTRAL_RPM", "60"))
+MISTRAL_TPM = int(os.getenv("VEILLE_MISTRAL_TPM", "500000"))
+# Requêtes Mistral simultanées (analyses et résumés partiels confondus)
+MISTRAL_WORKERS = max(1, int(os.getenv("VEILLE_MISTRAL_WORKERS", "3")))
+MISTRAL_MAX_RETRIES = int(os.getenv("VEILLE_MISTRAL_RETRIES", "5"))
+MISTRAL_TIMEOUT = int(os.getenv("VEILLE_MISTRAL_TIMEOUT", "120"))
+# Racine de l'API (vide : API officielle) ; serveur compatible, ex. le serveur factice des benchmarks
+MISTRAL_ENDPOINT = os.getenv("MISTRAL_ENDPOINT", "").strip()
+# Tokens de réponse réservés a priori (ajusté ensuite avec l'usage réel)
+EXPECTED_COMPLETION_TOKENS = 800
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Seau à jetons asynchrone : `per_minute` unités, rechargé en continu."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+        # Fraction du débit nominal (réduite après un 429)
+        self.factor = 1.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.capacity * self.factor / 60)
+        self.updated = now
+
+    async def acquire(self, amount):
+        amount = min(amount, self.capacity)
+        while True:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return
+            await asyncio.sleep((amount - self.tokens) * 60 / (self.capacity * self.factor))
+
+    def adjust(self, delta):
+        """Corrige une réservation a priori (delta > 0 : consommation supplémentaire)."""
+        self._refill()
+        self.tokens -= delta
+
+
+class MistralGateway:
+    """Client Mistral asynchrone unique, limité en concurrence et en débit."""
+
+    def __init__(self, api_key, rpm=MISTRAL_RPM, tpm=MISTRAL_TPM, concurrency=MISTRAL_WORKERS,
+                 max_retries=MISTRAL_MAX_RETRIES, timeout=MISTRAL_TIMEOUT):
+        self.api_key = api_key
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.paused_until = 0.0
+        self.stats = {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0, "retries": 0, "throttled": 0}
+        self.loop = None
+        self.client = None
+        self.slots = None
+        self.lock = threading.Lock()
+
+    # --- Boucle d'arrière-plan ---
+
+    def _start(self):
+        with self.lock:
+            if self.loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="mistral-gateway", daemon=True).start()
+            asyncio.run_coroutine_threadsafe(self._open(), loop).result()
+            self.loop = loop
+
+    async def _open(self):
+        from mistralai.async_client import MistralAsyncClient
+        # max_retries=1 : les retries du SDK dorment avec time.sleep() et bloqueraient la boucle,
+        # ils sont gérés ici avec asyncio.sleep()
+        options = {"endpoint": MISTRAL_ENDPOINT} if MISTRAL_ENDPOINT else {}
+        self.client = MistralAsyncClient(
+            api_key=self.api_key,
+            max_retries=1,
+            timeout=self.timeout,
+            max_concurrent_requests=self.concurrency,
+            **options
+        )
+        self.slots = asyncio.Semaphore(self.concurrency)
+
+    def _run(self, coroutine):
+        self._start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def close(self):
+        """Ferme le client HTTP et arrête la boucle."""
+        with self.lock:
+            loop, self.loop = self.loop, None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.client.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+    # --- Contrôle de débit adaptatif ---
+
+    def _throttle(self, delay):
+        self.paused_until = max(self.paused_until, time.monotonic() + delay)
+        for bucket in (self.requests, self.tokens):
+            bucket.factor = max(0.1, bucket.factor / 2)
+        self.stats["throttled"] += 1
+
+    def _recover(self):
+        for bucket in (self.requests, self.tokens):
+            bucket.factor = min(1.0, bucket.factor + 0.1)
+
+    @staticmethod
+    def _retry_delay(error, attempt):
+        headers = getattr(error, "headers", None) or {}
+        retry_after = headers.get("retry-after") or headers.get("Retry-After")
+        try:
+            # Retry-After borné comme le backoff : un en-tête aberrant ne bloque pas la passerelle
+            return min(60.0, max(0.0, float(retry_after)))
+        except (TypeError, ValueError):
+            return min(60.0, 2 ** attempt) + random.uniform(0, 1)
+
+    # --- Appels ---
+
+    async def _stream(self, prompt, model, parser, **kwargs):
+        """Lecture en flux : s'arrête dès que le parseur signale une réponse complète."""
+        parts, usage = [], None
+        stream = self.client.chat_stream(model=model, messages=[{"role": "user", "content": prompt}], **kwargs)
+        try:
+            async for chunk in stream:
+                usage = chunk.usage or usage
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    parts.append(delta)
+                    if parser.feed(delta):
+                        break
+        finally:
+            await stream.aclose()
+        return "".join(parts), usage
+
+    async def achat(self, prompt, model, parser=None, counters=None, **kwargs):
+        """
+        Appel asynchrone : retourne le texte de la réponse.
+        Avec `parser` (reset() / feed(texte) -> True quand c'est complet), la réponse est lue en flux.
+        `counters` (dict) cumule requests / prompt_tokens / completion_tokens / retries de l'appel.
+        """
+        from mistralai.exceptions import MistralAPIException, MistralConnectionException
+
+        counters = {} if counters is None else counters
+        reserved = estimate_tokens(prompt) + EXPECTED_COMPLETION_TOKENS
+        attempt = 0
+        while True:
+            pause = self.paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+            await self.requests.acquire(1)
+            await self.tokens.acquire(reserved)
+            try:
+                async with self.slots:
+                    if parser is None:
+                        response = await self.client.chat(
+                            model=model,
+                            messages=[{"role": "user", "content": prompt}],
+                            **kwargs
+                        )
+                        content, usage = response.choices[0].message.content, response.usage
+                    else:
+                        parser.reset()
+                        content, usage = await self._stream(prompt, model, parser, **kwargs)
+            except (MistralAPIException, MistralConnectionException) as e:
+                status = getattr(e, "http_status", None)
+                if (status is not None and status not in RETRY_STATUSES) or attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                self.stats["retries"] += 1
+                counters["retries"] = counters.get("retries", 0) + 1
+                delay = self._retry_delay(e, attempt)
+                if status == 429:
+                    self._throttle(delay)
+                    print(f"   ⏳ Mistral 429 : débit réduit, nouvelle tentative dans {delay:.0f}s")
+                else:
+                    print(f"   🔁 Mistral {status or 'réseau'} : nouvelle tentative dans {delay:.0f}s")
+                    await asyncio.sleep(delay)
+                continue
+
+            self._recover()
+            # Flux interrompu avant le bilan d'usage : estimation
+            prompt_tokens = usage.prompt_tokens if usage else estimate_tokens(prompt)
+            completion_tokens = (usage.completion_tokens or 0) if usage else estimate_tokens(content)
+            self.tokens.adjust(prompt_tokens + completion_tokens - reserved)
+            self.stats["requests"] += 1
+            self.stats["prompt_tokens"] += prompt_tokens
+            self.stats["completion_tokens"] += completion_tokens
+            for name, value in (("requests", 1), ("prompt_tokens", prompt_tokens), ("completion_tokens", completion_tokens)):
+                counters[name] = counters.get(name, 0) + value
+            return content.strip()
+
+    async def _gather(self, prompts, model, return_exceptions, **kwargs):
+        return await asyncio.gather(
+            *(self.achat(prompt, model, **kwargs) for prompt in prompts),
+            return_exceptions=return_exceptions
+        )
+
+    def chat(self, prompt, model, **kwargs):
+        """Appel bloquant (utilisable depuis n'importe quel thread)."""
+        return self._run(self.achat(prompt, model, **kwargs))
+
+    def chat_batch(self, prompts, model, return_exceptions=False, **kwargs):
+        """N prompts -> N réponses, dans l'ordre, envoyés en parallèle sous les limites de débit."""
+        return self._run(self._gather(prompts, model, return_exceptions, **kwargs))
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway():
+    """Retourne la passerelle partagée (créée au premier appel, clé MISTRAL_API_KEY)."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = MistralGateway(os.getenv("MISTRAL_API_KEY", "").strip())
+    return _gateway
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    from dotenv import load_dotenv
+    load_dotenv()
+    gateway = get_gateway()
+    print(gateway.chat(sys.argv[1], os.getenv("MISTRAL_MODEL", "mistral-large-latest").strip()))
+    print(f"📊 {gateway.stats}")
+    gateway.close()
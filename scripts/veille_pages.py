@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Pages de navigation du site : accueil, pages d'archive paginées, archives mensuelles et
+pages par thématique, générées à partir de la liste des fiches.
+
+  docs/index.md                       les VEILLE_INDEX_PAGE_SIZE fiches les plus récentes
+  docs/pages/<k>.md                   toutes les fiches, par pages de taille fixe
+  docs/archives/index.md              liste des mois
+  docs/archives/<AAAA>-<MM>.md        fiches d'un mois
+  docs/categories/index.md            liste des thématiques
+  docs/categories/<slug>/index.md     fiches les plus récentes d'une thématique
+  docs/categories/<slug>/<k>.md       toutes les fiches d'une thématique, paginées
+
+La pagination part des fiches les plus anciennes (page 1 = les plus anciennes) : une nouvelle
+fiche ne modifie que la dernière page, pas toutes les pages suivantes. Seules les pages dont
+le contenu change sont réécrites (empreintes conservées dans .cache/).
+
+Usage:
+    python3 scripts/veille_pages.py          # régénère les pages modifiées
+"""
+
+import os
+import json
+import hashlib
+import datetime
+import threading
+
+from veille_cache import CACHE_DIR
+from veille_io import write_atomic, BatchWriter
+from veille_index import DOCS_DIR
+from veille_search import slugify
+
+PAGES_STATE_PATH = CACHE_DIR / "pages_state.json"
+PAGE_SIZE = max(1, int(os.getenv("VEILLE_INDEX_PAGE_SIZE", "50")))
+
+# Une seule génération à la fois (workers du serveur local)
+_PAGES_LOCK = threading.Lock()
+
+
+def month_label(date):
+    return date.strftime("%B %Y").capitalize() if date != datetime.date.min else "Anciens articles"
+
+
+def month_key(date):
+    return date.strftime("%Y-%m") if date != datetime.date.min else "sans-date"
+
+
+def _link(target, page):
+    """Lien Markdown relatif de la page `page` vers `target` (chemins relatifs à docs/)."""
+    return os.path.relpath(target, os.path.dirname(page) or ".").replace(os.sep, "/")
+
+
+def collect_articles(entries):
+    """Fiches à lister à partir des entrées du manifeste, dédoublonnées par titre (insensible à la casse)."""
+    articles = []
+    processed_titles = set()
+    for rel_path, entry in sorted(entries.items()):
+        title = entry['title']
+        case_title = title.lower().strip()
+        if case_title in processed_titles:
+            continue
+        processed_titles.add(case_title)
+        articles.append({
+            "date": datetime.date.fromisoformat(entry['date']) if entry['date'] else datetime.date.min,
+            "title": title,
+            # Chemin relatif à docs/ (MkDocs résout les liens relatifs entre pages)
+            "path": rel_path,
+            "category": entry.get('category'),
+        })
+    return articles
+
+
+def render_articles(articles, page):
+    """Liste des fiches (les plus récentes d'abord), groupées par mois."""
+    content = ""
+    current_month = None
+    for art in sorted(articles, key=lambda a: (a['date'], a['title']), reverse=True):
+        art_month = month_label(art['date'])
+        if art_month != current_month:
+            content += f"\n### {art_month}\n\n"
+            current_month = art_month
+        date_str = art['date'].strftime("%d/%m") if art['date'] != datetime.date.min else "??"
+        content += f"- **[{date_str}]** [{art['title']}]({_link(art['path'], page)})\n"
+    return content
+
+
+def render_listing(pages, articles, title, landing, pages_dir, heading="## 📅 Derniers articles", footer=""):
+    """
+    Page d'entrée (les PAGE_SIZE fiches les plus récentes) et pages d'archive de taille fixe.
+    `articles` est trié du plus ancien au plus récent.
+    """
+    chunks = [articles[i:i + PAGE_SIZE] for i in range(0, len(articles), PAGE_SIZE)]
+    count = len(chunks)
+    for number, chunk in enumerate(chunks, start=1):
+        page = f"{pages_dir}/{number}.md"
+        nav = []
+        if number < count:
+            nav.append(f"[← Plus récentes]({number + 1}.md)")
+        if number > 1:
+            nav.append(f"[Plus anciennes →]({number - 1}.md)")
+        header = f"# {title} — page {number}\n" + (f"\n{' · '.join(nav)}\n" if nav else "")
+        pages[page] = header + render_articles(chunk, page)
+
+    content = f"# {title}\n\n{heading}\n\n" + render_articles(articles[-PAGE_SIZE:], landing)
+    if count:
+        content += f"\n---\n\n📚 [Toutes les fiches ({len(articles)})]({_link(f'{pages_dir}/{count}.md', landing)})\n"
+    pages[landing] = content + footer
+
+
+def render_pages(articles):
+    """Retourne {chemin relatif à docs/: contenu} pour toutes les pages de navigation."""
+    articles = sorted(articles, key=lambda a: (a['date'], a['title']))
+    pages = {}
+
+    by_month, by_category = {}, {}
+    for art in articles:
+        by_month.setdefault(month_key(art['date']), []).append(art)
+        by_category.setdefault(art.get('category') or "Sans thématique", []).append(art)
+
+    render_listing(
+        pages, articles, "📰 Veille Technologique", "index.md", "pages",
+        footer="\n🗓️ [Archives par mois](archives/index.md) · 🗂️ [Par thématique](categories/index.md)\n"
+    )
+
+    months = "# 🗓️ Archives par mois\n\n"
+    for key, month_articles in sorted(by_month.items(), reverse=True):
+        page = f"archives/{key}.md"
+        label = month_label(month_articles[0]['date'])
+        pages[page] = f"# 🗓️ {label}\n" + render_articles(month_articles, page)
+        months += f"- [{label}]({key}.md) ({len(month_articles)})\n"
+    pages["archives/index.md"] = months
+
+    categories = "# 🗂️ Thématiques\n\n"
+    for name, category_articles in sorted(by_category.items()):
+        slug = slugify(name) or "autre"
+        render_listing(pages, category_articles, f"🗂️ {name}", f"categories/{slug}/index.md",
+                       f"categories/{slug}", heading="## Derniers articles")
+        categories += f"- [{name}]({slug}/index.md) ({len(category_articles)})\n"
+    pages["categories/index.md"] = categories
+    return pages
+
+
+class PageSet:
+    """Pages générées sous docs/ : seules celles dont l'empreinte change sont réécrites."""
+
+    def __init__(self, docs_dir=DOCS_DIR, state_path=PAGES_STATE_PATH):
+        self.docs_dir = docs_dir
+        self.state_path = state_path
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _unchanged(self, rel_path, digest, state):
+        path = self.docs_dir / rel_path
+        if state.get(rel_path) == digest:
+            return path.exists()
+        # Empreinte inconnue (premier passage, cache perdu) : comparaison avec le fichier existant
+        try:
+            return hashlib.sha1(path.read_bytes()).hexdigest() == digest
+        except OSError:
+            return False
+
+    def sync(self, pages):
+        """Écrit les pages modifiées et supprime les pages générées devenues inutiles. Retourne (écrites, supprimées)."""
+        with _PAGES_LOCK:
+            state = self._load_state()
+            digests = {rel_path: hashlib.sha1(content.encode("utf-8")).hexdigest() for rel_path, content in pages.items()}
+
+            writer = BatchWriter()
+            for rel_path, content in pages.items():
+                if not self._unchanged(rel_path, digests[rel_path], state):
+                    writer.write(self.docs_dir / rel_path, content)
+            written = writer.flush()
+
+            removed = 0
+            for rel_path in set(state) - set(pages):
+                try:
+                    (self.docs_dir / rel_path).unlink()
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+
+            if written or removed or digests != state:
+                write_atomic(self.state_path, json.dumps(digests), fsync=False)
+            return written, removed
+
+
+if __name__ == "__main__":
+    from veille_index import FicheManifest
+
+    entries, _ = FicheManifest().refresh()
+    written, removed = PageSet().sync(render_pages(collect_articles(entries)))
+    print(f"📄 {written} page(s) réécrite(s), {removed} supprimée(s)")
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Index de recherche compact et fragmenté, généré à partir des fiches (docs/search/).
+
+Le plugin `search` de MkDocs produit un unique search_index.json que le navigateur doit
+télécharger en entier avant la première requête. Cet index est découpé pour que la page
+de recherche ne charge que ce dont elle a besoin :
+
+  search/meta.json           nombre de fiches, paramètres, liste des fragments, mots vides
+  search/terms/<pr>.json     index inversé des termes commençant par <pr> : {terme: [[id, poids], ...]}
+  search/docs/<n>.json       titre, URL, date, catégorie et tags des fiches n*DOC_BLOCK..
+  search/facets.json         tags et catégories -> ids des fiches
+
+Termes issus du titre, des tags, de la catégorie et du résumé (pondérés dans cet ordre),
+repliés en minuscules sans accents. La mise à jour est incrémentale : l'état (termes et
+empreinte du contenu de chaque fiche) est conservé dans .cache/ ; seules les fiches dont le
+contenu a changé sont relues (une date modifiée par un checkout ne compte pas) et seuls les
+fragments dont le contenu change sont réécrits. Un fragment vidé est réécrit vide plutôt que
+supprimé.
+
+Usage:
+    python3 scripts/veille_search.py             # met à jour l'index
+    python3 scripts/veille_search.py --rebuild   # reconstruit l'index de zéro
+    python3 scripts/veille_search.py "requête"   # interroge l'index local
+"""
+
+import re
+import sys
+import json
+import math
+import shutil
+import threading
+import unicodedata
+from collections import Counter
+
+from veille_cache import CACHE_DIR
+from veille_io import write_atomic, BatchWriter
+from veille_index import FicheManifest, DOCS_DIR, FICHES_DIR
+
+SEARCH_DIR = DOCS_DIR / "search"
+STATE_PATH = CACHE_DIR / "search_state.json"
+# Incrémenter si le format de l'index change (force une reconstruction)
+SEARCH_VERSION = 3
+# Longueur du préfixe de fragment (1 : au plus 36 fragments) et nombre de fiches par bloc de métadonnées
+PREFIX_LEN = 1
+DOC_BLOCK = 256
+# Poids d'une occurrence selon le champ
+FIELD_WEIGHTS = (("title", 5), ("tags", 4), ("category", 2), ("summary", 1))
+# URL des articles, selon la configuration du plugin blog (mkdocs.yml)
+BLOG_DIR = "blog"
+
+STOPWORDS = set("""
+au aux avec ce ces cette dans de des du elle en et eux il ils je la le les leur leurs lui ma mais me meme
+mes moi mon ne nos notre nous on ou par pas pour qu que qui sa se ses son sur ta te tes toi ton tu un une
+vos votre vous est sont ete etre avoir fait plus comme tout tous toute toutes aussi ainsi entre sans sous
+dont cet leur tres peut bien deux alors car donc si sont ont elles the and for are but not you all any can
+her was one our out has have had how its may new now see who did get use with that this from they will
+would there their what about which when your into than then them these some such only also more most
+""".split())
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_SUMMARY_RE = re.compile(r"^## Résumé\s*$(.*?)(?=^---\s*$|^## |\Z)", re.MULTILINE | re.DOTALL)
+_MARKDOWN_LINK_RE = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+
+# Une seule mise à jour à la fois (workers du serveur local)
+_SEARCH_LOCK = threading.Lock()
+
+
+def fold(text):
+    """Minuscules sans accents (même repli que la page de recherche)."""
+    return "".join(c for c in unicodedata.normalize("NFKD", text.casefold()) if not unicodedata.combining(c))
+
+
+def tokenize(text):
+    return [w for w in _WORD_RE.findall(fold(text)) if len(w) > 1 and w not in STOPWORDS]
+
+
+def shard_key(term):
+    return term[:PREFIX_LEN]
+
+
+def slugify(value, separator="-"):
+    """Identifiant ASCII pour un nom de fichier (comme markdown.extensions.toc.slugify)."""
+    value = unicodedata.normalize("NFKD", value).encode("ascii", "ignore").decode("ascii")
+    value = re.sub(r"[^\w\s-]", "", value).strip().lower()
+    return re.sub(r"[{}\s]+".format(separator), separator, value)
+
+
+def post_slug(title, separator="-"):
+    # Identique au slugify par défaut du plugin blog (pymdownx.slugs, case="lower") : accents
+    # conservés, chaque espace devient un séparateur
+    value = re.sub(r"</?[^>]*>", "", unicodedata.normalize("NFC", title)).strip().lower()
+    return re.sub(r"[^\w\- ]", "", value).replace(" ", separator)
+
+
+def post_url(entry):
+    """URL (relative à la racine du site) d'une fiche publiée par le plugin blog."""
+    year, month = (entry.get("date") or "0000-00").split("-")[:2]
+    return f"{BLOG_DIR}/{year}/{month}/{post_slug(entry['title'])}/"
+
+
+def read_summary(file_path):
+    """Texte du résumé d'une fiche (section '## Résumé'), sans la syntaxe Markdown des liens."""
+    try:
+        text = file_path.read_text(encoding="utf-8")
+    except OSError:
+        return ""
+    if text.startswith("---"):
+        end = text.find("\n---", 3)
+        text = text[end + 4:] if end != -1 else text
+    match = _SUMMARY_RE.search(text)
+    return _MARKDOWN_LINK_RE.sub(r"\1", match.group(1) if match else text)
+
+
+def fiche_terms(entry, file_path):
+    """Termes pondérés d'une fiche : {terme: poids}."""
+    fields = {
+        "title": entry["title"],
+        "tags": " ".join(entry.get("tags") or []),
+        "category": entry.get("category") or "",
+        "summary": read_summary(file_path),
+    }
+    weights = Counter()
+    for field, weight in FIELD_WEIGHTS:
+        for term in tokenize(fields[field]):
+            weights[term] += weight
+    return dict(weights)
+
+
+class SearchIndex:
+    """Index inversé fragmenté de docs/search, mis à jour à partir du manifeste des fiches."""
+
+    def __init__(self, search_dir=SEARCH_DIR, state_path=STATE_PATH, docs_dir=DOCS_DIR):
+        self.search_dir = search_dir
+        self.state_path = state_path
+        self.docs_dir = docs_dir
+        self.state = None
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            # Index publié absent (clone neuf, suppression manuelle) : l'état ne vaut plus rien
+            if state.get("version") == SEARCH_VERSION and (self.search_dir / "meta.json").exists():
+                return state
+        except (OSError, ValueError):
+            pass
+        return None
+
+    def _read(self, path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _dump(data):
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+
+    def _write_if_changed(self, writer, path, data, previous=None):
+        """Met `data` en attente d'écriture si le fichier publié est absent ou différent."""
+        if not path.exists() or (self._read(path) if previous is None else previous) != data:
+            writer.write(path, self._dump(data))
+
+    def update(self, entries, rebuild=False):
+        """
+        Synchronise l'index avec les entrées du manifeste ({chemin: entrée}).
+        Retourne (fiches réindexées, fichiers réécrits).
+        """
+        with _SEARCH_LOCK:
+            state = None if rebuild else self._load_state()
+            if state is None:
+                # Reconstruction complète : on repart d'un dossier vide
+                shutil.rmtree(self.search_dir, ignore_errors=True)
+                state = {"version": SEARCH_VERSION, "next_id": 0, "docs": {}}
+            docs = state["docs"]
+
+            changed = [path for path, entry in entries.items()
+                       if path not in docs or docs[path]["sha"] != entry["sha"]]
+            removed = [path for path in docs if path not in entries]
+            if not changed and not removed:
+                return 0, 0
+
+            stale_ids = set()
+            shards, blocks = set(), set()
+            for path in removed + [p for p in changed if p in docs]:
+                old = docs[path]
+                stale_ids.add(old["id"])
+                shards.update(shard_key(term) for term in old["terms"])
+                blocks.add(old["id"] // DOC_BLOCK)
+            for path in removed:
+                del docs[path]
+
+            for path in changed:
+                entry = entries[path]
+                doc_id = docs[path]["id"] if path in docs else state["next_id"]
+                if path not in docs:
+                    state["next_id"] += 1
+                terms = fiche_terms(entry, self.docs_dir / path)
+                docs[path] = {
+                    "id": doc_id,
+                    "sha": entry["sha"],
+                    "terms": terms,
+                    "meta": [entry["title"], post_url(entry), entry.get("date"),
+                             entry.get("category"), entry.get("tags") or []],
+                }
+                shards.update(shard_key(term) for term in terms)
+                blocks.add(doc_id // DOC_BLOCK)
+
+            writer = BatchWriter()
+            by_id = {doc["id"]: doc for doc in docs.values()}
+            fresh = {docs[path]["id"] for path in changed}
+
+            # Fragments touchés : postings périmés retirés, postings des fiches (ré)indexées ajoutés
+            all_shards = set(self._read(self.search_dir / "meta.json").get("shards", []))
+            for key in shards:
+                shard_path = self.search_dir / "terms" / f"{key}.json"
+                previous = self._read(shard_path)
+                postings = {
+                    term: [p for p in plist if p[0] not in stale_ids]
+                    for term, plist in previous.items()
+                }
+                for doc_id in fresh:
+                    for term, weight in by_id[doc_id]["terms"].items():
+                        if shard_key(term) == key:
+                            postings.setdefault(term, []).append([doc_id, weight])
+                postings = {term: sorted(plist, key=lambda p: -p[1]) for term, plist in postings.items() if plist}
+                # Fragment vidé : réécrit vide (un fichier supprimé forcerait un build complet)
+                self._write_if_changed(writer, shard_path, postings, previous)
+                all_shards.add(key)
+
+            for block in blocks:
+                block_docs = {str(doc_id): doc["meta"] for doc_id, doc in by_id.items() if doc_id // DOC_BLOCK == block}
+                self._write_if_changed(writer, self.search_dir / "docs" / f"{block}.json", block_docs)
+
+            # Facettes : un seul petit fichier, régénéré depuis l'état
+            facets = {"tags": {}, "categories": {}}
+            for doc in docs.values():
+                _, _, _, category, tags = doc["meta"]
+                for tag in tags:
+                    facets["tags"].setdefault(tag, []).append(doc["id"])
+                if category:
+                    facets["categories"].setdefault(category, []).append(doc["id"])
+            self._write_if_changed(writer, self.search_dir / "facets.json", facets)
+            self._write_if_changed(writer, self.search_dir / "meta.json", {
+                "version": SEARCH_VERSION,
+                "docs": len(docs),
+                "prefix": PREFIX_LEN,
+                "block": DOC_BLOCK,
+                "shards": sorted(all_shards),
+                "stopwords": sorted(STOPWORDS),
+            })
+            written = writer.flush()
+
+            write_atomic(self.state_path, json.dumps(state, ensure_ascii=False), fsync=False)
+            self.state = state
+            return len(changed) + len(removed), written
+
+    def search(self, query, limit=10):
+        """Interroge l'index publié comme le fait la page de recherche. Retourne [(score, méta)]."""
+        meta = self._read(self.search_dir / "meta.json")
+        total = meta.get("docs", 0)
+        scores = None
+        for word in tokenize(query):
+            shard = self._read(self.search_dir / "terms" / f"{shard_key(word)}.json")
+            word_scores = Counter()
+            for term, plist in shard.items():
+                if term.startswith(word):
+                    idf = math.log(1 + total / len(plist))
+                    for doc_id, weight in plist:
+                        word_scores[doc_id] += weight * idf
+            # Tous les mots de la requête doivent être présents
+            scores = word_scores if scores is None else Counter({d: s + word_scores[d] for d, s in scores.items() if d in word_scores})
+        results = []
+        for doc_id, score in (scores or Counter()).most_common(limit):
+            block = self._read(self.search_dir / "docs" / f"{doc_id // DOC_BLOCK}.json")
+            results.append((score, block.get(str(doc_id))))
+        return results
+
+
+def update_search_index(entries=None, rebuild=False):
+    """Met à jour docs/search depuis le manifeste des fiches (rafraîchi si `entries` est absent)."""
+    if entries is None:
+        entries, _ = FicheManifest(docs_dir=DOCS_DIR, fiches_dir=FICHES_DIR).refresh()
+    return SearchIndex().update(entries, rebuild=rebuild)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args and not args[0].startswith("--"):
+        for score, meta in SearchIndex().search(" ".join(args)):
+            print(f"  {score:6.1f}  {meta[2]}  {meta[0]}  ({meta[1]})")
+    else:
+        reindexed, written = update_search_index(rebuild="--rebuild" in args)
+        print(f"🔎 Index de recherche : {reindexed} fiche(s) réindexée(s), {written} fichier(s) réécrit(s)")
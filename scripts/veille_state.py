@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+État persistant du traitement des issues (SQLite, dans .cache/).
+
+Chaque étape terminée d'une issue est enregistrée avec son résultat :
+  scraped  -> page scrapée (texte, image, URLs)
+  analyzed -> analyse Mistral (JSON)
+  fiche    -> chemin de la fiche créée
+Un traitement interrompu (crash, timeout de l'Action) reprend à la dernière étape terminée :
+ni nouveau scraping, ni nouvel appel Mistral pour ce qui était déjà fait.
+
+La file de relance (table retries, une ligne par URL normalisée) reporte les échecs temporaires
+(timeout, 5xx, quota) aux exécutions suivantes avec un délai exponentiel ; après
+VEILLE_RETRY_MAX_ATTEMPTS échecs, l'URL passe en lettre morte ('dead') et l'issue est fermée.
+
+Usage:
+    python3 scripts/veille_state.py              # résumé des issues suivies
+    python3 scripts/veille_state.py show <n>     # détail d'une issue
+    python3 scripts/veille_state.py forget <n>   # repartir de zéro pour une issue
+    python3 scripts/veille_state.py retries      # file de relance et lettres mortes
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import threading
+
+from veille_cache import CACHE_DIR
+
+STATE_PATH = CACHE_DIR / "veille_state.sqlite3"
+STAGES = ("scraped", "analyzed", "fiche")
+# Issues et relances inactives conservées (jours) avant purge
+STATE_RETENTION_DAYS = int(os.getenv("VEILLE_STATE_RETENTION_DAYS", "90"))
+# Relances : délai initial (6 h, doublé à chaque échec) et nombre maximal de tentatives
+RETRY_BASE_DELAY = int(os.getenv("VEILLE_RETRY_BASE_MINUTES", "360")) * 60
+RETRY_MAX_DELAY = 7 * 86400
+RETRY_MAX_ATTEMPTS = max(1, int(os.getenv("VEILLE_RETRY_MAX_ATTEMPTS", "5")))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS issues (
+    number INTEGER PRIMARY KEY,
+    url TEXT,
+    stage TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    number INTEGER NOT NULL,
+    stage TEXT NOT NULL,
+    data TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (number, stage)
+);
+CREATE TABLE IF NOT EXISTS retries (
+    url TEXT PRIMARY KEY,
+    number INTEGER,
+    stage TEXT,
+    attempts INTEGER NOT NULL,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    status TEXT NOT NULL DEFAULT 'waiting'
+);
+"""
+
+
+class StageError(Exception):
+    """Échec d'une étape du traitement ; `transient` : un nouvel essai plus tard peut réussir."""
+
+    def __init__(self, message, transient):
+        super().__init__(message)
+        self.transient = transient
+
+
+class StateStore:
+    """Étapes et artefacts par issue, partagés entre threads."""
+
+    def __init__(self, path=STATE_PATH):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path), check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+
+    def load(self, number):
+        """Retourne {'stage', 'status', 'url', 'error', 'artifacts': {étape: données}} (vide si inconnue)."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT url, stage, status, error FROM issues WHERE number = ?", (number,)
+            ).fetchone()
+            artifacts = self.conn.execute(
+                "SELECT stage, data FROM artifacts WHERE number = ?", (number,)
+            ).fetchall()
+        if row is None:
+            return {"stage": None, "status": None, "url": None, "error": None, "artifacts": {}}
+        return {
+            "url": row[0],
+            "stage": row[1],
+            "status": row[2],
+            "error": row[3],
+            "artifacts": {stage: json.loads(data) for stage, data in artifacts},
+        }
+
+    def record(self, number, stage, data, url=None):
+        """Enregistre une étape terminée et son artefact (une transaction)."""
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute(
+                """INSERT INTO issues (number, url, stage, status, updated_at) VALUES (?, ?, ?, 'pending', ?)
+                   ON CONFLICT(number) DO UPDATE SET
+                       url = COALESCE(excluded.url, issues.url), stage = excluded.stage,
+                       status = 'pending', error = NULL, updated_at = excluded.updated_at""",
+                (number, url, stage, now)
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO artifacts (number, stage, data, created_at) VALUES (?, ?, ?, ?)",
+                (number, stage, json.dumps(data, ensure_ascii=False), now)
+            )
+
+    def finish(self, number, status, error=None, url=None):
+        """Marque le résultat final d'un traitement ('success', 'duplicate', 'error')."""
+        with self.lock, self.conn:
+            self.conn.execute(
+                """INSERT INTO issues (number, url, status, error, updated_at) VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT(number) DO UPDATE SET
+                       url = COALESCE(excluded.url, issues.url), status = excluded.status,
+                       error = excluded.error, updated_at = excluded.updated_at""",
+                (number, url, status, error, time.time())
+            )
+
+    def forget(self, number):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM artifacts WHERE number = ?", (number,))
+            self.conn.execute("DELETE FROM issues WHERE number = ?", (number,))
+            self.conn.execute("DELETE FROM retries WHERE number = ?", (number,))
+
+    # --- File de relance ---
+
+    def retry_entry(self, url):
+        """Retourne l'entrée de relance d'une URL ({attempts, next_attempt_at, status...}) ou None."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT number, stage, attempts, next_attempt_at, last_error, status FROM retries WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ("number", "stage", "attempts", "next_attempt_at", "last_error", "status")
+        return dict(zip(keys, row))
+
+    def schedule_retry(self, url, number, stage, error):
+        """
+        Enregistre un échec temporaire et programme la prochaine tentative (backoff exponentiel).
+        Retourne l'entrée mise à jour ; status 'dead' quand les tentatives sont épuisées.
+        """
+        with self.lock, self.conn:
+            row = self.conn.execute("SELECT attempts FROM retries WHERE url = ?", (url,)).fetchone()
+            attempts = (row[0] if row else 0) + 1
+            delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempts - 1))
+            status = "dead" if attempts >= RETRY_MAX_ATTEMPTS else "waiting"
+            self.conn.execute(
+                """INSERT OR REPLACE INTO retries (url, number, stage, attempts, next_attempt_at, last_error, status)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (url, number, stage, attempts, time.time() + delay, str(error), status)
+            )
+        return self.retry_entry(url)
+
+    def clear_retry(self, url):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM retries WHERE url = ?", (url,))
+
+    def retries(self):
+        with self.lock:
+            return self.conn.execute(
+                "SELECT url, number, stage, attempts, next_attempt_at, status, last_error FROM retries "
+                "ORDER BY status, next_attempt_at"
+            ).fetchall()
+
+    def prune(self, max_age_days=STATE_RETENTION_DAYS):
+        """
+        Purge ce qui n'a pas bougé depuis plus de max_age_days : entrées de relance (lettres mortes
+        comprises), puis issues terminées, en erreur ou abandonnées avec leurs artefacts (texte
+        scrapé compris), sauf celles qui attendent encore une relance.
+        Retourne (issues, relances) supprimées.
+        """
+        cutoff = time.time() - max_age_days * 86400
+        with self.lock, self.conn:
+            retries = self.conn.execute("DELETE FROM retries WHERE next_attempt_at < ?", (cutoff,)).rowcount
+            numbers = [row[0] for row in self.conn.execute(
+                """SELECT number FROM issues WHERE updated_at < ?
+                   AND number NOT IN (SELECT number FROM retries WHERE status = 'waiting' AND number IS NOT NULL)""",
+                (cutoff,)
+            )]
+            self.conn.executemany("DELETE FROM artifacts WHERE number = ?", [(n,) for n in numbers])
+            self.conn.executemany("DELETE FROM issues WHERE number = ?", [(n,) for n in numbers])
+        return len(numbers), retries
+
+    def summary(self):
+        with self.lock:
+            return self.conn.execute(
+                "SELECT status, COALESCE(stage, '-'), COUNT(*) FROM issues GROUP BY status, stage ORDER BY status, stage"
+            ).fetchall()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+if __name__ == "__main__":
+    store = StateStore()
+    command = sys.argv[1] if len(sys.argv) > 1 else "summary"
+
+    if command == "summary":
+        rows = store.summary()
+        if not rows:
+            print("📭 Aucune issue suivie")
+        for status, stage, count in rows:
+            print(f"  {status:<10} étape {stage:<9} {count:>5} issue(s)")
+    elif command == "show" and len(sys.argv) > 2:
+        state = store.load(int(sys.argv[2]))
+        artifacts = {stage: (data if stage != "scraped" else {**data, "text": data.get("text", "")[:200] + "..."})
+                     for stage, data in state.pop("artifacts").items()}
+        print(json.dumps({**state, "artifacts": artifacts}, ensure_ascii=False, indent=2))
+    elif command == "retries":
+        rows = store.retries()
+        if not rows:
+            print("📭 File de relance vide")
+        for url, number, stage, attempts, next_at, status, error in rows:
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(next_at))
+            icon = "💀" if status == "dead" else "⏳"
+            print(f"  {icon} #{number} {url[:60]} — étape {stage}, {attempts} échec(s), "
+                  f"{'abandonnée' if status == 'dead' else 'prochain essai ' + when}")
+            print(f"     {error[:120]}")
+    elif command == "forget" and len(sys.argv) > 2:
+        store.forget(int(sys.argv[2]))
+        print(f"🗑️  Issue #{sys.argv[2]} oubliée")
+    else:
+        print(__doc__)
+        sys.exit(1)
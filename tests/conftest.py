@@ -0,0 +1,23 @@
+"""
+Configuration commune des tests : scripts/ et benchmarks/ importables, cache et jetons factices.
+
+Les variables d'environnement sont fixées avant l'import des modules du pipeline, qui lisent
+leur configuration au chargement.
+
+Usage:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.absolute()
+sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
+sys.path.insert(0, str(PROJECT_ROOT / "benchmarks"))
+
+os.environ["VEILLE_CACHE_DIR"] = tempfile.mkdtemp(prefix="veille-tests-")
+os.environ.setdefault("GITHUB_TOKEN", "test")
+os.environ.setdefault("MISTRAL_API_KEY", "test")
+os.environ.pop("VEILLE_PROFILE", None)
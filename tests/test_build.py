@@ -0,0 +1,113 @@
+"""Build de la CI : site/ réutilisé identique à un build complet dans un dossier vide (veille_build)."""
+
+import os
+import sys
+import shutil
+import filecmp
+import subprocess
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("material.plugins.blog")
+
+PROJECT_ROOT = Path(__file__).parent.parent.absolute()
+# Contiennent la date du build
+VOLATILE = {".veille_build.json", "sitemap.xml.gz"}
+
+
+def run(root, *command):
+    env = dict(os.environ, VEILLE_CACHE_DIR=str(root / ".cache"))
+    result = subprocess.run(command, cwd=root, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stdout + result.stderr
+    return result.stdout
+
+
+def build(root):
+    return run(root, sys.executable, "scripts/veille_build.py")
+
+
+def commit(root, message):
+    run(root, "git", "add", "-A")
+    run(root, "git", "-c", "user.name=test", "-c", "user.email=test@example.com", "commit", "-qm", message)
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Copie du site (docs/, mkdocs.yml, scripts/) dans un dépôt git, avec un premier build."""
+    root = tmp_path / "project"
+    root.mkdir()
+    shutil.copytree(PROJECT_ROOT / "docs", root / "docs")
+    shutil.copytree(PROJECT_ROOT / "scripts", root / "scripts", ignore=shutil.ignore_patterns("__pycache__"))
+    for name in ("mkdocs.yml", "requirements.txt"):
+        shutil.copy(PROJECT_ROOT / name, root / name)
+    (root / ".gitignore").write_text("site/\n.cache/\n")
+    run(root, "git", "init", "-q")
+    commit(root, "site")
+    assert "Build : aucun build précédent" in build(root)
+    return root
+
+
+def differences(root, other):
+    """Fichiers qui diffèrent entre site/ et `other` (ou n'existent que d'un côté)."""
+    found = []
+
+    def walk(comparison, prefix=""):
+        found.extend(prefix + name for name in comparison.left_only + comparison.right_only + comparison.diff_files
+                     if name not in VOLATILE)
+        for name, sub in comparison.subdirs.items():
+            walk(sub, f"{prefix}{name}/")
+
+    filecmp.clear_cache()
+    walk(filecmp.dircmp(root / "site", other, ignore=[]))
+    return sorted(found)
+
+
+def assert_same_as_full_build(root, tmp_path):
+    full = tmp_path / "full"
+    run(root, sys.executable, "-m", "mkdocs", "build", "-q", "-d", str(full))
+    assert differences(root, full) == []
+    # La configuration ne crée aucun fichier dans docs/ (il serait vu comme une modification)
+    assert run(root, "git", "status", "--porcelain") == ""
+
+
+def fiches(root):
+    return sorted((root / "docs" / "fiches").rglob("*.md"))
+
+
+def test_unchanged_docs_keep_the_site(project, tmp_path):
+    index = project / "site" / "index.html"
+    before = index.stat().st_mtime_ns
+
+    assert "Site à jour" in build(project)
+    assert index.stat().st_mtime_ns == before
+    assert_same_as_full_build(project, tmp_path)
+
+
+def test_edited_fiche(project, tmp_path):
+    path = fiches(project)[1]
+    content = path.read_text(encoding="utf-8")
+    path.write_text(content.replace("## Résumé\n", "## Résumé\n\nParagraphe ajouté après publication.\n", 1),
+                    encoding="utf-8")
+    commit(project, "édition")
+
+    assert "Build : 1 fichier(s) de docs/ modifié(s)" in build(project)
+    assert_same_as_full_build(project, tmp_path)
+
+
+def test_added_fiche(project, tmp_path):
+    source = fiches(project)[0]
+    added = source.with_name("31-fiche-ajoutee.md")
+    added.write_text(source.read_text(encoding="utf-8").replace("title: ", "title: Ajout - ", 1), encoding="utf-8")
+    commit(project, "ajout")
+
+    assert "Build : 1 fichier(s) de docs/ modifié(s)" in build(project)
+    assert_same_as_full_build(project, tmp_path)
+
+
+def test_removed_fiche(project, tmp_path):
+    fiches(project)[0].unlink()
+    commit(project, "suppression")
+
+    assert "Build : 1 fichier(s) de docs/ modifié(s)" in build(project)
+    assert_same_as_full_build(project, tmp_path)
@@ -0,0 +1,83 @@
+"""Quasi-doublons : empreinte SimHash et amorçage de l'index depuis les fiches (veille_dedup)."""
+
+import hashlib
+
+import pytest
+
+import veille_dedup
+from veille_cache import hash_key
+from veille_dedup import SimHashIndex, simhash, SHINGLE_SIZE
+from veille_index import FicheManifest, normalize_url
+from html_corpus import synthetic_page
+
+
+def reference_simhash(text):
+    """SimHash calculé bit à bit, comme l'implémentation d'origine."""
+    words = veille_dedup._WORD_RE.findall(text.lower())
+    words = words + [""] * max(0, SHINGLE_SIZE - len(words))
+    weights = [0] * 64
+    for i in range(len(words) - SHINGLE_SIZE + 1):
+        shingle = " ".join(words[i:i + SHINGLE_SIZE]).encode("utf-8")
+        value = int.from_bytes(hashlib.blake2b(shingle, digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+@pytest.mark.parametrize("text", ["", "un", "deux mots", "Élan, café et œuvre : trois mots accentués.",
+                                  synthetic_page(1, 15)[1], synthetic_page(2, 120)[1]])
+def test_simhash_matches_bitwise_reference(text):
+    assert simhash(text) == reference_simhash(text)
+
+
+def write_fiche(docs_dir, name, source, body):
+    path = docs_dir / "fiches" / f"{name}.md"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"---\ntitle: {name}\nsource: {source}\ndate: 2025-01-01\n---\n\n{body}\n", encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    cache = {}
+    monkeypatch.setattr(veille_dedup.SCRAPE_CACHE, "get", lambda key: (cache.get(key), 0))
+    docs_dir = tmp_path / "docs"
+    (docs_dir / "fiches").mkdir(parents=True)
+    manifest = FicheManifest(tmp_path / "manifest.json", docs_dir, docs_dir / "fiches")
+
+    def make():
+        return SimHashIndex(tmp_path / "simhash.json", manifest)
+
+    return make, docs_dir, cache
+
+
+def test_seeded_from_cached_scrape_text(index):
+    make, docs_dir, cache = index
+    _, text = synthetic_page(1, 40)
+    write_fiche(docs_dir, "article", "https://example.com/a", "Résumé Mistral de l'article.")
+    cache[hash_key(normalize_url("https://example.com/a"))] = {"text": text}
+
+    # Même article republié ailleurs, avec une phrase en plus
+    entry, distance = make().find(simhash(text + " Publié aussi sur un autre site."))
+    assert entry["path"] == "fiches/article.md" and distance <= veille_dedup.MAX_DISTANCE
+
+
+def test_fiche_without_scrape_text_is_not_fingerprinted(index):
+    make, docs_dir, _ = index
+    summary = "Résumé Mistral de l'article, bien plus court que le texte scrapé."
+    write_fiche(docs_dir, "article", "https://example.com/a", summary)
+
+    dup_index = make()
+    assert dup_index.find(simhash(summary)) == (None, None)
+    assert dup_index.entries == {}
+
+
+def test_deleted_fiche_is_not_a_duplicate(index):
+    make, docs_dir, cache = index
+    _, text = synthetic_page(1, 40)
+    path = write_fiche(docs_dir, "article", "https://example.com/a", "Résumé.")
+    cache[hash_key(normalize_url("https://example.com/a"))] = {"text": text}
+    assert make().find(simhash(text))[0] is not None
+
+    path.unlink()
+    assert make().find(simhash(text)) == (None, None)
@@ -0,0 +1,45 @@
+"""Création des fiches : noms en collision et fiches encore en attente d'écriture (process_veille)."""
+
+import pytest
+
+import process_veille
+from veille_index import FicheManifest, UrlIndex
+from veille_io import BatchWriter
+
+ANALYSIS = {"titre": "Même titre", "resume": "Résumé.", "thematique": "IA", "tags": ["test"]}
+
+
+@pytest.fixture
+def fiches_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(process_veille, "FICHES_DIR", tmp_path / "fiches")
+    return tmp_path / "fiches"
+
+
+def test_same_title_same_day_gets_a_suffix(fiches_dir):
+    writer = BatchWriter(fsync=False)
+    first = process_veille.create_markdown_fiche(ANALYSIS, "https://example.com/a", 1, writer=writer)
+    second = process_veille.create_markdown_fiche(ANALYSIS, "https://example.com/b", 2, writer=writer)
+
+    assert second == first.with_name(first.stem + "-2.md")
+    assert writer.flush() == 2
+    assert "example.com/a" in first.read_text(encoding="utf-8")
+    assert "example.com/b" in second.read_text(encoding="utf-8")
+
+    # Le nom est aussi libre d'après le disque, hors lot
+    third = process_veille.create_markdown_fiche(ANALYSIS, "https://example.com/c", 3)
+    assert third == first.with_name(first.stem + "-3.md")
+
+
+def test_url_index_sees_pending_fiches(tmp_path):
+    docs_dir = tmp_path / "docs"
+    (docs_dir / "fiches").mkdir(parents=True)
+    writer = BatchWriter(fsync=False)
+    manifest = FicheManifest(tmp_path / "manifest.json", docs_dir, docs_dir / "fiches")
+    urls = UrlIndex(tmp_path / "urls.json", manifest,
+                    exists=lambda rel_path: (docs_dir / rel_path).exists() or docs_dir / rel_path in writer)
+
+    writer.write(docs_dir / "fiches/a.md", "---\ntitle: a\n---\n")
+    urls.add("fiches/a.md", "https://example.com/a?utm_source=x")
+    assert urls.lookup("https://example.com/a") == "fiches/a.md"
+    writer.flush()
+    assert urls.lookup("https://example.com/a") == "fiches/a.md"
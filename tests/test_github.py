@@ -0,0 +1,87 @@
+"""Retours GitHub groupés : repli REST et reprise après une erreur ambiguë (veille_github)."""
+
+import pytest
+
+import veille_github
+from veille_github import GitHubWriteBack, RateLimiter
+from fake_services import FakeGitHub
+
+
+@pytest.fixture
+def github(monkeypatch):
+    service = FakeGitHub(latency_ms=0).start()
+    monkeypatch.setattr(veille_github, "GRAPHQL_URL", f"{service.url}/graphql")
+    yield service
+    service.stop()
+
+
+def make_write_back(github, batch_size=10):
+    """GitHubWriteBack dont le repli REST agit directement sur le dépôt factice."""
+    calls = []
+
+    def rest_comment(number, body):
+        calls.append(("comment", number))
+        github._comment(number, body)
+
+    def rest_close(number):
+        calls.append(("close", number))
+        github._close(number)
+
+    return GitHubWriteBack("test", rest_comment, rest_close, batch_size=batch_size, limiter=RateLimiter()), calls
+
+
+def report(write_back, issues):
+    for issue in issues:
+        write_back.add(issue, f"Fiche de l'issue #{issue['number']}")
+    write_back.flush()
+
+
+def test_batch_is_sent_in_one_mutation(github):
+    issues = [github.add_issue(f"https://example.com/{i}") for i in range(3)]
+    write_back, calls = make_write_back(github)
+    report(write_back, issues)
+
+    assert calls == []
+    assert github.stats["graphql"] == 1
+    assert all(issue["comments"] == [f"Fiche de l'issue #{n}"] and issue["state"] == "closed"
+               for n, issue in github.issues.items())
+
+
+def test_lost_response_does_not_duplicate_comments(github):
+    issues = [github.add_issue(f"https://example.com/{i}") for i in range(3)]
+    write_back, calls = make_write_back(github)
+    github.lost_responses = 1
+    report(write_back, issues)
+
+    # La mutation a été appliquée malgré le 502 : la relecture ne rejoue rien
+    assert calls == []
+    assert all(len(issue["comments"]) == 1 and issue["state"] == "closed" for issue in github.issues.values())
+
+
+def test_recovery_replays_only_missing_writes(github):
+    issues = [github.add_issue(f"https://example.com/{i}") for i in range(2)]
+    write_back, calls = make_write_back(github)
+    # Réponse perdue et issue n° 2 ignorée par le serveur (node_id inconnu au moment de la mutation)
+    github.lost_responses = 1
+    github.node_ids.pop("I_bench2")
+    original = write_back._recover
+
+    def recover(batch):
+        github.node_ids["I_bench2"] = 2
+        original(batch)
+
+    write_back._recover = recover
+    report(write_back, issues)
+
+    assert calls == [("comment", 2), ("close", 2)]
+    assert all(len(issue["comments"]) == 1 and issue["state"] == "closed" for issue in github.issues.values())
+
+
+def test_only_failed_aliases_fall_back_to_rest(github):
+    issues = [github.add_issue(f"https://example.com/{i}") for i in range(2)]
+    github.node_ids.pop("I_bench1")  # mutation sans effet pour l'issue n° 1 (alias absent de data)
+    write_back, calls = make_write_back(github)
+    report(write_back, issues)
+
+    assert calls == [("comment", 1), ("close", 1)]
+    assert all(len(issue["comments"]) == 1 for issue in github.issues.values())
@@ -0,0 +1,60 @@
+"""Liste des issues : requêtes incrémentales, ETag et relecture complète (process_veille.get_open_issues)."""
+
+import time
+
+import pytest
+
+import process_veille
+from fake_services import FakeGitHub
+
+
+@pytest.fixture
+def github(monkeypatch, tmp_path):
+    service = FakeGitHub(latency_ms=0).start()
+    monkeypatch.setattr(process_veille, "GITHUB_API_URL", service.url)
+    monkeypatch.setattr(process_veille.GITHUB_CACHE, "directory", tmp_path / "github")
+    yield service
+    service.stop()
+
+
+def run(github):
+    """Un run : (numéros des issues retournées, requêtes de liste, réponses 304)."""
+    before = dict(github.stats)
+    numbers = [issue["number"] for issue in process_veille.get_open_issues()]
+    return (numbers,
+            github.stats.get("list", 0) - before.get("list", 0),
+            github.stats.get("not_modified", 0) - before.get("not_modified", 0))
+
+
+def test_idle_runs_cost_one_304(github):
+    github.add_issue("https://example.com/a")
+    github.add_issue("https://example.com/b")
+
+    assert run(github) == ([1, 2], 1, 0)
+    # Premier run incrémental : nouvelle date, pas encore d'ETag pour cette requête
+    assert run(github) == ([1, 2], 1, 0)
+    # Deux nuits sans changement de suite : un 304 chacune
+    assert run(github) == ([1, 2], 1, 1)
+    assert run(github) == ([1, 2], 1, 1)
+
+
+def test_idle_full_refresh_is_a_304(github, monkeypatch):
+    github.add_issue("https://example.com/a")
+    assert run(github) == ([1], 1, 0)
+
+    monkeypatch.setattr(process_veille, "ISSUES_FULL_REFRESH_HOURS", 0)
+    time.sleep(0.01)
+    assert run(github) == ([1], 1, 1)
+    assert run(github) == ([1], 1, 1)
+
+
+def test_incremental_run_drops_issues_that_lost_the_label(github):
+    github.add_issue("https://example.com/a")
+    github.add_issue("https://example.com/b")
+    assert run(github)[0] == [1, 2]
+
+    time.sleep(1.1)  # updated_at à la seconde près
+    with github.lock:
+        github.issues[1]["labels"] = []
+        github.issues[1]["updated_at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    assert run(github) == ([2], 1, 0)
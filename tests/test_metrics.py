@@ -0,0 +1,25 @@
+"""Profilage du run : les fonctions exécutées dans les workers apparaissent dans le profil (veille_metrics)."""
+
+import pstats
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import veille_metrics
+from veille_metrics import profiling
+
+
+def busy_worker(n):
+    return sum(i * i for i in range(n))
+
+
+def test_cpu_profile_includes_worker_threads(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(veille_metrics, "PROFILE_PATH", tmp_path / "profile.pstats")
+    with profiling("cpu"):
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            assert len(list(executor.map(busy_worker, [20000] * 6))) == 6
+
+    names = {name for _, _, name in pstats.Stats(str(tmp_path / "profile.pstats")).stats}
+    assert "busy_worker" in names
+    assert "busy_worker" in capsys.readouterr().out
+    # Profilage des threads désactivé après le run
+    assert threading.getprofile() is None